@@ -0,0 +1,64 @@
+"""Compare two result files written by run.py.
+
+Prints wall time and peak RSS for every measurement present in both files and
+exits with status 1 if any of them regressed by more than the given threshold.
+
+Usage:
+    python benchmarks/compare.py OLD.json NEW.json [--threshold 0.1]
+"""
+
+import argparse
+import json
+import sys
+from typing import Any, Dict, Optional, Tuple
+
+JsonDict = Dict[str, Any]
+Key = Tuple[int, str, bool]
+
+
+def load(path: str) -> Tuple[JsonDict, Dict[Key, JsonDict]]:
+    with open(path) as f:
+        data = json.load(f)
+    results = {(r['models'], r['mode'], r['plugin']): r for r in data['results']}
+    return data['meta'], results
+
+
+def change(old: Optional[float], new: Optional[float]) -> Optional[float]:
+    if old is None or new is None or old == 0:
+        return None
+    return (new - old) / old
+
+
+def format_change(value: Optional[float]) -> str:
+    return '{:+7.1%}'.format(value) if value is not None else '      ?'
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('old')
+    parser.add_argument('new')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='relative slowdown considered a regression (default: %(default)s)')
+    args = parser.parse_args()
+
+    old_meta, old = load(args.old)
+    new_meta, new = load(args.new)
+    print('old: {} (mypy {})'.format(old_meta['commit'], old_meta['mypy']))
+    print('new: {} (mypy {})'.format(new_meta['commit'], new_meta['mypy']))
+    regressions = 0
+    for key in sorted(set(old) & set(new)):
+        models, mode, plugin = key
+        wall = change(old[key]['wall_s'], new[key]['wall_s'])
+        rss = change(old[key]['peak_rss_mb'], new[key]['peak_rss_mb'])
+        regressed = any(c is not None and c > args.threshold for c in (wall, rss))
+        regressions += regressed
+        print('{:>6} models  {:<11} plugin={!s:<5}  time {:8.2f}s {}  rss {}{}'.format(
+            models, mode, plugin, new[key]['wall_s'], format_change(wall),
+            format_change(rss), '  REGRESSION' if regressed else ''))
+    if regressions:
+        print('{} regression(s) above {:.0%}'.format(regressions, args.threshold))
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
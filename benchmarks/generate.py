@@ -0,0 +1,171 @@
+"""Generate synthetic SQLAlchemy projects for benchmarking the plugin.
+
+A generated project looks like this:
+
+    app/
+        base.py            # declarative base and a few column mixins
+        models/m0.py       # MODELS_PER_MODULE models per module
+        models/m1.py       # each module imports models from the previous one
+        ...
+        services/s0.py     # code that instantiates and uses the models
+        ...
+
+Every model has about a dozen columns of various types, some of them with
+'nullable', 'primary_key', 'default', and 'ForeignKey', uses one or two
+mixins, and has relationships to other models, both as class references
+and as strings.
+
+Usage:
+    python benchmarks/generate.py TARGET_DIR --models N
+"""
+
+import argparse
+import os
+from typing import List
+
+MODELS_PER_MODULE = 50
+
+BASE = '''\
+from datetime import datetime
+
+from sqlalchemy import Column, Integer, DateTime, Boolean, String
+from sqlalchemy.ext.declarative import declarative_base
+
+Base = declarative_base()
+
+
+class TimestampMixin:
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    updated_at = Column(DateTime)
+
+
+class SoftDeleteMixin:
+    deleted = Column(Boolean, nullable=False, default=False)
+    deleted_by = Column(String(100))
+'''
+
+MODELS_HEADER = '''\
+from typing import TYPE_CHECKING
+
+from sqlalchemy import (
+    Column, Integer, BigInteger, String, Text, Boolean, DateTime, Date, Float, Numeric, ForeignKey
+)
+from sqlalchemy.orm import relationship
+
+from app.base import Base, TimestampMixin, SoftDeleteMixin
+'''
+
+MODEL = '''
+
+class Model{i}(Base, {mixins}):
+    __tablename__ = 'model_{i}'
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(100), nullable=False)
+    slug = Column(String(100), nullable=False, index=True, unique=True)
+    description = Column(Text)
+    counter = Column(BigInteger, nullable=False, default=0)
+    ratio = Column(Float)
+    amount = Column(Numeric(10, 2), nullable=False, default=0)
+    active = Column(Boolean, nullable=False, default=True)
+    published_on = Column(Date)
+    last_seen = Column(DateTime)
+    parent_id = Column(Integer, ForeignKey('model_{parent}.id'), nullable=True)
+    owner_id = Column(Integer, ForeignKey('model_{owner}.id'), nullable=False)
+
+    parent = relationship({parent_ref})
+    owner = relationship({owner_ref}, uselist=False)
+    children = relationship('Model{i}', uselist=True)
+'''
+
+SERVICE_HEADER = '''\
+from typing import List, Optional
+
+from app.models.m{k} import {names}
+'''
+
+SERVICE = '''
+
+def create_{lower}(name: str, owner: int) -> Model{i}:
+    obj = Model{i}(name=name, slug=name.lower(), owner_id=owner, active=True)
+    obj.description = 'created ' + name
+    obj.counter = obj.counter + 1
+    return obj
+
+
+def describe_{lower}(obj: Model{i}) -> Optional[str]:
+    if obj.parent is not None and obj.parent.description:
+        return obj.parent.description
+    children: List[Model{i}] = obj.children
+    return obj.name if children else None
+'''
+
+
+def model_module(k: int, first: int, last: int) -> str:
+    """Source of the k-th models module with models in range [first, last)."""
+    lines = [MODELS_HEADER]
+    if k > 0:
+        # Models from the previous module are used both as class references
+        # and (for the owner) as strings resolved under TYPE_CHECKING.
+        lines.append('from app.models.m{} import Model{}\n'.format(k - 1, first - 1))
+        lines.append('if TYPE_CHECKING:\n    from app.models.m{} import Model{}\n'.format(
+            k - 1, first - 2))
+    for i in range(first, last):
+        parent = i - 1 if i > 0 else i
+        owner = i - 2 if i > 1 else i
+        if i == first and k > 0 or i - 1 >= first:
+            parent_ref = 'Model{}'.format(parent)
+        else:
+            parent_ref = "'Model{}'".format(parent)
+        mixins = 'TimestampMixin' if i % 2 else 'TimestampMixin, SoftDeleteMixin'
+        lines.append(MODEL.format(i=i, parent=parent, owner=owner, mixins=mixins,
+                                  parent_ref=parent_ref, owner_ref="'Model{}'".format(owner)))
+    return ''.join(lines)
+
+
+def service_module(k: int, first: int, last: int) -> str:
+    names = ', '.join('Model{}'.format(i) for i in range(first, last))
+    lines = [SERVICE_HEADER.format(k=k, names=names)]
+    for i in range(first, last):
+        lines.append(SERVICE.format(i=i, lower='model{}'.format(i)))
+    return ''.join(lines)
+
+
+def write(path: str, text: str) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(text)
+
+
+def generate(target: str, models: int) -> List[str]:
+    """Generate a project with given number of models, return list of source files."""
+    files = []
+    app = os.path.join(target, 'app')
+    for package in ('', 'models', 'services'):
+        init = os.path.join(app, package, '__init__.py')
+        write(init, '')
+        files.append(init)
+    write(os.path.join(app, 'base.py'), BASE)
+    files.append(os.path.join(app, 'base.py'))
+    for k, first in enumerate(range(0, models, MODELS_PER_MODULE)):
+        last = min(first + MODELS_PER_MODULE, models)
+        path = os.path.join(app, 'models', 'm{}.py'.format(k))
+        write(path, model_module(k, first, last))
+        files.append(path)
+        path = os.path.join(app, 'services', 's{}.py'.format(k))
+        write(path, service_module(k, first, last))
+        files.append(path)
+    return files
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('target', help='directory to generate the project in')
+    parser.add_argument('--models', type=int, default=100, help='number of models')
+    args = parser.parse_args()
+    files = generate(args.target, args.models)
+    print('generated {} files in {}'.format(len(files), args.target))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""Micro-benchmark for the overhead of plugin hook dispatch.
+
+Mypy asks plugins for a hook for every function call, every method call and
+every base class in the program. This script type checks a synthetic program, records all names
+mypy asked the plugin about, and then replays these requests against the plugin
+and against a bare mypy Plugin, reporting dispatches per second.
+
+Usage:
+    python benchmarks/hook_dispatch.py [--models N] [--repeat N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from typing import Callable, List, Optional
+
+from mypy.build import build, BuildSource
+from mypy.options import Options
+from mypy.plugin import Plugin
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlmypy import BasicSQLAlchemyPlugin  # noqa: E402
+
+
+HEADER = '''\
+from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy.orm import relationship, Session
+from sqlalchemy.ext.declarative import declarative_base
+
+Base = declarative_base()
+'''
+
+MODEL = '''
+class Model{i}(Base):
+    __tablename__ = 'model_{i}'
+    id = Column(Integer, primary_key=True)
+    name = Column(String(50), nullable=False)
+    parent_id = Column(Integer, ForeignKey('model_{i}.id'))
+    children = relationship('Model{i}', uselist=True)
+
+
+def use_model{i}(session: Session, x: int) -> Model{i}:
+    obj = Model{i}(id=x, name=str(x))
+    print(len(obj.name), abs(x), max(x, 0), sorted([x]))
+    names = [obj.name.strip().lower()]
+    names.extend(name.upper() for name in names)
+    session.add(obj)
+    return session.query(Model{i}).filter(Model{i}.id == x).one()
+'''
+
+
+def make_program(models: int) -> str:
+    return HEADER + ''.join(MODEL.format(i=i) for i in range(models))
+
+
+class RecordingPlugin(BasicSQLAlchemyPlugin):
+    """Plugin that records all names passed to the function, method and base class hooks."""
+    def __init__(self, options: Options) -> None:
+        super().__init__(options)
+        self.function_names = []  # type: List[str]
+        self.method_names = []  # type: List[str]
+        self.base_names = []  # type: List[str]
+
+    def get_function_hook(self, fullname: str):  # type: ignore
+        self.function_names.append(fullname)
+        return super().get_function_hook(fullname)
+
+    def get_method_hook(self, fullname: str):  # type: ignore
+        self.method_names.append(fullname)
+        return super().get_method_hook(fullname)
+
+    def get_base_class_hook(self, fullname: str):  # type: ignore
+        self.base_names.append(fullname)
+        return super().get_base_class_hook(fullname)
+
+
+def rate(dispatch: Callable[[str], Optional[object]], names: List[str], repeat: int) -> float:
+    """Return the number of dispatches per second."""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for name in names:
+            dispatch(name)
+    return len(names) * repeat / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--models', type=int, default=200, help='number of models to generate')
+    parser.add_argument('--repeat', type=int, default=20, help='number of replay passes')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'models.py')
+        with open(path, 'w') as f:
+            f.write(make_program(args.models))
+        options = Options()
+        options.incremental = False
+        options.show_traceback = True
+        recorder = RecordingPlugin(options)
+        start = time.perf_counter()
+        result = build([BuildSource(path, 'models')], options, extra_plugins=[recorder])
+        elapsed = time.perf_counter() - start
+    if result.errors:
+        print('\n'.join(result.errors))
+        sys.exit(1)
+
+    names = recorder.function_names + recorder.base_names
+    print('type checked {} models in {:.2f}s, {} hook requests'.format(
+        args.models, elapsed, len(names) + len(recorder.method_names)))
+
+    bare = Plugin(options)
+    plugin = BasicSQLAlchemyPlugin(options)
+    plugin.set_modules(result.manager.modules)
+
+    def dispatch(name: str) -> Optional[object]:
+        return plugin.get_function_hook(name) or plugin.get_base_class_hook(name)
+
+    def bare_dispatch(name: str) -> Optional[object]:
+        return bare.get_function_hook(name) or bare.get_base_class_hook(name)
+
+    print('\nfunction and base class hooks ({} requests):'.format(len(names)))
+    report(dispatch, bare_dispatch, names, args.repeat)
+
+    plugin = BasicSQLAlchemyPlugin(options)
+    plugin.set_modules(result.manager.modules)
+    print('\nmethod hooks ({} requests):'.format(len(recorder.method_names)))
+    report(plugin.get_method_hook, bare.get_method_hook, recorder.method_names, args.repeat)
+
+
+def report(dispatch: Callable[[str], Optional[object]],
+           bare_dispatch: Callable[[str], Optional[object]],
+           names: List[str], repeat: int) -> None:
+    cold = rate(dispatch, names, 1)
+    warm = rate(dispatch, names, repeat)
+    baseline = rate(bare_dispatch, names, repeat)
+    print('bare mypy plugin:         {:12,.0f} dispatches/s'.format(baseline))
+    print('sqlmypy (first lookup):   {:12,.0f} dispatches/s'.format(cold))
+    print('sqlmypy (cached):         {:12,.0f} dispatches/s'.format(warm))
+    print('added cost per dispatch:  {:12.3f} us (cached)'.format(
+        (1 / warm - 1 / baseline) * 1e6))
+
+if __name__ == '__main__':
+    main()
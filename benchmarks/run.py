@@ -0,0 +1,235 @@
+"""Benchmark mypy with and without the plugin on synthetic projects.
+
+For every project size (number of declarative models) this generates a project
+using generate.py and measures:
+  * cold: a run with an empty incremental cache;
+  * warm: a second run with the cache and no changes;
+  * edit: a run with the cache after adding a column to one of the models;
+  * dmypy-cold, dmypy-edit: the same first and incremental runs in daemon mode.
+
+Every measurement is done both with and without 'plugins = sqlmypy'. Each
+non-daemon run is done in a separate process, so that peak RSS can be reported
+for it; for daemon runs the peak RSS of the daemon is reported (Linux only).
+For runs with the plugin, the number of calls and total time spent in every
+plugin hook (and hook dispatch method) is reported as well.
+
+Results are written as JSON, use compare.py to compare results between commits.
+
+Usage:
+    python benchmarks/run.py [--sizes 100,1000,10000] [--output results.json]
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from generate import generate  # noqa: E402
+
+JsonDict = Dict[str, Any]
+
+CONFIG = '''\
+[mypy]
+{plugins}
+'''
+
+EDIT = '''
+    benchmark_extra = Column(Integer, nullable=False)
+'''
+
+
+def write_config(path: str, plugin: bool) -> None:
+    with open(path, 'w') as f:
+        f.write(CONFIG.format(plugins='plugins = sqlmypy' if plugin else ''))
+
+
+def child(args: argparse.Namespace) -> None:
+    """Run mypy once in this process and print measurements as JSON."""
+    from mypy.build import build
+    from mypy.errors import CompileError
+    from mypy.main import process_options
+
+    os.chdir(args.project)
+    sources, options = process_options(['--config-file', args.config,
+                                        '--cache-dir', args.cache_dir, 'app'])
+    plugins = []
+    profiler = None
+    if args.plugin:
+        # Replace the plugin enabled in the config file with a profiled copy.
+        from sqlmypy import BasicSQLAlchemyPlugin
+        options.plugins = []
+        plugin = BasicSQLAlchemyPlugin(options)
+        profiler = plugin.enable_profiling()
+        plugins.append(plugin)
+    start = time.perf_counter()
+    try:
+        result = build(sources, options, extra_plugins=plugins)
+        errors = len(result.errors)
+    except CompileError as e:
+        errors = len(e.messages)
+    wall = time.perf_counter() - start
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform != 'darwin':
+        rss *= 1024  # Linux reports kilobytes.
+    hooks = profiler.as_json()['hooks'] if profiler else {}
+    print(json.dumps({'wall_s': wall, 'peak_rss_mb': rss / 2 ** 20, 'errors': errors,
+                      'hooks': hooks}))
+
+
+def run_child(project: str, config: str, cache_dir: str, plugin: bool) -> JsonDict:
+    cmd = [sys.executable, os.path.abspath(__file__), '_child', '--project', project,
+           '--config', config, '--cache-dir', cache_dir]
+    if plugin:
+        cmd.append('--plugin')
+    out = subprocess.check_output(cmd, env=child_env())
+    return json.loads(out.decode().splitlines()[-1])
+
+
+def child_env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env.pop('SQLMYPY_PROFILE', None)
+    env['PYTHONPATH'] = os.pathsep.join(p for p in [REPO, env.get('PYTHONPATH')] if p)
+    return env
+
+
+def edit_project(project: str, models: int) -> None:
+    """Add a column to the last model of a module in the middle of the project."""
+    modules = sorted(os.listdir(os.path.join(project, 'app', 'models')))
+    modules = [m for m in modules if m.startswith('m')]
+    path = os.path.join(project, 'app', 'models', 'm{}.py'.format(len(modules) // 2))
+    with open(path, 'a') as f:
+        f.write(EDIT)
+
+
+def daemon_peak_rss(status_file: str) -> Optional[float]:
+    """Return peak RSS of the daemon in megabytes (only supported on Linux)."""
+    try:
+        with open(status_file) as f:
+            pid = json.load(f)['pid']
+        with open('/proc/{}/status'.format(pid)) as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except (OSError, KeyError, ValueError):
+        pass
+    return None
+
+
+def run_dmypy(project: str, config: str, cache_dir: str, models: int) -> List[JsonDict]:
+    os.makedirs(cache_dir, exist_ok=True)
+    status_file = os.path.join(cache_dir, '.dmypy.json')
+    dmypy = [sys.executable, '-m', 'mypy.dmypy', '--status-file', status_file]
+    env = child_env()
+    results = []
+    subprocess.check_call(dmypy + ['start', '--', '--config-file', config,
+                                   '--cache-dir', cache_dir],
+                          cwd=project, env=env, stdout=subprocess.DEVNULL)
+    try:
+        for mode in ('dmypy-cold', 'dmypy-edit'):
+            if mode == 'dmypy-edit':
+                edit_project(project, models)
+            start = time.perf_counter()
+            proc = subprocess.run(dmypy + ['check', 'app'], cwd=project, env=env,
+                                  stdout=subprocess.PIPE)
+            wall = time.perf_counter() - start
+            errors = sum(1 for line in proc.stdout.decode().splitlines() if ': error:' in line)
+            results.append({'mode': mode, 'wall_s': wall, 'errors': errors,
+                            'peak_rss_mb': daemon_peak_rss(status_file), 'hooks': {}})
+    finally:
+        subprocess.call(dmypy + ['stop'], cwd=project, env=env, stdout=subprocess.DEVNULL)
+    return results
+
+
+def bench_size(models: int, plugin: bool, dmypy: bool) -> List[JsonDict]:
+    results = []
+    tmp = tempfile.mkdtemp(prefix='sqlmypy-bench-')
+    try:
+        project = os.path.join(tmp, 'project')
+        generate(project, models)
+        config = os.path.join(tmp, 'mypy.ini')
+        cache_dir = os.path.join(tmp, 'cache')
+        write_config(config, plugin)
+        for mode in ('cold', 'warm', 'edit'):
+            if mode == 'edit':
+                edit_project(project, models)
+            result = run_child(project, config, cache_dir, plugin)
+            result['mode'] = mode
+            results.append(result)
+        if dmypy:
+            shutil.rmtree(project)
+            generate(project, models)
+            dmypy_cache = os.path.join(tmp, 'dmypy-cache')
+            results.extend(run_dmypy(project, config, dmypy_cache, models))
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    for result in results:
+        result['models'] = models
+        result['plugin'] = plugin
+    return results
+
+
+def metadata() -> JsonDict:
+    import mypy.version
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=REPO,
+                                         stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'mypy': mypy.version.__version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'date': datetime.datetime.utcnow().isoformat(),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest='command')
+    child_parser = sub.add_parser('_child')
+    child_parser.add_argument('--project', required=True)
+    child_parser.add_argument('--config', required=True)
+    child_parser.add_argument('--cache-dir', required=True)
+    child_parser.add_argument('--plugin', action='store_true')
+    parser.add_argument('--sizes', default='100,1000,10000',
+                        help='comma separated numbers of models (default: %(default)s)')
+    parser.add_argument('--output', default='bench_results.json',
+                        help='file to write JSON results to (default: %(default)s)')
+    parser.add_argument('--no-dmypy', action='store_true', help='skip daemon mode runs')
+    args = parser.parse_args()
+    if args.command == '_child':
+        child(args)
+        return
+
+    results = []
+    for models in [int(size) for size in args.sizes.split(',')]:
+        for plugin in (False, True):
+            for result in bench_size(models, plugin, not args.no_dmypy):
+                print('{models:>6} models  {mode:<11} plugin={plugin!s:<5}  '
+                      '{wall_s:8.2f}s  {rss:>5} MB  {errors:>5} errors'.format(
+                          rss='{:.0f}'.format(result['peak_rss_mb'])
+                          if result['peak_rss_mb'] is not None else '?', **result))
+                for name, hook in sorted(result['hooks'].items()):
+                    print('{:>30}: {:8} calls {:8.3f}s'.format(name, hook['calls'],
+                                                               hook['total_s']))
+                results.append(result)
+    with open(args.output, 'w') as f:
+        json.dump({'meta': metadata(), 'results': results}, f, indent=2, sort_keys=True)
+    print('results written to {}'.format(args.output))
+
+
+if __name__ == '__main__':
+    main()
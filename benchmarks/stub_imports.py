@@ -0,0 +1,84 @@
+"""Measure how many stub modules mypy loads for small programs.
+
+Every module imported (directly or transitively) by a program is parsed and
+semantically analyzed by mypy, so the import graph of the stubs determines the
+minimum cost of type checking any module using SQLAlchemy. This script type
+checks a few minimal programs without an incremental cache, and reports the
+number of loaded 'sqlalchemy' stub modules, and the best cold run time.
+
+Usage:
+    python benchmarks/stub_imports.py [--repeat N] [--plugin] [--list]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from typing import List, Tuple
+
+from mypy.build import build, BuildSource
+from mypy.options import Options
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+from sqlmypy import BasicSQLAlchemyPlugin  # noqa: E402
+
+PROGRAMS = [
+    ('core', 'from sqlalchemy import Column\n'),
+    ('orm', 'from sqlalchemy.orm import Session\n'),
+    ('declarative', 'from sqlalchemy.ext.declarative import declarative_base\n'),
+]
+
+
+def count_stubs() -> int:
+    total = 0
+    for _, _, files in os.walk(os.path.join(REPO, 'sqlalchemy-stubs')):
+        total += sum(1 for name in files if name.endswith('.pyi'))
+    return total
+
+
+def check(source: str, plugin: bool) -> Tuple[float, List[str]]:
+    """Type check a program without a cache, return time and loaded stub modules."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'main.py')
+        with open(path, 'w') as f:
+            f.write(source)
+        options = Options()
+        options.incremental = False
+        options.show_traceback = True
+        plugins = [BasicSQLAlchemyPlugin(options)] if plugin else []
+        start = time.perf_counter()
+        result = build([BuildSource(path, 'main')], options, extra_plugins=plugins)
+        elapsed = time.perf_counter() - start
+    if result.errors:
+        print('\n'.join(result.errors))
+        sys.exit(1)
+    modules = sorted(mod for mod in result.graph
+                     if mod == 'sqlalchemy' or mod.startswith('sqlalchemy.'))
+    return elapsed, modules
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=3, help='number of cold runs per program')
+    parser.add_argument('--plugin', action='store_true', help='enable the plugin')
+    parser.add_argument('--list', action='store_true', help='print loaded stub modules')
+    args = parser.parse_args()
+
+    print('{} stub modules in the package'.format(count_stubs()))
+    for name, source in PROGRAMS:
+        times = []
+        for _ in range(args.repeat):
+            elapsed, modules = check(source, args.plugin)
+            times.append(elapsed)
+        print('{:<12} {:>4} stub modules loaded  {:6.2f}s (best of {})  {}'.format(
+            name, len(modules), min(times), args.repeat, source.strip()))
+        if args.list:
+            for mod in modules:
+                print('    ' + mod)
+
+
+if __name__ == '__main__':
+    main()
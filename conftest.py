@@ -1,4 +1,31 @@
+import os
+import shutil
+import tempfile
+
 pytest_plugins = [
     'mypy.test.data',
 ]
 
+
+def pytest_addoption(parser):
+    parser.addoption('--warm-cache', action='store_true',
+                     help='share a pre-warmed mypy cache of stubs between test cases')
+
+
+def pytest_configure(config):
+    # With pytest-xdist, workers inherit the cache warmed by the controller.
+    if hasattr(config, 'workerinput') or not config.getoption('--warm-cache'):
+        return
+    from test.testsql import SHARED_CACHE_ENV, warm_cache
+    cache_dir = config.shared_cache_dir = tempfile.mkdtemp(prefix='sqlmypy-test-cache-')
+    # If the stubs have errors, run all cases from scratch to report them.
+    if warm_cache(cache_dir):
+        os.environ[SHARED_CACHE_ENV] = cache_dir
+
+
+def pytest_unconfigure(config):
+    cache_dir = getattr(config, 'shared_cache_dir', None)
+    if cache_dir is not None:
+        from test.testsql import SHARED_CACHE_ENV
+        os.environ.pop(SHARED_CACHE_ENV, None)
+        shutil.rmtree(cache_dir, ignore_errors=True)
@@ -52,7 +52,7 @@ setup(name='sqlalchemy-stubs',
       url="https://github.com/dropbox/sqlalchemy-stubs",
       py_modules=['sqlmypy', 'sqltyping'],
       install_requires=[
-          'mypy>=0.790',
+          'mypy>=0.950',
           'typing-extensions>=3.7.4'
       ],
       packages=['sqlalchemy-stubs'],
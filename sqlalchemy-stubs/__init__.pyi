@@ -122,8 +122,6 @@ from .engine import (
     engine_from_config as engine_from_config
 )
 
-from . import connectors as connectors
-from . import databases as databases
 from . import dialects as dialects
 from . import engine as engine
 from . import event as event
@@ -1,4 +1,7 @@
-from typing import Any
+from typing import Any, Callable, List, Mapping, Optional, Text, Type, Union
+from typing_extensions import Literal
+from ..pool import Pool
+from .url import URL
 from . import default as default
 
 from .interfaces import (
@@ -30,5 +33,76 @@ from .result import (
     RowProxy as RowProxy,
 )
 
-def create_engine(*args: Any, **kwargs: Any) -> Engine: ...
+# Keyword arguments of create_engine() are consumed by the engine, the pool, and the
+# dialect (those of dialects are listed after pool arguments, the plugin checks that they
+# are supported by the dialect of a literal URL). Engine plugins given as 'plugins=[...]'
+# may take any other keyword arguments, the plugin allows these in that case.
+def create_engine(name_or_url: Union[Text, URL], *,
+                  case_sensitive: bool = ...,
+                  connect_args: Mapping[str, Any] = ...,
+                  convert_unicode: bool = ...,
+                  creator: Callable[[], Any] = ...,
+                  echo: Union[bool, Literal['debug']] = ...,
+                  echo_pool: Union[bool, Literal['debug']] = ...,
+                  empty_in_strategy: Literal['static', 'dynamic', 'dynamic_warn'] = ...,
+                  encoding: str = ...,
+                  execution_options: Mapping[str, Any] = ...,
+                  future: bool = ...,
+                  hide_parameters: bool = ...,
+                  implicit_returning: bool = ...,
+                  isolation_level: str = ...,
+                  label_length: Optional[int] = ...,
+                  listeners: List[Any] = ...,
+                  logging_name: str = ...,
+                  max_identifier_length: int = ...,
+                  module: Any = ...,
+                  paramstyle: Literal['qmark', 'numeric', 'named', 'format', 'pyformat'] = ...,
+                  plugins: List[str] = ...,
+                  strategy: str = ...,
+                  executor: Callable[..., Any] = ...,
+                  pool: Pool = ...,
+                  poolclass: Type[Pool] = ...,
+                  pool_logging_name: str = ...,
+                  pool_pre_ping: bool = ...,
+                  pool_size: int = ...,
+                  pool_recycle: int = ...,
+                  pool_reset_on_return: Optional[Union[bool, Literal['rollback', 'commit']]] = ...,
+                  pool_timeout: float = ...,
+                  pool_use_lifo: bool = ...,
+                  max_overflow: int = ...,
+                  # Several dialects.
+                  json_serializer: Callable[[Any], str] = ...,
+                  json_deserializer: Callable[[str], Any] = ...,
+                  server_side_cursors: bool = ...,
+                  # PostgreSQL.
+                  use_native_unicode: bool = ...,
+                  client_encoding: str = ...,
+                  use_native_hstore: bool = ...,
+                  use_native_uuid: bool = ...,
+                  executemany_mode: Optional[Literal['batch', 'values']] = ...,
+                  executemany_batch_page_size: int = ...,
+                  executemany_values_page_size: int = ...,
+                  use_batch_mode: bool = ...,
+                  # SQLite.
+                  native_datetime: bool = ...,
+                  # Oracle.
+                  use_ansi: bool = ...,
+                  optimize_limits: bool = ...,
+                  use_binds_for_limits: bool = ...,
+                  use_nchar_for_unicode: bool = ...,
+                  exclude_tablespaces: List[str] = ...,
+                  auto_convert_lobs: bool = ...,
+                  coerce_to_unicode: bool = ...,
+                  coerce_to_decimal: bool = ...,
+                  arraysize: int = ...,
+                  encoding_errors: Optional[str] = ...,
+                  threaded: bool = ...,
+                  # SQL Server.
+                  query_timeout: Optional[int] = ...,
+                  use_scope_identity: bool = ...,
+                  schema_name: str = ...,
+                  deprecate_large_types: Optional[bool] = ...,
+                  legacy_schema_aliasing: bool = ...,
+                  description_encoding: Optional[str] = ...,
+                  fast_executemany: bool = ...) -> Engine: ...
 def engine_from_config(configuration: Any, prefix: str = ..., **kwargs: Any) -> Engine: ...
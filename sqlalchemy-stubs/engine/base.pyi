@@ -1,11 +1,15 @@
-from typing import Any, Optional, Dict, Union, Text
+from typing import Any, Optional, Dict, Union, Text, TypeVar, overload
+from typing_extensions import Literal
 from sqlalchemy import log
 from sqlalchemy.sql.expression import ClauseElement
 from sqlalchemy.sql.functions import FunctionElement
 from sqlalchemy.schema import DDLElement, DefaultGenerator
 from sqlalchemy.engine.interfaces import Compiled
 from .interfaces import Connectable as Connectable, ExceptionContext as ExceptionContext
-from .result import ResultProxy
+from .result import ResultProxy, _TypedResultProxy, _StreamingResultProxy, _TypedStreamingResultProxy
+from ..sql.selectable import _TypedSelect
+
+_CT = TypeVar('_CT')
 
 class Transaction(object):
     connection: Any = ...
@@ -39,7 +43,14 @@ class Connection(Connectable):
                  _dispatch: Optional[Any] = ..., _has_events: Optional[Any] = ...) -> None: ...
     def __enter__(self): ...
     def __exit__(self, type, value, traceback): ...
-    def execution_options(self, **opt): ...
+    @overload
+    def execution_options(self, *, stream_results: Literal[True], max_row_buffer: int = ...,
+                          **opt: Any) -> _StreamingConnection: ...
+    @overload
+    def execution_options(self, *, autocommit: bool = ..., compiled_cache: Optional[Dict[Any, Any]] = ...,
+                          isolation_level: str = ..., no_parameters: bool = ..., stream_results: bool = ...,
+                          max_row_buffer: int = ..., schema_translate_map: Optional[Dict[Optional[str], str]] = ...,
+                          **opt: Any) -> Connection: ...
     @property
     def closed(self) -> bool: ...
     @property
@@ -64,10 +75,28 @@ class Connection(Connectable):
     def in_transaction(self) -> bool: ...
     def close(self) -> None: ...
     def scalar(self, object, *multiparams, **params): ...
+    @overload
+    def execute(self, object: _TypedSelect[_CT], *multiparams: Any, **params: Any) -> _TypedResultProxy[_CT]: ...
+    @overload
     def execute(self, object, *multiparams, **params): ...
     def transaction(self, callable_, *args, **kwargs): ...
     def run_callable(self, callable_, *args, **kwargs): ...
 
+# This doesn't exist at runtime. The plugin uses it as the type of connections with
+# "stream_results=True" execution option, results are then fetched using server side
+# cursors (where supported), and only some rows are buffered in memory at a time.
+class _StreamingConnection(Connection):
+    @overload  # type: ignore[override]
+    def execution_options(self, *, stream_results: Literal[False],  # type: ignore[misc]
+                          **opt: Any) -> Connection: ...
+    @overload
+    def execution_options(self, **opt: Any) -> _StreamingConnection: ...
+    @overload  # type: ignore[override]
+    def execute(self, object: _TypedSelect[_CT], *multiparams: Any,
+                **params: Any) -> _TypedStreamingResultProxy[_CT]: ...
+    @overload
+    def execute(self, object, *multiparams, **params) -> _StreamingResultProxy: ...
+
 class ExceptionContextImpl(ExceptionContext):
     engine: Any = ...
     connection: Any = ...
@@ -102,6 +131,9 @@ class Engine(Connectable, log.Identified):
     def begin(self, close_with_result: bool = ...): ...
     def transaction(self, callable_, *args, **kwargs): ...
     def run_callable(self, callable_, *args, **kwargs): ...
+    @overload
+    def execute(self, object: _TypedSelect[_CT], *multiparams: Any, **params: Any) -> _TypedResultProxy[_CT]: ...
+    @overload
     def execute(self,
                 object: Union[Text, ClauseElement, FunctionElement, DDLElement, DefaultGenerator, Compiled],
                 *multiparams: Any,
@@ -1,6 +1,6 @@
 import sys
 
-from typing import Any, List, Mapping, Optional, Iterator, Union, AbstractSet, Tuple
+from typing import Any, Dict, List, Mapping, Optional, Iterator, Union, AbstractSet, Tuple, TypeVar, Generic
 from ..sql.schema import Column
 
 if sys.version_info >= (3, 0):
@@ -8,6 +8,8 @@ if sys.version_info >= (3, 0):
 else:
     _RowItems = List[Tuple[str, Any]]
 
+_CT = TypeVar('_CT', covariant=True)
+
 def rowproxy_reconstructor(cls, state): ...
 
 class BaseRowProxy(Mapping[str, Any]):
@@ -34,6 +36,11 @@ class RowProxy(BaseRowProxy):
     def iterkeys(self): ...
     def itervalues(self): ...
 
+# This doesn't exist at runtime, see _TypedResultProxy.
+class _TypedRow(RowProxy, Generic[_CT]):
+    def __getitem__(self, key: Union[str, int, Column]) -> Any: ...
+    def __getattr__(self, name: str) -> Any: ...
+
 class ResultMetaData(object):
     case_sensitive: Any = ...
     matched_on_name: bool = ...
@@ -80,8 +87,26 @@ class ResultProxy:
     # TODO: See typeshed/#1037
     def scalar(self) -> Any: ...
 
+# This doesn't exist at runtime. The plugin uses it as the type of results of
+# typed selects (see sqlalchemy.sql.selectable._TypedSelect), to record types of
+# result columns by name (_CT is a TypedDict).
+class _TypedResultProxy(ResultProxy, Generic[_CT]):
+    def __iter__(self) -> Iterator[_TypedRow[_CT]]: ...
+    def __next__(self) -> _TypedRow[_CT]: ...
+    def next(self) -> _TypedRow[_CT]: ...
+    def fetchall(self) -> List[_TypedRow[_CT]]: ...  # type: ignore[override]
+    def fetchmany(self, size: Optional[int] = ...) -> List[_TypedRow[_CT]]: ...  # type: ignore[override]
+    def fetchone(self) -> Optional[_TypedRow[_CT]]: ...
+    def first(self) -> Optional[_TypedRow[_CT]]: ...
+
 class BufferedRowResultProxy(ResultProxy):
-    size_growth: Any = ...
+    size_growth: Dict[int, int] = ...
+
+# This doesn't exist at runtime. The plugin uses it as the type of results executed on
+# connections with "stream_results=True" execution option, to report uses of fetchall().
+class _StreamingResultProxy(BufferedRowResultProxy): ...
+
+class _TypedStreamingResultProxy(_TypedResultProxy[_CT], _StreamingResultProxy): ...
 
 class FullyBufferedResultProxy(ResultProxy): ...
 
@@ -89,5 +114,5 @@ class BufferedColumnRow(RowProxy):
     def __init__(self, parent, row, processors, keymap) -> None: ...
 
 class BufferedColumnResultProxy(ResultProxy):
-    def fetchall(self): ...
-    def fetchmany(self, size: Optional[Any] = ...): ...
+    def fetchall(self) -> List[RowProxy]: ...
+    def fetchmany(self, size: Optional[int] = ...) -> List[RowProxy]: ...
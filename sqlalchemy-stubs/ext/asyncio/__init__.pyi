@@ -0,0 +1,17 @@
+from .engine import (
+    AsyncConnection as AsyncConnection,
+    AsyncEngine as AsyncEngine,
+    AsyncTransaction as AsyncTransaction,
+    create_async_engine as create_async_engine
+)
+from .result import (
+    AsyncMappingResult as AsyncMappingResult,
+    AsyncResult as AsyncResult,
+    AsyncScalarResult as AsyncScalarResult
+)
+from .session import (
+    AsyncSession as AsyncSession,
+    AsyncSessionTransaction as AsyncSessionTransaction,
+    async_object_session as async_object_session,
+    async_session as async_session
+)
@@ -0,0 +1,9 @@
+from typing import Any, Generator, TypeVar
+
+_SC = TypeVar('_SC', bound=StartableContext)
+
+class StartableContext(object):
+    async def start(self: _SC, is_ctxmanager: bool = ...) -> _SC: ...
+    def __await__(self: _SC) -> Generator[Any, None, _SC]: ...
+    async def __aenter__(self: _SC) -> _SC: ...
+    async def __aexit__(self, type_: Any, value: Any, traceback: Any) -> None: ...
@@ -0,0 +1,93 @@
+from typing import Any, AsyncContextManager, Callable, Dict, Optional, Text, TypeVar, Union, overload
+from ...engine.base import Connection, Engine
+from ...engine.interfaces import Compiled
+from ...engine.result import ResultProxy, _TypedResultProxy
+from ...schema import DDLElement, DefaultGenerator
+from ...sql.expression import ClauseElement
+from ...sql.functions import FunctionElement
+from ...sql.selectable import _TypedSelect
+from .base import StartableContext
+from .result import AsyncResult, _TypedAsyncResult
+
+_T = TypeVar('_T')
+_CT = TypeVar('_CT')
+
+_Executable = Union[Text, ClauseElement, FunctionElement, DDLElement, DefaultGenerator, Compiled]
+
+def create_async_engine(*arg: Any, **kw: Any) -> AsyncEngine: ...
+
+class AsyncConnectable(object): ...
+
+class AsyncConnection(StartableContext, AsyncConnectable):
+    engine: AsyncEngine = ...
+    sync_engine: Engine = ...
+    sync_connection: Optional[Connection] = ...
+    def __init__(self, async_engine: AsyncEngine, sync_connection: Optional[Connection] = ...) -> None: ...
+    @property
+    def connection(self) -> Any: ...
+    async def get_raw_connection(self) -> Any: ...
+    @property
+    def info(self) -> Dict[Any, Any]: ...
+    def begin(self) -> AsyncTransaction: ...
+    def begin_nested(self) -> AsyncTransaction: ...
+    async def invalidate(self, exception: Optional[BaseException] = ...) -> None: ...
+    async def get_isolation_level(self) -> str: ...
+    async def set_isolation_level(self, level: str) -> None: ...
+    def in_transaction(self) -> bool: ...
+    def in_nested_transaction(self) -> bool: ...
+    def get_transaction(self) -> Optional[AsyncTransaction]: ...
+    def get_nested_transaction(self) -> Optional[AsyncTransaction]: ...
+    async def execution_options(self, **opt: Any) -> AsyncConnection: ...
+    async def commit(self) -> None: ...
+    async def rollback(self) -> None: ...
+    async def close(self) -> None: ...
+    async def exec_driver_sql(self, statement: Text, parameters: Optional[Any] = ...,
+                              execution_options: Optional[Dict[str, Any]] = ...) -> ResultProxy: ...
+    @overload
+    async def stream(self, statement: _TypedSelect[_CT], parameters: Optional[Any] = ...,
+                     execution_options: Optional[Dict[str, Any]] = ...) -> _TypedAsyncResult[_CT]: ...
+    @overload
+    async def stream(self, statement: _Executable, parameters: Optional[Any] = ...,
+                     execution_options: Optional[Dict[str, Any]] = ...) -> AsyncResult: ...
+    @overload
+    async def execute(self, statement: _TypedSelect[_CT], parameters: Optional[Any] = ...,
+                      execution_options: Optional[Dict[str, Any]] = ...) -> _TypedResultProxy[_CT]: ...
+    @overload
+    async def execute(self, statement: _Executable, parameters: Optional[Any] = ...,
+                      execution_options: Optional[Dict[str, Any]] = ...) -> ResultProxy: ...
+    async def scalar(self, statement: _Executable, parameters: Optional[Any] = ...,
+                     execution_options: Optional[Dict[str, Any]] = ...) -> Any: ...
+    async def run_sync(self, fn: Callable[..., _T], *arg: Any, **kw: Any) -> _T: ...
+
+class AsyncEngine(AsyncConnectable):
+    sync_engine: Engine = ...
+    url: Any = ...
+    pool: Any = ...
+    dialect: Any = ...
+    echo: Any = ...
+    def __init__(self, sync_engine: Engine) -> None: ...
+    @property
+    def name(self) -> str: ...
+    @property
+    def driver(self) -> str: ...
+    def begin(self) -> AsyncContextManager[AsyncConnection]: ...
+    def connect(self) -> AsyncConnection: ...
+    async def raw_connection(self) -> Any: ...
+    def execution_options(self, **opt: Any) -> AsyncEngine: ...
+    def update_execution_options(self, **opt: Any) -> None: ...
+    def get_execution_options(self) -> Dict[str, Any]: ...
+    def clear_compiled_cache(self) -> None: ...
+    async def dispose(self) -> None: ...
+
+class AsyncTransaction(StartableContext):
+    connection: AsyncConnection = ...
+    sync_transaction: Any = ...
+    nested: bool = ...
+    def __init__(self, connection: AsyncConnection, nested: bool = ...) -> None: ...
+    @property
+    def is_valid(self) -> bool: ...
+    @property
+    def is_active(self) -> bool: ...
+    async def close(self) -> None: ...
+    async def rollback(self) -> None: ...
+    async def commit(self) -> None: ...
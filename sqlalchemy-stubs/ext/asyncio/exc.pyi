@@ -0,0 +1,5 @@
+from ...exc import InvalidRequestError
+
+class AsyncMethodRequired(InvalidRequestError): ...
+class AsyncContextNotStarted(InvalidRequestError): ...
+class AsyncContextAlreadyStarted(InvalidRequestError): ...
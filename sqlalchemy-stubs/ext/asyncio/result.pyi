@@ -0,0 +1,71 @@
+from typing import Any, AsyncIterator, Generic, List, Mapping, Optional, TypeVar
+from ...engine.result import RowProxy, _TypedRow
+
+_CT = TypeVar('_CT', covariant=True)
+_R = TypeVar('_R', bound=AsyncCommon)
+
+class AsyncCommon(object):
+    async def close(self) -> None: ...
+    def unique(self: _R, strategy: Optional[Any] = ...) -> _R: ...
+
+class AsyncResult(AsyncCommon):
+    def __init__(self, real_result: Any) -> None: ...
+    def keys(self) -> List[str]: ...
+    def columns(self, *col_expressions: Any) -> AsyncResult: ...
+    def partitions(self, size: Optional[int] = ...) -> AsyncIterator[List[RowProxy]]: ...
+    async def fetchone(self) -> Optional[RowProxy]: ...
+    async def fetchmany(self, size: Optional[int] = ...) -> List[RowProxy]: ...
+    async def fetchall(self) -> List[RowProxy]: ...
+    async def all(self) -> List[RowProxy]: ...
+    def __aiter__(self) -> AsyncIterator[RowProxy]: ...
+    async def __anext__(self) -> RowProxy: ...
+    async def first(self) -> Optional[RowProxy]: ...
+    async def one_or_none(self) -> Optional[RowProxy]: ...
+    async def one(self) -> RowProxy: ...
+    async def scalar_one(self) -> Any: ...
+    async def scalar_one_or_none(self) -> Optional[Any]: ...
+    async def scalar(self) -> Any: ...
+    async def freeze(self) -> Any: ...
+    def scalars(self, index: int = ...) -> AsyncScalarResult: ...
+    def mappings(self) -> AsyncMappingResult: ...
+
+# This doesn't exist at runtime, see sqlalchemy.engine.result._TypedResultProxy.
+# This is the type of results of typed selects executed using 'stream()'.
+class _TypedAsyncResult(AsyncResult, Generic[_CT]):
+    def partitions(self, size: Optional[int] = ...) -> AsyncIterator[List[_TypedRow[_CT]]]: ...  # type: ignore[override]
+    async def fetchone(self) -> Optional[_TypedRow[_CT]]: ...
+    async def fetchmany(self, size: Optional[int] = ...) -> List[_TypedRow[_CT]]: ...  # type: ignore[override]
+    async def fetchall(self) -> List[_TypedRow[_CT]]: ...  # type: ignore[override]
+    async def all(self) -> List[_TypedRow[_CT]]: ...  # type: ignore[override]
+    def __aiter__(self) -> AsyncIterator[_TypedRow[_CT]]: ...
+    async def __anext__(self) -> _TypedRow[_CT]: ...
+    async def first(self) -> Optional[_TypedRow[_CT]]: ...
+    async def one_or_none(self) -> Optional[_TypedRow[_CT]]: ...
+    async def one(self) -> _TypedRow[_CT]: ...
+
+class AsyncScalarResult(AsyncCommon):
+    def __init__(self, real_result: Any, index: Any) -> None: ...
+    def partitions(self, size: Optional[int] = ...) -> AsyncIterator[List[Any]]: ...
+    async def fetchall(self) -> List[Any]: ...
+    async def fetchmany(self, size: Optional[int] = ...) -> List[Any]: ...
+    async def all(self) -> List[Any]: ...
+    def __aiter__(self) -> AsyncIterator[Any]: ...
+    async def __anext__(self) -> Any: ...
+    async def first(self) -> Optional[Any]: ...
+    async def one_or_none(self) -> Optional[Any]: ...
+    async def one(self) -> Any: ...
+
+class AsyncMappingResult(AsyncCommon):
+    def __init__(self, result: Any) -> None: ...
+    def keys(self) -> List[str]: ...
+    def columns(self, *col_expressions: Any) -> AsyncMappingResult: ...
+    def partitions(self, size: Optional[int] = ...) -> AsyncIterator[List[Mapping[str, Any]]]: ...
+    async def fetchall(self) -> List[Mapping[str, Any]]: ...
+    async def fetchone(self) -> Optional[Mapping[str, Any]]: ...
+    async def fetchmany(self, size: Optional[int] = ...) -> List[Mapping[str, Any]]: ...
+    async def all(self) -> List[Mapping[str, Any]]: ...
+    def __aiter__(self) -> AsyncIterator[Mapping[str, Any]]: ...
+    async def __anext__(self) -> Mapping[str, Any]: ...
+    async def first(self) -> Optional[Mapping[str, Any]]: ...
+    async def one_or_none(self) -> Optional[Mapping[str, Any]]: ...
+    async def one(self) -> Mapping[str, Any]: ...
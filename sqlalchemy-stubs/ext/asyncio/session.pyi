@@ -0,0 +1,99 @@
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Sequence, Type, TypeVar, overload
+from ...orm.session import Session
+from ...engine.result import ResultProxy, _TypedResultProxy
+from ...sql.selectable import _TypedSelect
+from .base import StartableContext
+from .engine import AsyncConnection, _Executable
+from .result import AsyncResult, _TypedAsyncResult
+
+_T = TypeVar('_T')
+_CT = TypeVar('_CT')
+
+class AsyncSession(object):
+    dispatch: Any = ...
+    bind: Any = ...
+    binds: Any = ...
+    sync_session: Session = ...
+    identity_map: Any = ...
+    def __init__(self, bind: Optional[Any] = ..., binds: Optional[Dict[Any, Any]] = ...,
+                 **kw: Any) -> None: ...
+    async def refresh(self, instance: object, attribute_names: Optional[Iterable[str]] = ...,
+                      with_for_update: Optional[Any] = ...) -> None: ...
+    async def run_sync(self, fn: Callable[..., _T], *arg: Any, **kw: Any) -> _T: ...
+    @overload
+    async def execute(self, statement: _TypedSelect[_CT], params: Optional[Any] = ...,
+                      execution_options: Optional[Dict[str, Any]] = ...,
+                      bind_arguments: Optional[Dict[str, Any]] = ...,
+                      **kw: Any) -> _TypedResultProxy[_CT]: ...
+    @overload
+    async def execute(self, statement: _Executable, params: Optional[Any] = ...,
+                      execution_options: Optional[Dict[str, Any]] = ...,
+                      bind_arguments: Optional[Dict[str, Any]] = ...,
+                      **kw: Any) -> ResultProxy: ...
+    async def scalar(self, statement: _Executable, params: Optional[Any] = ...,
+                     execution_options: Optional[Dict[str, Any]] = ...,
+                     bind_arguments: Optional[Dict[str, Any]] = ..., **kw: Any) -> Any: ...
+    async def get(self, entity: Type[_T], ident: Any, options: Optional[Sequence[Any]] = ...,
+                  populate_existing: bool = ..., with_for_update: Optional[Any] = ...,
+                  identity_token: Optional[Any] = ...) -> Optional[_T]: ...
+    @overload
+    async def stream(self, statement: _TypedSelect[_CT], params: Optional[Any] = ...,
+                     execution_options: Optional[Dict[str, Any]] = ...,
+                     bind_arguments: Optional[Dict[str, Any]] = ...,
+                     **kw: Any) -> _TypedAsyncResult[_CT]: ...
+    @overload
+    async def stream(self, statement: _Executable, params: Optional[Any] = ...,
+                     execution_options: Optional[Dict[str, Any]] = ...,
+                     bind_arguments: Optional[Dict[str, Any]] = ...,
+                     **kw: Any) -> AsyncResult: ...
+    async def delete(self, instance: object) -> None: ...
+    async def merge(self, instance: _T, load: bool = ...) -> _T: ...
+    async def flush(self, objects: Optional[Sequence[Any]] = ...) -> None: ...
+    async def connection(self) -> AsyncConnection: ...
+    def begin(self, **kw: Any) -> AsyncSessionTransaction: ...
+    def begin_nested(self, **kw: Any) -> AsyncSessionTransaction: ...
+    async def rollback(self) -> None: ...
+    async def commit(self) -> None: ...
+    async def close(self) -> None: ...
+    @classmethod
+    async def close_all(cls) -> None: ...
+    async def __aenter__(self) -> AsyncSession: ...
+    async def __aexit__(self, type_: Any, value: Any, traceback: Any) -> None: ...
+    def __contains__(self, instance: object) -> bool: ...
+    def __iter__(self) -> Iterator[Any]: ...
+    def add(self, instance: object, _warn: bool = ...) -> None: ...
+    def add_all(self, instances: Iterable[object]) -> None: ...
+    def expire(self, instance: object, attribute_names: Optional[Iterable[str]] = ...) -> None: ...
+    def expire_all(self) -> None: ...
+    def expunge(self, instance: object) -> None: ...
+    def expunge_all(self) -> None: ...
+    def get_bind(self, mapper: Optional[Any] = ..., clause: Optional[Any] = ...,
+                 bind: Optional[Any] = ..., **kw: Any) -> Any: ...
+    def in_transaction(self) -> bool: ...
+    def in_nested_transaction(self) -> bool: ...
+    def is_modified(self, instance: object, include_collections: bool = ...) -> bool: ...
+    @property
+    def dirty(self) -> Any: ...
+    @property
+    def deleted(self) -> Any: ...
+    @property
+    def new(self) -> Any: ...
+    @property
+    def is_active(self) -> bool: ...
+    @property
+    def no_autoflush(self) -> Any: ...
+    @property
+    def info(self) -> Dict[Any, Any]: ...
+
+class AsyncSessionTransaction(StartableContext):
+    session: AsyncSession = ...
+    nested: bool = ...
+    sync_transaction: Any = ...
+    def __init__(self, session: AsyncSession, nested: bool = ...) -> None: ...
+    @property
+    def is_active(self) -> bool: ...
+    async def rollback(self) -> None: ...
+    async def commit(self) -> None: ...
+
+def async_object_session(instance: object) -> Optional[AsyncSession]: ...
+def async_session(session: Session) -> Optional[AsyncSession]: ...
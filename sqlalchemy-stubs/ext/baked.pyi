@@ -1,5 +1,11 @@
-from typing import Any
+from typing import Any, Callable, Generic, Iterator, List, Optional, TypeVar
 from ..orm import strategies as strategies
+from ..orm.query import Query
+from ..orm.session import Session
+
+_T = TypeVar('_T')
+_BQ = TypeVar('_BQ', bound=BakedQuery[Any])
+_R = TypeVar('_R', bound=Result[Any])
 
 log: Any = ...
 
@@ -7,34 +13,35 @@ class Bakery(object):
     cls: Any = ...
     cache: Any = ...
     def __init__(self, cls_, cache) -> None: ...
-    def __call__(self, initial_fn, *args) -> None: ...
+    def __call__(self, initial_fn: Callable[[Session], Query[_T]], *args) -> BakedQuery[_T]: ...
 
-class BakedQuery(object):
+class BakedQuery(Generic[_T]):
     steps: Any = ...
-    def __init__(self, bakery: Bakery, initial_fn, args: Any = ...) -> None: ...
+    def __init__(self, bakery: Bakery, initial_fn: Callable[[Session], Query[_T]],
+                 args: Any = ...) -> None: ...
     @classmethod
     def bakery(cls, size: int = ...) -> Bakery: ...
-    def __iadd__(self, other): ...
-    def __add__(self, other): ...
-    def add_criteria(self, fn, *args): ...
-    def with_criteria(self, fn, *args): ...
-    def for_session(self, session): ...
-    def __call__(self, session): ...
-    def spoil(self, full: bool = ...): ...
-
-class Result(object):
-    bq: Any = ...
-    session: Any = ...
-    def __init__(self, bq: BakedQuery, session) -> None: ...
-    def params(self, *args, **kw): ...
-    def __iter__(self): ...
-    def count(self): ...
-    def scalar(self): ...
-    def first(self): ...
-    def one(self): ...
-    def one_or_none(self): ...
-    def all(self): ...
-    def get(self, ident): ...
+    def __iadd__(self: _BQ, other: Callable[[Query[_T]], Query[_T]]) -> _BQ: ...
+    def __add__(self, other: Callable[[Query[_T]], Query[_T]]) -> BakedQuery[_T]: ...
+    def add_criteria(self: _BQ, fn: Callable[..., Query[_T]], *args) -> _BQ: ...
+    def with_criteria(self, fn: Callable[..., Query[_T]], *args) -> BakedQuery[_T]: ...
+    def for_session(self, session: Session) -> Result[_T]: ...
+    def __call__(self, session: Session) -> Result[_T]: ...
+    def spoil(self: _BQ, full: bool = ...) -> _BQ: ...
+
+class Result(Generic[_T]):
+    bq: BakedQuery[_T] = ...
+    session: Session = ...
+    def __init__(self, bq: BakedQuery[_T], session: Session) -> None: ...
+    def params(self: _R, *args, **kw) -> _R: ...
+    def __iter__(self) -> Iterator[_T]: ...
+    def count(self) -> int: ...
+    def scalar(self) -> Any: ...
+    def first(self) -> Optional[_T]: ...
+    def one(self) -> _T: ...
+    def one_or_none(self) -> Optional[_T]: ...
+    def all(self) -> List[_T]: ...
+    def get(self, ident) -> Optional[_T]: ...
 
 def bake_lazy_loaders(): ...
 def unbake_lazy_loaders(): ...
@@ -44,4 +51,4 @@ class BakedLazyLoader(strategies.LazyLoader): ...
 def baked_lazyload(loadopt, attr): ...
 def baked_lazyload_all(*keys): ...
 
-bakery: Bakery = ...
+def bakery(size: int = ...) -> Bakery: ...
@@ -1,4 +1,4 @@
-from typing import Any, Optional
+from typing import Any, Optional, TypeVar
 from .mapper import (
     Mapper as Mapper,
     class_mapper as class_mapper,
@@ -22,6 +22,7 @@ from .util import (
     with_polymorphic as with_polymorphic
 )
 from .properties import ColumnProperty as ColumnProperty
+from ..sql.schema import Column
 from .relationships import RelationshipProperty as RelationshipProperty
 from .descriptor_props import (
     ComparableProperty as ComparableProperty,
@@ -40,7 +41,28 @@ from .session import (
 from .scoping import scoped_session as scoped_session
 from . import mapper as mapperlib
 from .query import AliasOption as AliasOption, Query as Query, Bundle as Bundle
-from .strategy_options import Load as Load
+from .strategy_options import (
+    Load as Load,
+    contains_eager as contains_eager,
+    defaultload as defaultload,
+    defer as defer,
+    immediateload as immediateload,
+    joinedload as joinedload,
+    joinedload_all as joinedload_all,
+    lazyload as lazyload,
+    lazyload_all as lazyload_all,
+    load_only as load_only,
+    noload as noload,
+    raiseload as raiseload,
+    selectin_polymorphic as selectin_polymorphic,
+    selectinload as selectinload,
+    selectinload_all as selectinload_all,
+    subqueryload as subqueryload,
+    subqueryload_all as subqueryload_all,
+    undefer as undefer,
+    undefer_group as undefer_group,
+    with_expression as with_expression
+)
 
 def create_session(bind: Optional[Any] = ..., **kwargs): ...
 
@@ -55,7 +77,10 @@ composite = CompositeProperty
 def query_expression() -> ColumnProperty: ...
 
 def backref(name, **kwargs): ...
-def deferred(*columns, **kw): ...
+_T = TypeVar('_T')
+
+def deferred(column: Column[_T], *columns: Column[Any], group: Optional[str] = ...,
+             **kw: Any) -> ColumnProperty: ...
 
 mapper = Mapper
 synonym = SynonymProperty
@@ -64,27 +89,6 @@ comparable_property = ComparableProperty
 def compile_mappers(): ...
 def clear_mappers(): ...
 
-# TODO: these are function "aliases"
-joinedload: Any = ...
-joinedload_all: Any = ...
-contains_eager: Any = ...
-defer: Any = ...
-undefer: Any = ...
-undefer_group: Any = ...
-with_expression: Any = ...
-load_only: Any = ...
-lazyload: Any = ...
-lazyload_all: Any = ...
-subqueryload: Any = ...
-subqueryload_all: Any = ...
-selectinload: Any = ...
-selectinload_all: Any = ...
-immediateload: Any = ...
-noload: Any = ...
-raiseload: Any = ...
-defaultload: Any = ...
-selectin_polymorphic: Any = ...
-
 def eagerload(*args, **kwargs): ...
 def eagerload_all(*args, **kwargs): ...
 
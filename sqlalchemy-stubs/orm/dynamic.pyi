@@ -1,8 +1,10 @@
-from typing import Any, Optional
+from typing import Any, Optional, Generic, TypeVar, Iterator, Iterable, List, overload
 from . import strategies
 from . import attributes
 from .query import Query as Query
 
+_T = TypeVar('_T')
+
 class DynaLoader(strategies.AbstractRelationshipLoader):
     is_class_level: bool = ...
     def init_class_attribute(self, mapper): ...
@@ -31,20 +33,23 @@ class DynamicAttributeImpl(attributes.AttributeImpl):
     def remove(self, state, dict_, value, initiator, passive: Any = ...): ...
     def pop(self, state, dict_, value, initiator, passive: Any = ...): ...
 
-class AppenderMixin(object):
+class AppenderMixin(Generic[_T]):
     query_class: Any = ...
     instance: Any = ...
     attr: Any = ...
     def __init__(self, attr, state) -> None: ...
     session: Any = ...
-    def __iter__(self): ...
-    def __getitem__(self, index): ...
-    def count(self): ...
-    def extend(self, iterator): ...
-    def append(self, item): ...
-    def remove(self, item): ...
+    def __iter__(self) -> Iterator[_T]: ...
+    @overload
+    def __getitem__(self, index: int) -> _T: ...
+    @overload
+    def __getitem__(self, index: slice) -> List[_T]: ...
+    def count(self) -> int: ...
+    def extend(self, iterator: Iterable[_T]) -> None: ...
+    def append(self, item: _T) -> None: ...
+    def remove(self, item: _T) -> None: ...
 
-class AppenderQuery(AppenderMixin, Query): ...
+class AppenderQuery(AppenderMixin[_T], Query[_T]): ...
 
 def mixin_user_query(cls): ...
 
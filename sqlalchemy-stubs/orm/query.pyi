@@ -8,6 +8,9 @@ from .session import Session
 
 _T = TypeVar('_T')
 _Q = TypeVar('_Q', bound="Query")
+_L = TypeVar('_L', contravariant=True)
+_R = TypeVar('_R', covariant=True)
+_D = TypeVar('_D', covariant=True)
 
 
 class Query(Generic[_T]):
@@ -33,23 +36,23 @@ class Query(Generic[_T]):
                          polymorphic_on: Optional[Any] = ...): ...
     def yield_per(self: _Q, count: int) -> _Q: ...
     def get(self, ident) -> Optional[_T]: ...
-    def correlate(self, *args): ...
+    def correlate(self: _Q, *args) -> _Q: ...
     def autoflush(self: _Q, setting: bool) -> _Q: ...
     def populate_existing(self: _Q) -> _Q: ...
-    def with_parent(self, instance, property: Optional[Any] = ...): ...
-    def add_entity(self, entity, alias: Optional[Any] = ...): ...
+    def with_parent(self: _Q, instance, property: Optional[Any] = ...) -> _Q: ...
+    def add_entity(self, entity, alias: Optional[Any] = ...) -> Query[Any]: ...
     def with_session(self: _Q, session: Optional[Session]) -> _Q: ...
     def from_self(self, *entities): ...
-    def values(self, *columns): ...
+    def values(self, *columns) -> Iterator[Any]: ...
     def value(self, column): ...
-    def with_entities(self, *entities): ...
-    def add_columns(self, *column): ...
-    def add_column(self, column): ...
-    def options(self: _Q, *args) -> _Q: ...
+    def with_entities(self, *entities) -> Query[Any]: ...
+    def add_columns(self, *column) -> Query[Any]: ...
+    def add_column(self, column) -> Query[Any]: ...
+    def options(self: _Q, *args: Any) -> _Q: ...
     def with_transformation(self, fn): ...
-    def with_hint(self, selectable, text, dialect_name: str = ...): ...
-    def with_statement_hint(self, text, dialect_name: str = ...): ...
-    def execution_options(self, **kwargs): ...
+    def with_hint(self: _Q, selectable, text, dialect_name: str = ...) -> _Q: ...
+    def with_statement_hint(self: _Q, text, dialect_name: str = ...) -> _Q: ...
+    def execution_options(self: _Q, **kwargs) -> _Q: ...
     def with_lockmode(self, mode): ...
     def with_for_update(self: _Q, read: bool = ..., nowait: bool = ..., of: Optional[Any] = ...,
                         skip_locked: bool = ..., key_share: bool = ...) -> _Q: ...
@@ -65,18 +68,18 @@ class Query(Generic[_T]):
     def intersect_all(self, *q): ...
     def except_(self, *q): ...
     def except_all(self, *q): ...
-    def join(self, *props, **kwargs): ...
-    def outerjoin(self, *props, **kwargs): ...
-    def reset_joinpoint(self): ...
-    def select_from(self, *from_obj): ...
-    def select_entity_from(self, from_obj): ...
+    def join(self: _Q, *props, **kwargs) -> _Q: ...
+    def outerjoin(self: _Q, *props, **kwargs) -> _Q: ...
+    def reset_joinpoint(self: _Q) -> _Q: ...
+    def select_from(self: _Q, *from_obj) -> _Q: ...
+    def select_entity_from(self: _Q, from_obj) -> _Q: ...
     def __getitem__(self, item): ...
     def slice(self: _Q, start: Optional[int], stop: Optional[int]) -> _Q: ...
     def limit(self: _Q, limit: Optional[int]) -> _Q: ...
     def offset(self: _Q, offset: Optional[int]) -> _Q: ...
-    def distinct(self, *criterion): ...
-    def prefix_with(self, *prefixes): ...
-    def suffix_with(self, *suffixes): ...
+    def distinct(self: _Q, *criterion) -> _Q: ...
+    def prefix_with(self: _Q, *prefixes) -> _Q: ...
+    def suffix_with(self: _Q, *suffixes) -> _Q: ...
     def all(self) -> List[_T]: ...
     def from_statement(self, statement): ...
     def first(self) -> Optional[_T]: ...
@@ -93,6 +96,15 @@ class Query(Generic[_T]):
     def delete(self, synchronize_session: Union[bool, str] = ...) -> int: ...
     def update(self, values, synchronize_session: Union[bool, str] = ..., update_args: Optional[Any] = ...): ...
 
+# This doesn't exist at runtime. The plugin uses it as the type of queries with
+# loader options, to record relationship paths that are eagerly loaded (_L), that
+# raise on access (_R), and columns that are not loaded (_D), as unions of literal
+# strings. _L is contravariant, so that e.g. a query that loads more relationships
+# can be used instead of one that loads fewer of them, and _R and _D are covariant,
+# so that a query where fewer relationships raise (or fewer columns are not loaded)
+# can be used instead of one where more of them do.
+class _LoadedQuery(Query[_T], Generic[_T, _L, _R, _D]): ...
+
 class LockmodeArg(ForUpdateArg):
     @classmethod
     def parse_legacy_query(self, mode): ...
@@ -2,6 +2,8 @@ from typing import Any, Optional, Tuple, Type, TypeVar, overload
 
 from sqlalchemy import Column
 from sqlalchemy.orm.query import Query
+from sqlalchemy.engine.result import _TypedResultProxy
+from sqlalchemy.sql.selectable import _TypedSelect
 
 class _SessionClassMethods(object):
     @classmethod
@@ -28,6 +30,7 @@ class SessionTransaction(object):
     def __exit__(self, type, value, traceback): ...
 
 _T = TypeVar("_T")
+_CT = TypeVar("_CT")
 
 class Session(_SessionClassMethods):
     public_methods: Any = ...
@@ -55,6 +58,10 @@ class Session(_SessionClassMethods):
     def connection(self, mapper: Optional[Any] = ..., clause: Optional[Any] = ...,
                    bind: Optional[Any] = ..., close_with_result: bool = ...,
                    execution_options: Optional[Any] = ..., **kw): ...
+    @overload
+    def execute(self, clause: _TypedSelect[_CT], params: Optional[Any] = ...,
+                mapper: Optional[Any] = ..., bind: Optional[Any] = ..., **kw: Any) -> _TypedResultProxy[_CT]: ...
+    @overload
     def execute(self, clause, params: Optional[Any] = ...,
                 mapper: Optional[Any] = ..., bind: Optional[Any] = ..., **kw): ...
     def scalar(self, clause, params: Optional[Any] = ...,
@@ -1,6 +1,13 @@
-from typing import Any, Optional
+from typing import Any, Optional, Union
+from .attributes import QueryableAttribute
 from .interfaces import MapperOption
+from .relationships import RelationshipProperty
 from ..sql.base import Generative
+from ..sql.schema import Column
+
+# Attributes can be given as class attributes, or as strings (names, paths, or '*').
+_RelationshipKey = Union[str, RelationshipProperty[Any], QueryableAttribute]
+_ColumnKey = Union[str, Column[Any], QueryableAttribute]
 
 class Load(Generative, MapperOption):
     path: Any = ...
@@ -16,6 +23,21 @@ class Load(Generative, MapperOption):
     def process_query_conditionally(self, query): ...
     def set_relationship_strategy(self, attr, strategy, propagate_to_loaders: bool = ...): ...
     def set_column_strategy(self, attrs, strategy, opts: Optional[Any] = ..., opts_only: bool = ...): ...
+    def contains_eager(self, attr: _RelationshipKey, alias: Optional[Any] = ...) -> Load: ...
+    def load_only(self, *attrs: _ColumnKey) -> Load: ...
+    def joinedload(self, attr: _RelationshipKey, innerjoin: Optional[Any] = ...) -> Load: ...
+    def subqueryload(self, attr: _RelationshipKey) -> Load: ...
+    def selectinload(self, attr: _RelationshipKey) -> Load: ...
+    def lazyload(self, attr: _RelationshipKey) -> Load: ...
+    def immediateload(self, attr: _RelationshipKey) -> Load: ...
+    def noload(self, attr: _RelationshipKey) -> Load: ...
+    def raiseload(self, attr: _RelationshipKey, sql_only: bool = ...) -> Load: ...
+    def defaultload(self, attr: _RelationshipKey) -> Load: ...
+    def defer(self, key: _ColumnKey) -> Load: ...
+    def undefer(self, key: _ColumnKey) -> Load: ...
+    def undefer_group(self, name: str) -> Load: ...
+    def with_expression(self, key: _ColumnKey, expression: Any) -> Load: ...
+    def selectin_polymorphic(self, classes: Any) -> Load: ...
 
 class _UnboundLoad(Load):
     path: Any = ...
@@ -28,18 +50,22 @@ class loader_option(object):
     fn: Any = ...
     def __call__(self, fn): ...
 
-def contains_eager(loadopt, attr, alias: Optional[Any] = ...): ...
-def load_only(loadopt, *attrs): ...
-def joinedload(loadopt, attr, innerjoin: Optional[Any] = ...): ...
-def joinedload_all(*keys, **kw): ...
-def subqueryload(loadopt, attr): ...
-def subqueryload_all(*keys): ...
-def lazyload(loadopt, attr): ...
-def lazyload_all(*keys): ...
-def immediateload(loadopt, attr): ...
-def noload(loadopt, attr): ...
-def raiseload(loadopt, attr, sql_only: bool = ...): ...
-def defaultload(loadopt, attr): ...
-def defer(loadopt, key): ...
-def undefer(loadopt, key): ...
-def undefer_group(loadopt, name): ...
+def contains_eager(*keys: _RelationshipKey, **kw: Any) -> Load: ...
+def load_only(*attrs: _ColumnKey) -> Load: ...
+def joinedload(*keys: _RelationshipKey, **kw: Any) -> Load: ...
+def joinedload_all(*keys: _RelationshipKey, **kw: Any) -> Load: ...
+def subqueryload(*keys: _RelationshipKey) -> Load: ...
+def subqueryload_all(*keys: _RelationshipKey) -> Load: ...
+def selectinload(*keys: _RelationshipKey) -> Load: ...
+def selectinload_all(*keys: _RelationshipKey) -> Load: ...
+def lazyload(*keys: _RelationshipKey) -> Load: ...
+def lazyload_all(*keys: _RelationshipKey) -> Load: ...
+def immediateload(*keys: _RelationshipKey) -> Load: ...
+def noload(*keys: _RelationshipKey) -> Load: ...
+def raiseload(*keys: _RelationshipKey, **kw: Any) -> Load: ...
+def defaultload(*keys: _RelationshipKey) -> Load: ...
+def defer(key: _ColumnKey, *addl_attrs: _ColumnKey) -> Load: ...
+def undefer(key: _ColumnKey, *addl_attrs: _ColumnKey) -> Load: ...
+def undefer_group(name: str) -> Load: ...
+def with_expression(key: _ColumnKey, expression: Any) -> Load: ...
+def selectin_polymorphic(base_cls: Any, classes: Any) -> Load: ...
@@ -1,4 +1,5 @@
-from typing import Any, Optional, Deque
+from typing import Any, Callable, List, Optional, Deque, Union
+from typing_extensions import Literal
 from . import log
 
 proxies: Any = ...
@@ -10,12 +11,16 @@ reset_rollback: Any = ...
 reset_commit: Any = ...
 reset_none: Any = ...
 
+_ResetOnReturn = Optional[Union[bool, Literal['rollback', 'commit']]]
+
 class Pool(log.Identified):
     logging_name: str = ...
     echo: Any
-    def __init__(self, creator, recycle: int = ..., echo: Optional[Any] = ..., use_threadlocal: bool = ...,
-                 logging_name: Optional[Any] = ..., reset_on_return: bool = ..., listeners: Optional[Any] = ...,
-                 events: Optional[Any] = ..., dialect: Optional[Any] = ...,
+    def __init__(self, creator: Callable[..., Any], recycle: int = ...,
+                 echo: Optional[Union[bool, Literal['debug']]] = ..., use_threadlocal: bool = ...,
+                 logging_name: Optional[str] = ..., reset_on_return: _ResetOnReturn = ...,
+                 listeners: Optional[List[Any]] = ..., events: Optional[List[Any]] = ...,
+                 dialect: Optional[Any] = ..., pre_ping: bool = ...,
                  _dispatch: Optional[Any] = ...) -> None: ...
     def add_listener(self, listener): ...
     def unique_connection(self): ...
@@ -26,14 +31,22 @@ class Pool(log.Identified):
 
 class SingletonThreadPool(Pool):
     size: int = ...
-    def __init__(self, creator, pool_size: int = ..., **kw) -> None: ...
+    def __init__(self, creator: Callable[..., Any], pool_size: int = ..., recycle: int = ...,
+                 echo: Optional[Union[bool, Literal['debug']]] = ..., use_threadlocal: bool = ...,
+                 logging_name: Optional[str] = ..., reset_on_return: _ResetOnReturn = ...,
+                 listeners: Optional[List[Any]] = ..., events: Optional[List[Any]] = ...,
+                 dialect: Optional[Any] = ..., pre_ping: bool = ...) -> None: ...
     def recreate(self): ...
     def dispose(self): ...
     def status(self): ...
 
 class QueuePool(Pool):
-    def __init__(self, creator, pool_size: int = ..., max_overflow: int = ...,
-                 timeout: int = ..., **kw) -> None: ...
+    def __init__(self, creator: Callable[..., Any], pool_size: int = ..., max_overflow: int = ...,
+                 timeout: float = ..., use_lifo: bool = ..., recycle: int = ...,
+                 echo: Optional[Union[bool, Literal['debug']]] = ..., use_threadlocal: bool = ...,
+                 logging_name: Optional[str] = ..., reset_on_return: _ResetOnReturn = ...,
+                 listeners: Optional[List[Any]] = ..., events: Optional[List[Any]] = ...,
+                 dialect: Optional[Any] = ..., pre_ping: bool = ...) -> None: ...
     def recreate(self): ...
     def dispose(self): ...
     def status(self): ...
@@ -54,7 +67,6 @@ class StaticPool(Pool):
     def recreate(self): ...
 
 class AssertionPool(Pool):
-    def __init__(self, *args, **kw) -> None: ...
     def status(self): ...
     def dispose(self): ...
     def recreate(self): ...
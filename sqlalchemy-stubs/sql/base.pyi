@@ -1,4 +1,6 @@
-from typing import Any, Optional, Union, TypeVar, NoReturn, Iterable, List, Dict, Iterator, MutableMapping, Sequence
+from typing import (
+    Any, Optional, Union, TypeVar, Generic, NoReturn, Iterable, List, Dict, Iterator, MutableMapping, Sequence
+)
 from sqlalchemy import util
 from .visitors import ClauseVisitor as ClauseVisitor
 from .schema import Column
@@ -74,6 +76,14 @@ class ColumnCollection(util.OrderedProperties[Column[Any]]):
 class ImmutableColumnCollection(util.ImmutableProperties[Column[Any]], ColumnCollection):
     def __init__(self, data: Dict[str, Any], all_columns: Sequence[Column[Any]]) -> None: ...
 
+_CT = TypeVar('_CT', covariant=True)
+
+# This doesn't exist at runtime. The plugin uses it as the type of columns of tables
+# defined with Table(...), to record types of columns by name (_CT is a TypedDict).
+class _TypedColumns(ImmutableColumnCollection, Generic[_CT]):
+    def __getattr__(self, key: str) -> Column[Any]: ...
+    def __getitem__(self, key: str) -> Column[Any]: ...
+
 class ColumnSet(util.ordered_column_set[ColumnElement[Any]]):
     def contains_column(self, col: ColumnElement[Any]) -> bool: ...
     def extend(self, cols: Iterable[ColumnElement[Any]]) -> None: ...
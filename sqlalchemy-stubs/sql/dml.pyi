@@ -1,4 +1,4 @@
-from typing import Any, Optional, Union, TypeVar, Iterable, Tuple
+from typing import Any, Optional, Union, TypeVar, Iterable, Tuple, Generic
 from .base import Executable as Executable, DialectKWArgs as DialectKWArgs
 from .elements import ClauseElement as ClauseElement, ColumnElement, TextClause
 from .selectable import HasPrefixes as HasPrefixes, HasCTE as HasCTE, TableClause, Selectable
@@ -41,6 +41,12 @@ class Insert(ValuesBase):
     def from_select(self: _I, names: Iterable[Union[str, Column[Any]]], select: Union[str, Selectable],
                     include_defaults: bool = ...) -> _I: ...
 
+_CT = TypeVar('_CT', covariant=True)
+
+# This doesn't exist at runtime. The plugin uses it as the type of inserts into tables
+# defined with Table(...), to check values given to execute() (_CT is a TypedDict).
+class _TypedInsert(Insert, Generic[_CT]): ...
+
 _U = TypeVar('_U', bound=Update)
 
 class Update(ValuesBase):
@@ -112,9 +112,11 @@ class sum(ReturnTypeFromArgs[Any]): ...
 
 class now(GenericFunction[datetime]): ...
 
-class concat(GenericFunction[Optional[Text]]): ...
+class concat(GenericFunction[Optional[Text]]):
+    def __init__(self, *args: Union[Optional[Text], ColumnElement[Any]], **kwargs: Any) -> None: ...
 
-class char_length(GenericFunction[int]): ...
+class char_length(GenericFunction[int]):
+    def __init__(self, arg: Union[Text, ColumnElement[Any]], **kwargs: Any) -> None: ...
 
 class random(GenericFunction[_T]): ...
 
@@ -3,18 +3,20 @@ from typing import (
     Callable, Iterable, Iterator, overload
 )
 from . import visitors, functions
-from .base import SchemaEventTarget as SchemaEventTarget, DialectKWArgs as DialectKWArgs, ColumnCollection
+from .base import SchemaEventTarget as SchemaEventTarget, DialectKWArgs as DialectKWArgs, ColumnCollection, _TypedColumns
 from .elements import ColumnClause as ColumnClause, TextClause, ColumnElement
-from .selectable import TableClause as TableClause
+from .selectable import TableClause as TableClause, _TypedSelect
 from .type_api import TypeEngine
 from .. import util
 from ..engine import Engine, Connection, Connectable
 from ..engine.url import URL
 from .compiler import DDLCompiler
+from .dml import _TypedInsert
 from .expression import FunctionElement
 import threading
 
 _T = TypeVar('_T')
+_CT = TypeVar('_CT', covariant=True)
 
 RETAIN_SCHEMA: util.symbol = ...
 BLANK_SCHEMA: util.symbol = ...
@@ -42,7 +44,8 @@ class Table(DialectKWArgs, SchemaItem, TableClause):  # type: ignore
     def __new__(cls, *args, **kw): ...
     @property
     def quote_schema(self) -> Optional[bool]: ...
-    def __init__(self, name: str, metadata: MetaData, *args: Any, autoload: bool = ..., autoload_replace: bool = ...,
+    # Not "*args: Any", so that types of columns given here are inferred precisely.
+    def __init__(self, name: str, metadata: MetaData, *args: object, autoload: bool = ..., autoload_replace: bool = ...,
                  autoload_with: Union[Engine, Connection] = ..., extend_existing: bool = ..., implicit_returning: bool = ...,
                  include_columns: SequenceType[str] = ..., info: Mapping[str, Any] = ..., keep_existing: bool = ...,
                  listeners: SequenceType[Tuple[str, Callable[..., Any]]] = ..., mustexist: bool = ...,
@@ -66,6 +69,17 @@ class Table(DialectKWArgs, SchemaItem, TableClause):  # type: ignore
                    referred_schema_fn: Optional[Callable[[Table, str, ForeignKeyConstraint, str], str]] = ...,
                    name: Optional[str] = ...) -> Table: ...
 
+# This doesn't exist at runtime. The plugin uses it as the type of Table(...) definitions
+# with columns, to record types of columns by name (_CT is a TypedDict).
+class _TypedTable(Table, Generic[_CT]):
+    c: _TypedColumns[_CT]
+    @property
+    def columns(self) -> _TypedColumns[_CT]: ...
+    def select(self, whereclause: Optional[Union[str, bool, visitors.Visitable]] = ...,
+               **params: Any) -> _TypedSelect[_CT]: ...
+    def insert(self, values: Union[Mapping[Any, Any], SequenceType[Any]] = ..., inline: bool = ...,
+               **kwargs: Any) -> _TypedInsert[_CT]: ...
+
 _C = TypeVar('_C', bound=Column)
 
 class Column(SchemaItem, ColumnClause[_T]):
@@ -1,4 +1,6 @@
-from typing import Any, Optional, Union, TypeVar, List, Iterable, Sequence, Mapping, Set, Tuple, Type, overload
+from typing import (
+    Any, Optional, Union, TypeVar, Generic, List, Iterable, Sequence, Mapping, Set, Tuple, Type, overload
+)
 from .elements import (
     ClauseElement as ClauseElement, Grouping as Grouping, UnaryExpression as UnaryExpression, ColumnElement, ColumnClause,
     TextClause, Label, BindParameter
@@ -294,6 +296,17 @@ class Select(HasPrefixes, HasSuffixes, GenerativeSelect):
     @property
     def bind(self) -> Optional[Union[Engine, Connection]]: ...
 
+_CT = TypeVar('_CT', covariant=True)
+
+# This doesn't exist at runtime. The plugin uses it as the type of select() from
+# columns with known names, to record types of result columns by name (_CT is
+# a TypedDict). Methods that change result columns return a plain Select.
+class _TypedSelect(Select, Generic[_CT]):
+    def apply_labels(self) -> Select: ...  # type: ignore[override]
+    def column(self, column: ColumnElement[Any]) -> Select: ...  # type: ignore[override]
+    def reduce_columns(self, only_synonyms: bool = ...) -> Select: ...  # type: ignore[override]
+    def with_only_columns(self, columns: Iterable[ColumnElement[Any]]) -> Select: ...  # type: ignore[override]
+
 _SS = TypeVar('_SS', bound=ScalarSelect)
 
 class ScalarSelect(Generative, Grouping[_T]):
@@ -1,26 +1,48 @@
 from mypy.mro import calculate_mro, MroError
 from mypy.plugin import (
-    Plugin, FunctionContext, ClassDefContext, DynamicClassDefContext,
-    SemanticAnalyzerPluginInterface
+    Plugin, FunctionContext, MethodContext, AttributeContext, ClassDefContext,
+    DynamicClassDefContext, SemanticAnalyzerPluginInterface, CheckerPluginInterface,
+    ReportConfigContext, MethodSigContext, FunctionSigContext
 )
 from mypy.plugins.common import add_method
+from mypy.maptype import map_instance_to_supertype
+from mypy.expandtype import expand_type_by_instance
 from mypy.nodes import (
     NameExpr, Expression, StrExpr, TypeInfo, ClassDef, Block, SymbolTable, SymbolTableNode, GDEF,
-    Argument, Var, ARG_STAR2, MDEF, TupleExpr, RefExpr, FuncBase, SymbolNode
+    Argument, Var, ARG_STAR2, MDEF, TupleExpr, RefExpr, FuncBase, SymbolNode, CallExpr,
+    AssignmentStmt, MypyFile, Statement, PlaceholderNode, TypeAlias, FuncDef, ARG_POS,
+    ARG_NAMED_OPT, MemberExpr, ForStmt, GeneratorExpr, DictionaryComprehension, Node, ListExpr,
+    IndexExpr, IntExpr, UnaryExpr, Context, DictExpr, ListComprehension, ComparisonExpr, OpExpr,
+    AwaitExpr, LambdaExpr, ARG_NAMED, Decorator, FloatExpr
 )
+from mypy.traverser import TraverserVisitor
+from mypy.server.trigger import make_wildcard_trigger
+from mypy.build import PRI_MED
+from mypy.errorcodes import ErrorCode
 from mypy.types import (
-    UnionType, NoneTyp, Instance, Type, AnyType, TypeOfAny, UninhabitedType, CallableType
+    UnionType, NoneTyp, Instance, Type, AnyType, TypeOfAny, UninhabitedType, CallableType,
+    LiteralType, TupleType, TypeType, FunctionLike, TypedDictType, UnboundType
 )
+from mypy.typeops import make_simplified_union
 from mypy.typevars import fill_typevars_with_any
+from mypy.options import Options
 
 try:
     from mypy.types import get_proper_type
 except ImportError:
     get_proper_type = lambda x: x
 
-from typing import Optional, Callable, Dict, List, TypeVar, Union
-
-MYPY = False  # we should support Python 3.5.1 and cases where typing_extensions is not available.
+import atexit
+import configparser
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+from functools import partial
+from typing import Any, Optional, Callable, Dict, List, Set, Tuple, TypeVar, Union
+
+MYPY = False  # we should support cases where typing_extensions is not available.
 if MYPY:
     from typing_extensions import Final, Type as TypingType
 
@@ -32,6 +54,144 @@ CLAUSE_ELEMENT_NAME = 'sqlalchemy.sql.elements.ClauseElement'  # type: Final
 COLUMN_ELEMENT_NAME = 'sqlalchemy.sql.elements.ColumnElement'  # type: Final
 GROUPING_NAME = 'sqlalchemy.sql.elements.Grouping'  # type: Final
 RELATIONSHIP_NAME = 'sqlalchemy.orm.relationships.RelationshipProperty'  # type: Final
+COLUMN_PROPERTY_NAME = 'sqlalchemy.orm.properties.ColumnProperty'  # type: Final
+DEFERRED_NAME = 'sqlalchemy.orm.deferred'  # type: Final
+DECLARED_ATTR_NAME = 'sqlalchemy.ext.declarative.api.declared_attr'  # type: Final
+TYPE_ENGINE_NAME = 'sqlalchemy.sql.type_api.TypeEngine'  # type: Final
+TABLE_NAME = 'sqlalchemy.sql.schema.Table'  # type: Final
+METADATA_NAME = 'sqlalchemy.sql.schema.MetaData'  # type: Final
+QUERY_NAME = 'sqlalchemy.orm.query.Query'  # type: Final
+SESSION_NAME = 'sqlalchemy.orm.session.Session'  # type: Final
+CONNECTION_NAME = 'sqlalchemy.engine.base.Connection'  # type: Final
+ENGINE_NAME = 'sqlalchemy.engine.base.Engine'  # type: Final
+SELECT_NAME = 'sqlalchemy.sql.selectable.Select'  # type: Final
+TYPED_TABLE_NAME = 'sqlalchemy.sql.schema._TypedTable'  # type: Final
+TYPED_COLUMNS_NAME = 'sqlalchemy.sql.base._TypedColumns'  # type: Final
+TYPED_SELECT_NAME = 'sqlalchemy.sql.selectable._TypedSelect'  # type: Final
+TYPED_INSERT_NAME = 'sqlalchemy.sql.dml._TypedInsert'  # type: Final
+TYPED_RESULT_NAME = 'sqlalchemy.engine.result._TypedResultProxy'  # type: Final
+TYPED_ROW_NAME = 'sqlalchemy.engine.result._TypedRow'  # type: Final
+STREAMING_RESULT_NAMES = {
+    'sqlalchemy.engine.result._StreamingResultProxy',
+    'sqlalchemy.engine.result._TypedStreamingResultProxy',
+}  # type: Final
+LOADED_QUERY_NAME = 'sqlalchemy.orm.query._LoadedQuery'  # type: Final
+ASYNC_SESSION_NAME = 'sqlalchemy.ext.asyncio.session.AsyncSession'  # type: Final
+ASYNC_CONNECTION_NAME = 'sqlalchemy.ext.asyncio.engine.AsyncConnection'  # type: Final
+TYPED_ASYNC_RESULT_NAME = 'sqlalchemy.ext.asyncio.result._TypedAsyncResult'  # type: Final
+CREATE_ENGINE_NAME = 'sqlalchemy.engine.create_engine'  # type: Final
+QUEUE_POOL_NAME = 'sqlalchemy.pool.QueuePool'  # type: Final
+SINGLETON_POOL_NAME = 'sqlalchemy.pool.SingletonThreadPool'  # type: Final
+NULL_POOL_NAME = 'sqlalchemy.pool.NullPool'  # type: Final
+APPENDER_QUERY_NAME = 'sqlalchemy.orm.dynamic.AppenderQuery'  # type: Final
+RELATIONSHIP_MODULE = 'sqlalchemy.orm.relationships'  # type: Final
+DYNAMIC_MODULE = 'sqlalchemy.orm.dynamic'  # type: Final
+
+# Loader options that load a relationship together with the query results
+# (or never load it), so that accessing it doesn't emit a query.
+EAGER_LOADERS = {
+    'joinedload', 'joinedload_all', 'selectinload', 'selectinload_all', 'subqueryload',
+    'subqueryload_all', 'contains_eager', 'immediateload', 'noload',
+}  # type: Final
+# Loader options that make a relationship load on access, i.e. the default.
+LAZY_LOADERS = {'lazyload', 'lazyload_all'}  # type: Final
+# Loader options that don't change how relationships at the given path are loaded.
+OTHER_LOADERS = {
+    'defaultload', 'defer', 'undefer', 'undefer_group', 'load_only', 'with_expression',
+    'selectin_polymorphic',
+}  # type: Final
+# Loader options that load collections together with query results, this breaks (or
+# defeats the purpose of) 'yield_per()'.
+ROW_EAGER_LOADERS = {
+    'joinedload', 'joinedload_all', 'subqueryload', 'subqueryload_all', 'contains_eager',
+}  # type: Final
+# Loader options for columns, these are tracked only for columns of query results.
+COLUMN_LOADERS = {'defer', 'undefer', 'undefer_group', 'load_only'}  # type: Final
+# Query methods that return a single result.
+SINGLE_RESULT_METHODS = {'first', 'one', 'one_or_none', 'get'}  # type: Final
+# AsyncSession methods that load models, relationships of these can't be loaded lazily.
+ASYNC_LOADING_METHODS = {'get', 'run_sync'}  # type: Final
+# Query methods with conditions on columns that are checked for missing indexes.
+INDEX_CHECKED_METHODS = {'filter', 'filter_by', 'join', 'outerjoin'}  # type: Final
+# Functions that combine conditions.
+CONJUNCTIONS = {'and_', 'or_', 'not_'}  # type: Final
+# Arguments of create_engine() that configure the pool, these can't be used with 'pool=...'.
+POOL_ARGUMENTS = {
+    'poolclass', 'pool_logging_name', 'pool_pre_ping', 'pool_size', 'pool_recycle',
+    'pool_reset_on_return', 'pool_timeout', 'pool_use_lifo', 'max_overflow', 'echo_pool',
+}  # type: Final
+# Pool arguments of create_engine() supported only by some pool classes (and subclasses).
+POOL_CLASS_ARGUMENTS = {
+    'pool_size': (QUEUE_POOL_NAME, SINGLETON_POOL_NAME),
+    'max_overflow': (QUEUE_POOL_NAME,),
+    'pool_timeout': (QUEUE_POOL_NAME,),
+    'pool_use_lifo': (QUEUE_POOL_NAME,),
+}  # type: Final
+# Default drivers of built-in dialects, arguments of other dialects are not checked.
+DEFAULT_DRIVERS = {
+    'postgresql': 'psycopg2', 'mysql': 'mysqldb', 'sqlite': 'pysqlite', 'oracle': 'cx_oracle',
+    'mssql': 'pyodbc', 'firebird': 'fdb', 'sybase': 'pyodbc',
+}  # type: Final
+# Arguments of create_engine() supported only by some dialects (or dialect+driver).
+DIALECT_ARGUMENTS = {
+    'use_native_hstore': ('postgresql+psycopg2',),
+    'executemany_mode': ('postgresql+psycopg2',),
+    'executemany_batch_page_size': ('postgresql+psycopg2',),
+    'executemany_values_page_size': ('postgresql+psycopg2',),
+    'use_batch_mode': ('postgresql+psycopg2',),
+    'native_datetime': ('sqlite',),
+    'use_ansi': ('oracle',),
+    'optimize_limits': ('oracle',),
+    'use_binds_for_limits': ('oracle',),
+    'use_nchar_for_unicode': ('oracle',),
+    'exclude_tablespaces': ('oracle',),
+    'auto_convert_lobs': ('oracle+cx_oracle',),
+    'coerce_to_unicode': ('oracle+cx_oracle',),
+    'coerce_to_decimal': ('oracle+cx_oracle',),
+    'arraysize': ('oracle+cx_oracle',),
+    'threaded': ('oracle+cx_oracle',),
+    'deprecate_large_types': ('mssql',),
+    'legacy_schema_aliasing': ('mssql',),
+    'use_scope_identity': ('mssql',),
+    'fast_executemany': ('mssql+pyodbc',),
+}  # type: Final
+# Values of 'lazy' argument of relationship() that load it on first access.
+LAZY_LOADING = ('select', True)  # type: Final
+
+LAZY_LOAD_IN_LOOP = ErrorCode(
+    'sqlalchemy-n-plus-one', 'Check for lazy relationships loaded in loops over query results',
+    'SQLAlchemy'
+)  # type: Final
+RAISE_ON_ACCESS = ErrorCode(
+    'sqlalchemy-raiseload', 'Check for access to relationships disabled by raiseload()',
+    'SQLAlchemy'
+)  # type: Final
+DEFERRED_LOAD = ErrorCode(
+    'sqlalchemy-deferred-load', 'Check for access to columns not loaded by a query',
+    'SQLAlchemy'
+)  # type: Final
+MISSING_INDEX = ErrorCode(
+    'sqlalchemy-missing-index', 'Check for queries filtering on columns without an index',
+    'SQLAlchemy'
+)  # type: Final
+FETCHALL_STREAMING = ErrorCode(
+    'sqlalchemy-stream-fetchall', 'Check for fetchall() on results with stream_results=True',
+    'SQLAlchemy'
+)  # type: Final
+ENGINE_ARGUMENT = ErrorCode(
+    'sqlalchemy-engine-argument', 'Check pool and dialect arguments of create_engine()',
+    'SQLAlchemy'
+)  # type: Final
+YIELD_PER_EAGER_LOAD = ErrorCode(
+    'sqlalchemy-yield-per', 'Check for yield_per() with joined or subquery loaded collections',
+    'SQLAlchemy'
+)  # type: Final
+ASYNC_LAZY_LOAD = ErrorCode(
+    'sqlalchemy-async-lazy-load', 'Check for lazy relationships of models loaded with asyncio',
+    'SQLAlchemy'
+)  # type: Final
+
+PROFILE_ENV_VAR = 'SQLMYPY_PROFILE'  # type: Final
 
 
 # See https://github.com/python/mypy/issues/6617 for plugin API updates.
@@ -53,18 +213,377 @@ def shortname(x: Union[FuncBase, SymbolNode]) -> str:
 
 
 def is_declarative(info: TypeInfo) -> bool:
-    """Check if this is a subclass of a declarative base."""
-    if info.mro:
-        for base in info.mro:
-            metadata = base.metadata.get('sqlalchemy')
-            if metadata and metadata.get('declarative_base'):
-                return True
+    """Check if this is a subclass of a declarative base.
+
+    Only positive results are recorded in class metadata, so that MRO of a model
+    is scanned only once. A class that is not (yet) known to be declarative may
+    still become one, for example when its MRO is not ready, or when the base is
+    marked as declarative by a hook that runs later. Metadata is reset when a class
+    is semantically analyzed again (also in daemon mode), so a recorded result is
+    never stale.
+    """
+    metadata = info.metadata.get('sqlalchemy')
+    if metadata and metadata.get('declarative'):
+        return True
+    for base in info.mro:
+        base_metadata = base.metadata.get('sqlalchemy')
+        if base_metadata and base_metadata.get('declarative_base'):
+            info.metadata.setdefault('sqlalchemy', {})['declarative'] = True
+            return True
     return False
 
 
 def set_declarative(info: TypeInfo) -> None:
     """Record given class as a declarative base."""
-    info.metadata.setdefault('sqlalchemy', {})['declarative_base'] = True
+    metadata = info.metadata.setdefault('sqlalchemy', {})
+    metadata['declarative_base'] = True
+    metadata['declarative'] = True
+
+
+class ClassRegistry:
+    """Remember results of symbol lookups done to dispatch plugin hooks.
+
+    Mypy calls get_function_hook() for every function or class called in the program,
+    and get_base_class_hook() for every base class. To avoid a fully qualified lookup
+    every time, we remember the classes found (and the names that are known to be
+    something else, i.e. can never be models). Declarative bases and models are added
+    directly by the hooks that process them. The hooks also use this to find
+    well-known classes like 'Table' or 'list', and to share instances of them.
+
+    Note that we store TypeInfos themselves, not whether they are declarative. This
+    way the answer is always up to date, even if a class is still being analyzed.
+    Every entry also records the symbol table of the module where the name was found.
+    When a module is processed again in daemon mode it gets a new symbol table, so
+    entries for it are looked up again, without any explicit invalidation.
+    """
+    def __init__(self, lookup: Callable[[str], Optional[SymbolTableNode]]) -> None:
+        self.lookup = lookup
+        self.modules = {}  # type: Dict[str, MypyFile]
+        # Class (or None for other names), its module, and the module symbol table.
+        self.classes = {}  # type: Dict[str, Tuple[Optional[TypeInfo], str, Optional[SymbolTable]]]
+        self.instances = {}  # type: Dict[str, Instance]
+        self.paths = {}  # type: Dict[str, str]
+
+    def add(self, name: str, info: Optional[TypeInfo]) -> None:
+        module = self.find_module(name)
+        tree = self.modules.get(module)
+        self.classes[name] = (info, module, tree.names if tree is not None else None)
+
+    def add_class(self, info: TypeInfo) -> None:
+        self.add(fullname(info), info)
+
+    def lookup_class(self, fullname: str) -> Optional[TypeInfo]:
+        """Find a class by its full name, return None if this is not a class."""
+        entry = self.classes.get(fullname)
+        if entry is not None:
+            info, module, names = entry
+            tree = self.modules.get(module)
+            if tree is not None and tree.names is names:
+                return info
+        if fullname.startswith('<'):
+            # Special names like '<list>' used for list displays etc.
+            return None
+        sym = self.lookup(fullname)
+        if sym is None or isinstance(sym.node, PlaceholderNode):
+            # This may still become a class.
+            return None
+        if isinstance(sym.node, TypeInfo):
+            self.add_class(sym.node)
+            return sym.node
+        self.add(fullname, None)
+        return None
+
+    def find_module(self, fullname: str) -> str:
+        """Find the module where a name is defined.
+
+        This is the longest prefix of the name that is a known module. Note that
+        it is not always the prefix without the last component, for example the
+        module of 'mod.Cls.method' is 'mod'.
+        """
+        module = fullname
+        while '.' in module:
+            module = module.rsplit('.', 1)[0]
+            if module in self.modules:
+                break
+        return module
+
+    def find_tree(self, path: str) -> Optional[MypyFile]:
+        """Find the current tree of a module by its path.
+
+        Type checking hooks only know the path of the module being checked.
+        """
+        tree = self.modules.get(self.paths.get(path, ''))
+        if tree is None or tree.path != path:
+            self.paths = {tree.path: module for module, tree in self.modules.items()}
+            tree = self.modules.get(self.paths.get(path, ''))
+        return tree
+
+    def instance(self, fullname: str) -> Type:
+        """Return a shared instance of a non-generic class, or Any if it is not found."""
+        info = self.lookup_class(fullname)
+        if info is None:
+            return AnyType(TypeOfAny.special_form)
+        inst = self.instances.get(fullname)
+        if inst is None or inst.type is not info:
+            inst = self.instances[fullname] = Instance(info, [])
+        return inst
+
+    def literal_union(self, values: List[str]) -> Type:
+        """Return a union of literal types of given strings (or <nothing> if there are none)."""
+        str_info = self.lookup_class('builtins.str')
+        assert str_info is not None, 'builtins.str must be always available'
+        str_type = Instance(str_info, [])
+        return UnionType.make_union([LiteralType(value, str_type) for value in values])
+
+    def list_of(self, item: Type) -> Instance:
+        info = self.lookup_class('builtins.list')
+        assert info is not None, 'builtins.list must be always available'
+        return Instance(info, [item])
+
+    def appender_query_of(self, item: Type) -> Type:
+        info = self.lookup_class(APPENDER_QUERY_NAME)
+        if info is None:
+            return AnyType(TypeOfAny.special_form)
+        return Instance(info, [item])
+
+
+class Loop:
+    """A for statement or a comprehension, with the code executed for every item.
+
+    This is also used for assignments of single query results, like
+    'user = query.first()', with the code following them in the same block.
+    """
+    def __init__(self, index: Expression, body: List[Node]) -> None:
+        self.index = index
+        self.body = body
+
+
+class LoopCollector(TraverserVisitor):
+    """Find all loops in a module, indexed by the iterable expression.
+
+    Also find assignments of single query results, indexed by the call
+    expression. Loops over (and assignments of)
+    awaited calls, like 'await session.get(User, 1)', are indexed by the call.
+    """
+    def __init__(self) -> None:
+        super().__init__()
+        self.loops = {}  # type: Dict[Expression, Loop]
+        self.results = {}  # type: Dict[Expression, Loop]
+
+    def visit_mypy_file(self, o: MypyFile) -> None:
+        self.add_results(o.defs)
+        super().visit_mypy_file(o)
+
+    def visit_block(self, o: Block) -> None:
+        self.add_results(o.body)
+        super().visit_block(o)
+
+    def add_results(self, body: List[Statement]) -> None:
+        for i, stmt in enumerate(body):
+            if not isinstance(stmt, AssignmentStmt) or len(stmt.lvalues) != 1:
+                continue
+            call = stmt.rvalue
+            if isinstance(call, AwaitExpr):
+                call = call.expr
+            if isinstance(call, CallExpr) and isinstance(call.callee, MemberExpr):
+                name = call.callee.name
+                if name in SINGLE_RESULT_METHODS or name in ASYNC_LOADING_METHODS:
+                    self.results[call] = Loop(stmt.lvalues[0], list(body[i + 1:]))
+
+    def visit_for_stmt(self, o: ForStmt) -> None:
+        expr = o.expr.expr if isinstance(o.expr, AwaitExpr) else o.expr
+        self.loops[expr] = Loop(o.index, [o.body])
+        super().visit_for_stmt(o)
+
+    def visit_generator_expr(self, o: GeneratorExpr) -> None:
+        self.add_comprehension(o.indices, o.sequences, o.condlists, [o.left_expr])
+        super().visit_generator_expr(o)
+
+    def visit_dictionary_comprehension(self, o: DictionaryComprehension) -> None:
+        self.add_comprehension(o.indices, o.sequences, o.condlists, [o.key, o.value])
+        super().visit_dictionary_comprehension(o)
+
+    def add_comprehension(self, indices: List[Expression], sequences: List[Expression],
+                          condlists: List[List[Expression]], items: List[Expression]) -> None:
+        for i, sequence in enumerate(sequences):
+            # Everything right of 'for ... in sequence' is evaluated for every item.
+            body = []  # type: List[Node]
+            body.extend(sequences[i + 1:])
+            for conditions in condlists[i:]:
+                body.extend(conditions)
+            body.extend(items)
+            self.loops[sequence] = Loop(indices[i], body)
+
+
+class LoopRegistry:
+    """Loops in modules where lazy relationship loading in loops is checked.
+
+    Modules are given as a list of patterns like in mypy config sections,
+    for example 'app.models', 'app.services.*', or just '*' for all modules.
+    Loops are collected when the first hook needing them runs while a module is
+    type checked, and hooks look up the loop by the iterable expression when the
+    iteration is analyzed. Similarly, columns not loaded by queries are only
+    checked for single query results assigned in these modules. Entries
+    are grouped by module, and collected again when a module gets a new tree
+    (i.e. a new symbol table) in daemon mode.
+    """
+    def __init__(self, patterns: List[str], registry: ClassRegistry) -> None:
+        self.patterns = patterns
+        self.registry = registry
+        self.loops = {}  # type: Dict[Expression, Loop]
+        self.results = {}  # type: Dict[Expression, Loop]
+        self.by_module = {}  # type: Dict[str, List[Expression]]
+        self.collected = {}  # type: Dict[str, SymbolTable]
+
+    def is_checked(self, module: str) -> bool:
+        return matches_patterns(module, self.patterns)
+
+    def collect(self, path: str) -> None:
+        """Find loops in the module with the given path, if not done for its current tree."""
+        file = self.registry.find_tree(path)
+        if file is None:
+            return
+        module = fullname(file)
+        if self.collected.get(module) is file.names:
+            return
+        self.collected[module] = file.names
+        for expr in self.by_module.pop(module, []):
+            self.loops.pop(expr, None)
+            self.results.pop(expr, None)
+        if not self.is_checked(module):
+            return
+        collector = LoopCollector()
+        file.accept(collector)
+        self.loops.update(collector.loops)
+        self.results.update(collector.results)
+        self.by_module[module] = [*collector.loops, *collector.results]
+
+
+class HookProfiler:
+    """Count calls and total time spent in plugin hooks and class lookups.
+
+    This is only used if profiling is enabled: the plugin then replaces its hook
+    dispatch methods with timed wrappers, so that there is no overhead otherwise.
+    Note that times are inclusive, e.g. time of get_function_hook() includes
+    time of the class lookup done by it.
+    """
+    def __init__(self) -> None:
+        self.stats = {}  # type: Dict[str, List[float]]
+
+    def record(self, name: str, start: float) -> None:
+        stats = self.stats.setdefault(name, [0, 0.0])
+        stats[0] += 1
+        stats[1] += time.perf_counter() - start
+
+    def wrap(self, name: str, func: Callable[[Any], T]) -> Callable[[Any], T]:
+        def wrapper(arg: Any) -> T:
+            start = time.perf_counter()
+            try:
+                return func(arg)
+            finally:
+                self.record(name, start)
+        return wrapper
+
+    def wrap_dispatch(self, name: str,
+                      func: Callable[[str], Optional[Callable[[Any], T]]]
+                      ) -> Callable[[str], Optional[Callable[[Any], T]]]:
+        """Wrap a get_xxx_hook() method, and also every hook returned by it."""
+        def wrapper(fullname: str) -> Optional[Callable[[Any], T]]:
+            start = time.perf_counter()
+            try:
+                hook = func(fullname)
+            finally:
+                self.record(name, start)
+            if hook is None:
+                return None
+            # Unwrap partials to get a readable name.
+            return self.wrap(getattr(hook, 'func', hook).__name__, hook)
+        return wrapper
+
+    def as_json(self) -> Dict[str, Any]:
+        return {'hooks': {name: {'calls': calls, 'total_s': total}
+                          for name, (calls, total) in self.stats.items()}}
+
+    def summary(self) -> str:
+        lines = ['sqlmypy profile (times include nested hooks and lookups):',
+                 '{:<40}{:>10}{:>12}{:>14}'.format('name', 'calls', 'total ms', 'per call us')]
+        for name, (calls, total) in sorted(self.stats.items(), key=lambda item: -item[1][1]):
+            lines.append('{:<40}{:>10}{:>12.1f}{:>14.2f}'.format(
+                name, int(calls), total * 1e3, total * 1e6 / calls))
+        return '\n'.join(lines)
+
+    def report(self, output: str) -> None:
+        """Print summary to stderr, or write it as JSON if output file is given."""
+        if output:
+            with open(output, 'w') as f:
+                json.dump(self.as_json(), f, indent=2, sort_keys=True)
+        else:
+            print(self.summary(), file=sys.stderr)
+
+
+def read_plugin_config(options: Options) -> Dict[str, str]:
+    """Read the [sqlmypy] section (or [tool.sqlmypy] in pyproject.toml) of mypy config."""
+    path = options.config_file
+    if path is None or not os.path.exists(path):
+        return {}
+    if path.endswith('.toml'):
+        try:
+            import tomllib  # type: ignore
+        except ImportError:
+            try:
+                import tomli as tomllib  # type: ignore
+            except ImportError:
+                return {}
+        with open(path, 'rb') as f:
+            section = tomllib.load(f).get('tool', {}).get('sqlmypy', {})
+        return {key: str(value) for key, value in section.items()}
+    parser = configparser.ConfigParser()
+    parser.read(path)
+    if not parser.has_section('sqlmypy'):
+        return {}
+    return dict(parser['sqlmypy'])
+
+
+def parse_config_bool(value: str) -> bool:
+    return value.lower() in ('1', 'true', 'yes', 'on')
+
+
+def get_profile_output(config: Dict[str, str]) -> Optional[str]:
+    """Return None if profiling is disabled, '' to print summary, or a JSON file path.
+
+    Profiling can be enabled by 'profile = True' in plugin config (with optional
+    'profile_output = <path>'), or by SQLMYPY_PROFILE environment variable set to 1
+    or to an output path. The environment variable takes precedence, 0 disables profiling.
+    """
+    value = os.environ.get(PROFILE_ENV_VAR)
+    if value is not None:
+        if value in ('', '0'):
+            return None
+        return '' if value == '1' else value
+    if not parse_config_bool(config.get('profile', '')):
+        return None
+    return config.get('profile_output', '')
+
+
+def get_module_patterns(config: Dict[str, str], option: str) -> List[str]:
+    """Return patterns of modules where an opt-in check is enabled.
+
+    These are given as e.g. 'check_n_plus_one = <module patterns>' in plugin config,
+    'True' is the same as '*' (i.e. all modules).
+    """
+    value = config.get(option, '')
+    if parse_config_bool(value):
+        return ['*']
+    return [pattern.strip() for pattern in value.split(',') if pattern.strip()]
+
+
+def matches_patterns(module: str, patterns: List[str]) -> bool:
+    for pattern in patterns:
+        if pattern in ('*', module):
+            return True
+        if pattern.endswith('.*') and (module + '.').startswith(pattern[:-1]):
+            return True
+    return False
 
 
 class BasicSQLAlchemyPlugin(Plugin):
@@ -72,41 +591,262 @@ class BasicSQLAlchemyPlugin(Plugin):
 
     Currently supported functionality:
       * Recognize dynamically defined declarative bases.
-      * Add an __init__() method to models.
+      * Add a precise (or a fallback) __init__() method to models.
       * Provide better types for 'Column's and 'RelationshipProperty's
         using flags 'primary_key', 'nullable', 'uselist', etc.
+      * Infer precise types of queries for multiple entities (models and columns).
+      * Record column types of Table(...) definitions and select() results.
+      * Optionally report fetchall() on results with stream_results=True.
+      * Check create_engine() arguments against the pool class, and the dialect.
+      * Optionally report 'yield_per()' with joined or subquery eager loading of collections.
+      * Report accesses to columns not loaded by queries (in the same modules as N+1 queries).
+      * Report query conditions on columns without an index (opt-in).
+      * Check column values given to bulk_insert_mappings(), bulk_update_mappings(),
+        and to execute() for inserts into tables defined using Table(...).
+      * Optionally report lazy relationships loaded in loops over query results,
+        and lazy relationships of models loaded by 'AsyncSession' (that raise).
+      * Give lambdas passed to 'run_sync()' of async sessions and connections a
+        precise argument type.
     """
+    def __init__(self, options: Options) -> None:
+        super().__init__(options)
+        config = read_plugin_config(options)
+        self.registry = ClassRegistry(self.lookup_fully_qualified)
+        self.loops = None  # type: Optional[LoopRegistry]
+        patterns = get_module_patterns(config, 'check_n_plus_one')
+        if patterns:
+            self.loops = LoopRegistry(patterns, self.registry)
+        self.index_patterns = get_module_patterns(config, 'check_indexes')
+        self.stream_patterns = get_module_patterns(config, 'check_stream_results')
+        self.yield_per_patterns = get_module_patterns(config, 'check_yield_per')
+        # Paths of files checked so far, and their module names.
+        self.path_modules = {}  # type: Dict[str, str]
+        # Results of is_subclass(), with the MRO they were computed from.
+        self.subclasses = {}  # type: Dict[Tuple[str, str], Tuple[List[TypeInfo], bool]]
+        self._decl_info_hook = partial(decl_info_hook, registry=self.registry)
+        self._decl_deco_hook = partial(decl_deco_hook, registry=self.registry)
+        self._add_model_init_hook = partial(add_model_init_hook, registry=self.registry,
+                                            record_loading=bool(patterns))
+        self._relationship_hook = partial(relationship_hook, registry=self.registry)
+        self._table_hook = partial(table_hook, registry=self.registry)
+        self._select_hook = partial(select_hook, registry=self.registry)
+        self._create_engine_hook = partial(create_engine_hook, registry=self.registry)
+        self._query_options_hook = partial(query_options_hook, registry=self.registry,
+                                           check_yield_per=self.is_yield_per_checked)
+        self._lazy_load_hook = partial(lazy_load_hook, loops=self.loops)
+        self._deferred_load_hook = partial(deferred_load_hook, loops=self.loops)
+        self._missing_index_hook = partial(missing_index_hook, is_checked=self.is_index_checked)
+        self._streaming_fetchall_hook = partial(streaming_fetchall_hook,
+                                                is_checked=self.is_stream_checked)
+        self._yield_per_hook = partial(yield_per_hook, is_checked=self.is_yield_per_checked)
+        self._yield_per_options_hook = partial(yield_per_options_hook,
+                                               is_checked=self.is_yield_per_checked)
+        self._async_lazy_load_hook = partial(async_lazy_load_hook, loops=self.loops)
+        self._run_sync_signature_hook = partial(run_sync_signature_hook, registry=self.registry)
+        self.profiler = None  # type: Optional[HookProfiler]
+        output = get_profile_output(config)
+        if output is not None:
+            profiler = self.enable_profiling()
+            # By default mypy exits with os._exit(), skipping atexit callbacks.
+            options.fast_exit = False
+            atexit.register(profiler.report, output)
+
+    def enable_profiling(self) -> HookProfiler:
+        """Replace hook dispatch methods and class lookup with timed versions."""
+        profiler = self.profiler = HookProfiler()
+        for method in ('get_function_hook', 'get_function_signature_hook', 'get_method_hook',
+                       'get_method_signature_hook', 'get_attribute_hook', 'get_dynamic_class_hook',
+                       'get_class_decorator_hook', 'get_base_class_hook'):
+            setattr(self, method, profiler.wrap_dispatch(method, getattr(self, method)))
+        lookup_class = self.lookup_class
+
+        def timed_lookup_class(fullname: str) -> Optional[TypeInfo]:
+            kind = 'cached' if fullname in self.registry.classes else 'symbol table'
+            start = time.perf_counter()
+            try:
+                return lookup_class(fullname)
+            finally:
+                profiler.record('lookup_class ({})'.format(kind), start)
+        setattr(self, 'lookup_class', timed_lookup_class)
+        return profiler
+
+    def set_modules(self, modules: Dict[str, MypyFile]) -> None:
+        super().set_modules(modules)
+        self.registry.modules = modules
+
+    def lookup_class(self, fullname: str) -> Optional[TypeInfo]:
+        """Find a class by its full name, return None if this is not a class."""
+        return self.registry.lookup_class(fullname)
+
+    def is_checked(self, path: str, patterns: List[str]) -> bool:
+        """Check if the module with the given path matches patterns of an opt-in check."""
+        module = self.path_modules.get(path)
+        if module is None:
+            file = self.registry.find_tree(path)
+            if file is None:
+                return False
+            module = self.path_modules[path] = fullname(file)
+        return matches_patterns(module, patterns)
+
+    def is_index_checked(self, path: str) -> bool:
+        """Check if missing indexes are reported in the module with the given path."""
+        return self.is_checked(path, self.index_patterns)
+
+    def is_stream_checked(self, path: str) -> bool:
+        """Check if fetchall() on streaming results is reported in the given module."""
+        return self.is_checked(path, self.stream_patterns)
+
+    def is_yield_per_checked(self, path: str) -> bool:
+        """Check if eager loading with yield_per() is reported in the given module."""
+        return self.is_checked(path, self.yield_per_patterns)
+
     def get_function_hook(self, fullname: str) -> Optional[Callable[[FunctionContext], Type]]:
         if fullname == COLUMN_NAME:
             return column_hook
         if fullname == GROUPING_NAME:
             return grouping_hook
+        if fullname == DEFERRED_NAME:
+            return deferred_hook
         if fullname == RELATIONSHIP_NAME:
-            return relationship_hook
-        sym = self.lookup_fully_qualified(fullname)
-        if sym and isinstance(sym.node, TypeInfo):
-            # May be a model instantiation
-            if is_declarative(sym.node):
+            return self._relationship_hook
+        if fullname == TABLE_NAME:
+            return self._table_hook
+        if fullname == SELECT_NAME:
+            return self._select_hook
+        if fullname == CREATE_ENGINE_NAME:
+            return self._create_engine_hook
+        info = self.lookup_class(fullname)
+        if info is not None:
+            # May be a model instantiation. Models with a precise __init__()
+            # are checked by mypy itself, so we only need this for the fallback.
+            # Only models have this metadata, so check it before scanning the MRO.
+            if has_fallback_init(info) and is_declarative(info):
                 return model_hook
         return None
 
+    def get_function_signature_hook(self, fullname: str
+                                    ) -> Optional[Callable[[FunctionSigContext], FunctionLike]]:
+        if fullname == CREATE_ENGINE_NAME:
+            return create_engine_signature_hook
+        info = self.lookup_class(fullname)
+        if info is not None and has_precise_init(info) and is_declarative(info):
+            return model_init_signature_hook
+        return None
+
+    def get_method_hook(self, fullname: str) -> Optional[Callable[[MethodContext], Type]]:
+        class_name, _, method = fullname.rpartition('.')
+        if method not in HOOKED_METHODS:
+            return None
+        # Method hooks are looked up by the class of the receiver, so we need to check
+        # for subclasses, like 'scoped_session' or a custom query class.
+        if method == 'query' and self.is_subclass(class_name, SESSION_NAME):
+            return session_query_hook
+        if method in QUERY_ENTITY_HOOKS and self.is_subclass(class_name, QUERY_NAME):
+            return QUERY_ENTITY_HOOKS[method]
+        if fullname == TYPED_COLUMNS_NAME + '.__getitem__':
+            return table_column_item_hook
+        if fullname == TYPED_ROW_NAME + '.__getitem__':
+            return row_item_hook
+        if fullname in (TYPED_RESULT_NAME + '.scalar', TYPED_ASYNC_RESULT_NAME + '.scalar'):
+            return result_scalar_hook
+        if method == 'fetchall' and class_name in STREAMING_RESULT_NAMES:
+            if self.stream_patterns:
+                return self._streaming_fetchall_hook
+        if method in BULK_MAPPINGS_HOOKS and self.is_subclass(class_name, SESSION_NAME):
+            return BULK_MAPPINGS_HOOKS[method]
+        if method == 'execute' and any(self.is_subclass(class_name, base)
+                                       for base in (CONNECTION_NAME, ENGINE_NAME)):
+            return insert_execute_hook
+        if method == 'execute' and self.is_subclass(class_name, ASYNC_CONNECTION_NAME):
+            return async_insert_execute_hook
+        if method == 'options' and class_name in (QUERY_NAME, LOADED_QUERY_NAME):
+            return self._query_options_hook
+        if self.yield_per_patterns and method in ('yield_per', 'options'):
+            if self.is_subclass(class_name, QUERY_NAME):
+                if method == 'yield_per':
+                    return self._yield_per_hook
+                return self._yield_per_options_hook
+        if self.index_patterns and method in INDEX_CHECKED_METHODS:
+            if self.is_subclass(class_name, QUERY_NAME):
+                return self._missing_index_hook
+        if self.loops is None:
+            return None
+        if fullname in (QUERY_NAME + '.__iter__', LOADED_QUERY_NAME + '.__iter__',
+                        'builtins.list.__iter__'):
+            return self._lazy_load_hook
+        if method in SINGLE_RESULT_METHODS and class_name in (QUERY_NAME, LOADED_QUERY_NAME):
+            return self._deferred_load_hook
+        if method in ASYNC_LOADING_METHODS and self.is_subclass(class_name, ASYNC_SESSION_NAME):
+            return self._async_lazy_load_hook
+        return None
+
+    def get_method_signature_hook(self, fullname: str
+                                  ) -> Optional[Callable[[MethodSigContext], FunctionLike]]:
+        class_name, _, method = fullname.rpartition('.')
+        if method == 'run_sync' and any(self.is_subclass(class_name, base)
+                                        for base in (ASYNC_SESSION_NAME, ASYNC_CONNECTION_NAME)):
+            return self._run_sync_signature_hook
+        return None
+
+    def get_attribute_hook(self, fullname: str) -> Optional[Callable[[AttributeContext], Type]]:
+        # Called for attributes found via __getattr__() as well, with the name of the class
+        # that defines it, so only our stub classes (and not their subclasses) are matched.
+        class_name, _, name = fullname.rpartition('.')
+        if class_name == TYPED_COLUMNS_NAME:
+            return table_column_attr_hook
+        if class_name == TYPED_ROW_NAME:
+            return row_attr_hook
+        return None
+
+    def is_subclass(self, fullname: str, base: str) -> bool:
+        info = self.lookup_class(fullname)
+        if info is None:
+            return False
+        # The MRO is replaced (not updated) when a class is analyzed again, so the
+        # cached result is valid as long as the MRO it was computed from is current.
+        entry = self.subclasses.get((fullname, base))
+        if entry is None or entry[0] is not info.mro:
+            entry = self.subclasses[fullname, base] = (info.mro, info.has_base(base))
+        return entry[1]
+
     def get_dynamic_class_hook(self, fullname: str) -> 'CB[DynamicClassDefContext]':
         if fullname == 'sqlalchemy.ext.declarative.api.declarative_base':
-            return decl_info_hook
+            return self._decl_info_hook
         return None
 
     def get_class_decorator_hook(self, fullname: str) -> 'CB[ClassDefContext]':
         if fullname == 'sqlalchemy.ext.declarative.api.as_declarative':
-            return decl_deco_hook
+            return self._decl_deco_hook
         return None
 
     def get_base_class_hook(self, fullname: str) -> 'CB[ClassDefContext]':
-        sym = self.lookup_fully_qualified(fullname)
-        if sym and isinstance(sym.node, TypeInfo):
-            if is_declarative(sym.node):
-                return add_model_init_hook
+        info = self.lookup_class(fullname)
+        if info is not None and is_declarative(info):
+            return self._add_model_init_hook
         return None
 
+    def get_additional_deps(self, file: MypyFile) -> List[Tuple[int, str, int]]:
+        if fullname(file) == RELATIONSHIP_MODULE:
+            # The type of lazy="dynamic" relationships is 'AppenderQuery[T]', so
+            # the module defining it must be loaded together with relationship().
+            return [(PRI_MED, DYNAMIC_MODULE, -1)]
+        return []
+
+    def report_config_data(self, ctx: ReportConfigContext) -> Any:
+        # Relationship loading is only recorded for models if the check is enabled,
+        # so enabling it (or changing where it is enabled) must invalidate the cache.
+        # Similarly, modules without errors need to be rechecked if the missing index
+        # check (or another opt-in check) is enabled for them.
+        data = {}  # type: Dict[str, bool]
+        if self.loops is not None:
+            data['check_n_plus_one'] = self.loops.is_checked(ctx.id)
+        for option, patterns in (('check_indexes', self.index_patterns),
+                                 ('check_stream_results', self.stream_patterns),
+                                 ('check_yield_per', self.yield_per_patterns)):
+            if patterns:
+                data[option] = matches_patterns(ctx.id, patterns)
+        return data or None
+
 
 def add_var_to_class(name: str, typ: Type, info: TypeInfo) -> None:
     """Add a variable with given name and type to the symbol table of a class.
@@ -120,43 +860,469 @@ def add_var_to_class(name: str, typ: Type, info: TypeInfo) -> None:
     info.names[name] = SymbolTableNode(MDEF, var)
 
 
-def add_model_init_hook(ctx: ClassDefContext) -> None:
-    """Add a dummy __init__() to a model and record it is generated.
+def add_model_init_hook(ctx: ClassDefContext, registry: ClassRegistry,
+                        record_loading: bool = False) -> None:
+    """Add an __init__() to a model and record it is generated.
 
-    Instantiation will be checked more precisely when we inferred types
-    (using get_function_hook and model_hook).
+    If types of all columns and relationships can be inferred at this stage,
+    then a precise signature with keyword-only arguments is generated, and
+    instantiation is checked by mypy itself. Otherwise, a dummy signature is
+    generated and instantiation will be checked later (using get_function_hook
+    and model_hook).
     """
+    registry.add_class(ctx.cls.info)
+    add_base_dependencies(ctx)
+    record_primary_key(ctx.cls.info)
+    record_declared_columns(ctx.cls.info)
+    record_deferred_columns(ctx.cls.info)
+    record_indexes(ctx.cls.info)
+    if record_loading:
+        record_relationship_loading(ctx.cls.info)
     if '__init__' in ctx.cls.info.names:
         # Don't override existing definition.
         return
-    any = AnyType(TypeOfAny.special_form)
-    var = Var('kwargs', any)
-    kw_arg = Argument(variable=var, type_annotation=any, initializer=None, kind=ARG_STAR2)
-    add_method(ctx, '__init__', [kw_arg], NoneTyp())
-    ctx.cls.info.metadata.setdefault('sqlalchemy', {})['generated_init'] = True
+    try:
+        columns = infer_model_columns(ctx.api, ctx.cls.info, registry)
+    except IncompleteModel:
+        if not ctx.api.final_iteration:
+            ctx.api.defer()
+            return
+        columns = None
+    if columns is not None:
+        add_precise_init(ctx, columns)
+    else:
+        any = AnyType(TypeOfAny.special_form)
+        var = Var('kwargs', any)
+        kw_arg = Argument(variable=var, type_annotation=any, initializer=None, kind=ARG_STAR2)
+        add_method(ctx, '__init__', [kw_arg], NoneTyp())
+        ctx.cls.info.metadata.setdefault('sqlalchemy', {})['generated_init'] = True
 
     # Also add a selection of auto-generated attributes.
-    sym = ctx.api.lookup_fully_qualified_or_none('sqlalchemy.sql.schema.Table')
-    if sym:
-        assert isinstance(sym.node, TypeInfo)
-        typ = Instance(sym.node, [])  # type: Type
+    add_var_to_class('__table__', registry.instance(TABLE_NAME), ctx.cls.info)
+
+
+def add_base_dependencies(ctx: ClassDefContext) -> None:
+    """Regenerate the model (in daemon mode) when any of its base classes change.
+
+    The generated __init__() and the recorded metadata include columns of all
+    base classes, but mypy only rechecks subclasses for changes in base class
+    signatures it knows about (not for new or removed columns).
+    """
+    for base in ctx.cls.info.mro[1:]:
+        if fullname(base) != 'builtins.object':
+            ctx.api.add_plugin_dependency(make_wildcard_trigger(fullname(base)))
+
+
+def add_precise_init(ctx: ClassDefContext, columns: Dict[str, Type]) -> None:
+    """Add an __init__() with an optional keyword-only argument for every column."""
+    args = []  # type: List[Argument]
+    for name, typ in columns.items():
+        args.append(Argument(variable=Var(name, typ), type_annotation=typ,
+                             initializer=None, kind=ARG_NAMED_OPT))
+    add_method(ctx, '__init__', args, NoneTyp())
+    ctx.cls.info.metadata.setdefault('sqlalchemy', {})['precise_init'] = True
+
+
+def has_fallback_init(info: TypeInfo) -> bool:
+    """Check if a model has a dummy __init__() that needs to be checked by model_hook."""
+    metadata = info.metadata.get('sqlalchemy')
+    return bool(metadata and metadata.get('generated_init'))
+
+
+def has_precise_init(info: TypeInfo) -> bool:
+    """Check if a model has an __init__() with keyword arguments generated for columns."""
+    metadata = info.metadata.get('sqlalchemy')
+    return bool(metadata and metadata.get('precise_init'))
+
+
+class IncompleteModel(Exception):
+    """Some names needed to infer the model columns are not ready yet."""
+
+
+def infer_model_columns(api: SemanticAnalyzerPluginInterface, model: TypeInfo,
+                        registry: ClassRegistry) -> Optional[Dict[str, Type]]:
+    """Infer column and relationship types for a model during semantic analysis.
+
+    Variables that already have a type (explicitly annotated, or coming from modules
+    that are already type checked) are used as is. Types for other variables are
+    inferred from the right hand sides of assignments in class bodies.
+
+    Return None if some types can't be inferred this way. Raise IncompleteModel if
+    some names are not yet available (so that the caller can defer).
+    """
+    columns = {}  # type: Dict[str, Type]
+    for cls in model.mro[::-1]:
+        rvalues = None  # type: Optional[Dict[str, Expression]]
+        for name, sym in cls.names.items():
+            node = sym.node
+            if isinstance(node, Decorator):
+                typ = get_declared_attr_type(name, node)
+                if typ is None:
+                    continue
+                sig = node.func.type
+                if isinstance(sig, CallableType) and isinstance(sig.ret_type, UnboundType):
+                    # Method signatures in this module are analyzed after the class.
+                    return None
+                columns[name] = typ
+                continue
+            if not isinstance(node, Var) or node.is_classvar or sym.implicit:
+                continue
+            if node.type is not None:
+                typ = get_column_type(node)
+                if typ is not None:
+                    columns[name] = typ
+                continue
+            if rvalues is None:
+                rvalues = get_class_rvalues(cls.defn)
+            if name not in rvalues:
+                return None
+            rvalue = unwrap_deferred(rvalues[name])
+            if not isinstance(rvalue, CallExpr):
+                if isinstance(rvalue, RefExpr) and isinstance(rvalue.node, Var):
+                    # An alias to an existing column, give up for simplicity.
+                    return None
+                continue
+            callee = get_callee_info(rvalue)
+            if callee is None:
+                # Not a class instantiation, see if this may be a column.
+                if may_return_column(rvalue):
+                    return None
+                continue
+            if fullname(callee) == COLUMN_NAME:
+                col_type = infer_column_type(rvalue)
+            elif fullname(callee) == RELATIONSHIP_NAME:
+                col_type = infer_relationship_type(api, rvalue, registry)
+            elif callee.has_base(COLUMN_NAME) or callee.has_base(RELATIONSHIP_NAME):
+                return None
+            else:
+                continue
+            if col_type is None:
+                return None
+            columns[name] = col_type
+    return columns
+
+
+def get_class_rvalues(defn: ClassDef) -> Dict[str, Expression]:
+    """Map names assigned in a class body to the assigned values."""
+    rvalues = {}  # type: Dict[str, Expression]
+    for stmt in defn.defs.body:
+        if isinstance(stmt, AssignmentStmt) and len(stmt.lvalues) == 1:
+            lvalue = stmt.lvalues[0]
+            if isinstance(lvalue, NameExpr):
+                rvalues[lvalue.name] = stmt.rvalue
+    return rvalues
+
+
+def unwrap_deferred(expr: Expression) -> Expression:
+    """Return the column given to 'deferred(Column(...))', or the expression itself."""
+    if isinstance(expr, CallExpr) and expr.args and isinstance(expr.args[0], CallExpr):
+        node = get_ref_node(expr.callee)
+        if isinstance(node, FuncBase) and fullname(node) == DEFERRED_NAME:
+            return expr.args[0]
+    return expr
+
+
+def get_ref_node(expr: Expression) -> Optional[SymbolNode]:
+    """Return the node a reference expression points to.
+
+    Raise IncompleteModel if the reference is not bound yet.
+    """
+    if not isinstance(expr, RefExpr):
+        return None
+    if expr.node is None or isinstance(expr.node, PlaceholderNode):
+        raise IncompleteModel
+    return expr.node
+
+
+def get_callee_info(call: CallExpr) -> Optional[TypeInfo]:
+    """Return the class instantiated by a call expression (if any).
+
+    Class aliases like 'relationship = RelationshipProperty' are followed.
+    """
+    node = get_ref_node(call.callee)
+    if isinstance(node, TypeAlias):
+        target = get_proper_type(node.target)
+        if isinstance(target, Instance):
+            return target.type
+        return None
+    if isinstance(node, TypeInfo):
+        return node
+    return None
+
+
+def may_return_column(call: CallExpr) -> bool:
+    """Check if a function call may return a column or a relationship."""
+    node = get_ref_node(call.callee)
+    if isinstance(node, FuncDef):
+        if node.type is None:
+            # Unannotated functions return Any.
+            return False
+        assert isinstance(node.type, CallableType)
+        ret_type = get_proper_type(node.type.ret_type)
+        if isinstance(ret_type, Instance):
+            return any(ret_type.type.has_base(name) for name in (COLUMN_NAME, RELATIONSHIP_NAME))
+        # The signature may be not analyzed yet.
+        return not isinstance(ret_type, AnyType)
+    return True
+
+
+def get_call_argument(call: CallExpr, name: str) -> Optional[Expression]:
+    """Return the expression for a keyword argument passed to a call."""
+    for arg_name, arg in zip(call.arg_names, call.args):
+        if arg_name == name:
+            return arg
+    return None
+
+
+def get_positional_arguments(call: CallExpr) -> List[Expression]:
+    return [arg for arg, kind in zip(call.args, call.arg_kinds) if kind == ARG_POS]
+
+
+def infer_column_type(call: CallExpr) -> Optional[Type]:
+    """Infer the value type for a 'Column(...)' call expression.
+
+    This is a syntactic counterpart of column_hook(). Return None if the type
+    can't be found this way (for example if only a foreign key is given).
+    """
+    type_arg = get_call_argument(call, 'type_')
+    if type_arg is None:
+        args = get_positional_arguments(call)
+        if args and isinstance(args[0], StrExpr):
+            args = args[1:]
+        if not args:
+            return None
+        type_arg = args[0]
+    if isinstance(type_arg, CallExpr):
+        type_arg = type_arg.callee
+    info = get_ref_node(type_arg)
+    if not isinstance(info, TypeInfo) or info.type_vars:
+        return None
+    for base in info.mro:
+        if fullname(base) == TYPE_ENGINE_NAME:
+            engine = map_instance_to_supertype(Instance(info, []), base)
+            value_type = engine.args[0]
+            break
     else:
-        typ = AnyType(TypeOfAny.special_form)
-    add_var_to_class('__table__', typ, ctx.cls.info)
+        return None
 
+    nullable = is_nullable_column(get_call_argument(call, 'nullable'),
+                                  get_call_argument(call, 'primary_key'),
+                                  get_call_argument(call, 'default'))
+    if nullable:
+        return UnionType([value_type, NoneTyp()])
+    return value_type
 
-def add_metadata_var(api: SemanticAnalyzerPluginInterface, info: TypeInfo) -> None:
-    """Add .metadata attribute to a declarative base."""
-    sym = api.lookup_fully_qualified_or_none('sqlalchemy.sql.schema.MetaData')
-    if sym:
-        assert isinstance(sym.node, TypeInfo)
-        typ = Instance(sym.node, [])  # type: Type
+
+def infer_relationship_type(api: SemanticAnalyzerPluginInterface, call: CallExpr,
+                            registry: ClassRegistry) -> Optional[Type]:
+    """Infer the value type for a 'relationship(...)' call expression.
+
+    This is a syntactic counterpart of relationship_hook().
+    """
+    arg = get_call_argument(call, 'argument')
+    if arg is None:
+        args = get_positional_arguments(call)
+        if not args:
+            return None
+        arg = args[0]
+    if isinstance(arg, StrExpr):
+        sym = api.lookup_qualified(arg.value, call, suppress_errors=True)
+        if sym is None or isinstance(sym.node, PlaceholderNode):
+            raise IncompleteModel
+        node = sym.node  # type: Optional[SymbolNode]
     else:
-        typ = AnyType(TypeOfAny.special_form)
-    add_var_to_class('metadata', typ, info)
+        node = get_ref_node(arg)
+    if not isinstance(node, TypeInfo):
+        return None
+    new_arg = fill_typevars_with_any(node)  # type: Type
+
+    uselist_arg = get_call_argument(call, 'uselist')
+    if is_dynamic_relationship(get_call_argument(call, 'lazy')):
+        # A list of related objects can be given to __init__() for these as well.
+        new_arg = registry.list_of(new_arg)
+    elif uselist_arg and parse_bool(uselist_arg):
+        new_arg = registry.list_of(new_arg)
+    return new_arg
+
+
+def is_dynamic_relationship(lazy_arg: Optional[Expression]) -> bool:
+    return isinstance(lazy_arg, StrExpr) and lazy_arg.value == 'dynamic'
+
+
+def record_relationship_loading(info: TypeInfo) -> None:
+    """Record which relationships declared in a model body are loaded lazily on access.
+
+    This is recorded in class metadata, so that it is available when the model
+    comes from cache, and is used to find relationships loaded in loops.
+    """
+    loading = {}  # type: Dict[str, bool]
+    for name, rvalue in get_class_rvalues(info.defn).items():
+        if not isinstance(rvalue, CallExpr):
+            continue
+        try:
+            callee = get_callee_info(rvalue)
+        except IncompleteModel:
+            continue
+        if callee is None or fullname(callee) != RELATIONSHIP_NAME:
+            continue
+        lazy = get_call_argument(rvalue, 'lazy')
+        if lazy is None:
+            loading[name] = True
+        elif isinstance(lazy, StrExpr):
+            loading[name] = lazy.value in LAZY_LOADING
+        else:
+            loading[name] = parse_bool(lazy) in LAZY_LOADING
+    info.metadata.setdefault('sqlalchemy', {})['lazy_relationships'] = loading
+
+
+def record_primary_key(info: TypeInfo) -> None:
+    """Record names of primary key columns declared in a model body.
+
+    Like for relationships, this is recorded in class metadata, so that it is
+    available when the model comes from cache.
+    """
+    primary_key = []  # type: List[str]
+    for name, rvalue in get_class_rvalues(info.defn).items():
+        if isinstance(rvalue, CallExpr):
+            arg = get_call_argument(rvalue, 'primary_key')
+            if arg is not None and parse_bool(arg):
+                primary_key.append(name)
+    info.metadata.setdefault('sqlalchemy', {})['primary_key'] = primary_key
+
+
+def record_declared_columns(info: TypeInfo) -> None:
+    """Record names of columns and relationships declared directly in a model body.
+
+    This is done during semantic analysis, so that the list is stored in the cache
+    together with the class. Types of variables assigned in the class body are not
+    inferred yet at this point, so all of these are recorded, get_model_columns()
+    filters them by their actual types later.
+    """
+    columns = []  # type: List[str]
+    for name, sym in info.names.items():
+        node = sym.node
+        if isinstance(node, Decorator):
+            if get_declared_attr_type(name, node) is not None:
+                columns.append(name)
+        elif isinstance(node, Var) and not node.is_classvar and not sym.implicit:
+            if node.type is None or get_column_type(node) is not None:
+                columns.append(name)
+    info.metadata.setdefault('sqlalchemy', {})['columns'] = columns
+
+
+def record_deferred_columns(info: TypeInfo) -> None:
+    """Record columns declared in a model body that are not loaded by default.
+
+    These are given as 'deferred(Column(...))' or 'column_property(..., deferred=True)',
+    and are recorded in class metadata together with their group names (if any).
+    """
+    deferred = {}  # type: Dict[str, str]
+    for name, rvalue in get_class_rvalues(info.defn).items():
+        if not isinstance(rvalue, CallExpr):
+            continue
+        try:
+            node = get_ref_node(rvalue.callee)
+            callee = get_callee_info(rvalue)
+        except IncompleteModel:
+            continue
+        if callee is not None and fullname(callee) == COLUMN_PROPERTY_NAME:
+            arg = get_call_argument(rvalue, 'deferred')
+            if arg is None or not parse_bool(arg):
+                continue
+        elif not isinstance(node, FuncBase) or fullname(node) != DEFERRED_NAME:
+            continue
+        group = get_call_argument(rvalue, 'group')
+        deferred[name] = group.value if isinstance(group, StrExpr) else ''
+    info.metadata.setdefault('sqlalchemy', {})['deferred_columns'] = deferred
 
 
-def decl_deco_hook(ctx: ClassDefContext) -> None:
+def record_indexes(info: TypeInfo) -> None:
+    """Record indexes of a model, as lists of column (attribute) names.
+
+    These are given as 'index=True', 'unique=True' or 'primary_key=True' column
+    arguments, or as 'Index(...)', 'UniqueConstraint(...)', etc. in '__table_args__'.
+    Like primary keys, indexes are recorded in class metadata.
+    """
+    rvalues = get_class_rvalues(info.defn)
+    indexes = []  # type: List[List[str]]
+    attributes = {}  # type: Dict[str, str]
+    for name, rvalue in rvalues.items():
+        if not isinstance(rvalue, CallExpr):
+            continue
+        args = get_positional_arguments(rvalue)
+        if args and isinstance(args[0], StrExpr):
+            # Column name in the database is different from the attribute name.
+            attributes[args[0].value] = name
+        for flag in ('index', 'unique', 'primary_key'):
+            arg = get_call_argument(rvalue, flag)
+            if arg is not None and parse_bool(arg):
+                indexes.append([name])
+                break
+    table_args = rvalues.get('__table_args__')
+    if isinstance(table_args, (TupleExpr, ListExpr)):
+        for item in table_args.items:
+            if not isinstance(item, CallExpr):
+                continue
+            if not isinstance(item.callee, (NameExpr, MemberExpr)):
+                continue
+            args = get_positional_arguments(item)
+            if item.callee.name == 'Index':
+                args = args[1:]
+            elif item.callee.name not in ('UniqueConstraint', 'PrimaryKeyConstraint'):
+                continue
+            columns = []  # type: List[str]
+            for arg in args:
+                if isinstance(arg, StrExpr):
+                    columns.append(attributes.get(arg.value, arg.value))
+                elif isinstance(arg, NameExpr):
+                    columns.append(arg.name)
+                else:
+                    # Something like a functional index, only the leading columns are used.
+                    break
+            if columns:
+                indexes.append(columns)
+    info.metadata.setdefault('sqlalchemy', {})['indexes'] = indexes
+
+
+def get_indexed_columns(info: TypeInfo) -> Set[str]:
+    """Return names of columns of a model that are leading columns of some index."""
+    indexed = set()  # type: Set[str]
+    for base in info.mro:
+        for index in base.metadata.get('sqlalchemy', {}).get('indexes', []):
+            indexed.add(index[0])
+    return indexed
+
+
+def get_deferred_columns(info: TypeInfo) -> Dict[str, str]:
+    """Map names of deferred columns of a model to their groups ('' if not in a group)."""
+    deferred = {}  # type: Dict[str, str]
+    for base in reversed(info.mro):
+        deferred.update(base.metadata.get('sqlalchemy', {}).get('deferred_columns', {}))
+    return deferred
+
+
+def get_primary_key(info: TypeInfo) -> List[str]:
+    """Return names of primary key columns of a model (including its bases)."""
+    primary_key = []  # type: List[str]
+    for base in reversed(info.mro):
+        primary_key.extend(base.metadata.get('sqlalchemy', {}).get('primary_key', []))
+    return primary_key
+
+
+def get_relationship_loading(info: TypeInfo) -> Dict[str, bool]:
+    """Map names of all relationships of a model to whether they are loaded lazily."""
+    loading = {}  # type: Dict[str, bool]
+    for base in reversed(info.mro):
+        loading.update(base.metadata.get('sqlalchemy', {}).get('lazy_relationships', {}))
+    return loading
+
+
+def add_metadata_var(info: TypeInfo, registry: ClassRegistry) -> None:
+    """Add .metadata attribute to a declarative base."""
+    add_var_to_class('metadata', registry.instance(METADATA_NAME), info)
+
+
+def decl_deco_hook(ctx: ClassDefContext, registry: ClassRegistry) -> None:
     """Support declaring base class as declarative with a decorator.
 
     For example:
@@ -167,10 +1333,11 @@ def decl_deco_hook(ctx: ClassDefContext) -> None:
             ...
     """
     set_declarative(ctx.cls.info)
-    add_metadata_var(ctx.api, ctx.cls.info)
+    registry.add_class(ctx.cls.info)
+    add_metadata_var(ctx.cls.info, registry)
 
 
-def decl_info_hook(ctx: DynamicClassDefContext) -> None:
+def decl_info_hook(ctx: DynamicClassDefContext, registry: ClassRegistry) -> None:
     """Support dynamically defining declarative bases.
 
     For example:
@@ -195,6 +1362,13 @@ def decl_info_hook(ctx: DynamicClassDefContext) -> None:
                 if isinstance(base, Instance):
                     cls_bases.append(base)
 
+    # This hook may be called several times if the module is deferred. Don't
+    # re-create the base class every time, since this prevents mypy from
+    # detecting that semantic analysis has reached a fixed point.
+    existing = ctx.api.lookup_qualified(ctx.name, ctx.call, suppress_errors=True)
+    if existing and is_generated_base(existing.node, ctx.api.qualified_name(ctx.name), cls_bases):
+        return
+
     class_def = ClassDef(ctx.name, Block([]))
     class_def.fullname = ctx.api.qualified_name(ctx.name)
 
@@ -213,9 +1387,112 @@ def decl_info_hook(ctx: DynamicClassDefContext) -> None:
 
     ctx.api.add_symbol_table_node(ctx.name, SymbolTableNode(GDEF, info))
     set_declarative(info)
+    registry.add_class(info)
 
     # TODO: check what else is added.
-    add_metadata_var(ctx.api, info)
+    add_metadata_var(info, registry)
+
+
+def is_generated_base(node: Optional[SymbolNode], name: str, bases: List[Instance]) -> bool:
+    """Check if a node is a declarative base created by decl_info_hook() with given bases."""
+    if not isinstance(node, TypeInfo) or fullname(node) != name or not is_declarative(node):
+        return False
+    expected = [fullname(b.type) for b in bases] or ['builtins.object']
+    return [fullname(b.type) for b in node.bases] == expected
+
+
+def get_column_type(var: Var) -> Optional[Type]:
+    """Return the value type of a 'Column' or 'RelationshipProperty' variable.
+
+    Return None if the variable is something else.
+    """
+    tp = get_proper_type(var.type)
+    if isinstance(tp, Instance):
+        if fullname(tp.type) in (COLUMN_NAME, RELATIONSHIP_NAME):
+            assert len(tp.args) == 1
+            return tp.args[0]
+    return None
+
+
+def get_declared_attr_type(name: str, node: Decorator) -> Optional[Type]:
+    """Return the value type of a column or relationship defined using '@declared_attr'.
+
+    These are usually found in mixins. The type is taken from the return type of
+    the decorated method, and is Any if the method is unannotated (or returns
+    something we don't understand). Return None if this is something else, like
+    '__tablename__' or a method returning a string.
+    """
+    if name.startswith('__') or not is_declared_attr(node):
+        return None
+    sig = node.func.type
+    if not isinstance(sig, CallableType):
+        return AnyType(TypeOfAny.unannotated)
+    ret_type = get_proper_type(sig.ret_type)
+    if not isinstance(ret_type, Instance):
+        return AnyType(TypeOfAny.special_form)
+    if fullname(ret_type.type) in (COLUMN_NAME, RELATIONSHIP_NAME):
+        return ret_type.args[0]
+    return None
+
+
+def is_declared_attr(node: Decorator) -> bool:
+    """Check if a method is decorated with '@declared_attr'.
+
+    Decorators are not serialized, so for classes loaded from cache we look at
+    the type of the decorated method instead.
+    """
+    var_type = get_proper_type(node.var.type)
+    if isinstance(var_type, Instance):
+        return var_type.type.has_base(DECLARED_ATTR_NAME)
+    return any(isinstance(dec, RefExpr) and dec.fullname == DECLARED_ATTR_NAME
+               for dec in node.original_decorators)
+
+
+def get_attribute_column_type(name: str, node: Optional[SymbolNode]) -> Optional[Type]:
+    """Return the value type of a column or relationship attribute of a model class.
+
+    Return None if the attribute is something else.
+    """
+    if isinstance(node, Var):
+        return get_column_type(node)
+    if isinstance(node, Decorator):
+        return get_declared_attr_type(name, node)
+    return None
+
+
+def get_declared_columns(info: TypeInfo) -> Optional[List[str]]:
+    """Return names of columns and relationships declared directly in a model.
+
+    These are recorded by record_declared_columns(), return None for classes
+    without them (like mixins, or models from an older cache).
+    """
+    metadata = info.metadata.get('sqlalchemy')
+    if metadata:
+        return metadata.get('columns')
+    return None
+
+
+def get_model_columns(model: TypeInfo) -> Dict[str, Type]:
+    """Collect column and relationship types for a model (including its bases).
+
+    For models this only walks the (usually short) per-class lists of column
+    names recorded by record_declared_columns(), other classes in MRO are
+    scanned fully. Types are always read from the variables, so they are
+    never stale.
+    """
+    expected_types = {}  # type: Dict[str, Type]
+    for cls in model.mro[::-1]:
+        columns = get_declared_columns(cls)
+        if columns is None:
+            # Fall back to a full scan for mixins.
+            columns = list(cls.names)
+        for name in columns:
+            sym = cls.names.get(name)
+            if sym:
+                tp = get_attribute_column_type(name, sym.node)
+                if tp is not None:
+                    expected_types[name] = tp
+    return expected_types
 
 
 def model_hook(ctx: FunctionContext) -> Type:
@@ -232,16 +1509,7 @@ def model_hook(ctx: FunctionContext) -> Type:
         return ctx.default_return_type
 
     # Collect column names and types defined in the model
-    # TODO: cache this?
-    expected_types = {}  # type: Dict[str, Type]
-    for cls in model.mro[::-1]:
-        for name, sym in cls.names.items():
-            if isinstance(sym.node, Var):
-                tp = get_proper_type(sym.node.type)
-                if isinstance(tp, Instance):
-                    if fullname(tp.type) in (COLUMN_NAME, RELATIONSHIP_NAME):
-                        assert len(tp.args) == 1
-                        expected_types[name] = tp.args[0]
+    expected_types = get_model_columns(model)
 
     assert len(ctx.arg_names) == 1  # only **kwargs in generated __init__
     assert len(ctx.arg_types) == 1
@@ -264,6 +1532,45 @@ def model_hook(ctx: FunctionContext) -> Type:
     return ctx.default_return_type
 
 
+def model_init_signature_hook(ctx: FunctionSigContext) -> FunctionLike:
+    """Don't check values of '**kwargs' given to a model, unless these are TypedDicts.
+
+    For example:
+        record = {'name': 'John Doe'}
+        User(**record)  # OK, although the 'id' column is an int
+
+    mypy checks values of a dict given as '**kwargs' against every argument of the
+    generated __init__(), so (like for models with a dummy __init__()) only the
+    explicitly given arguments are checked in this case.
+    """
+    signature = ctx.default_signature
+    call = ctx.context
+    if not isinstance(call, CallExpr):
+        return signature
+    for arg, kind in zip(call.args, call.arg_kinds):
+        kwargs_type = get_proper_type(get_variable_type(arg))
+        if kind == ARG_STAR2 and not isinstance(kwargs_type, TypedDictType):
+            break
+    else:
+        return signature
+    any = AnyType(TypeOfAny.special_form)
+    return signature.copy_modified(
+        arg_types=[typ if name in call.arg_names else any
+                   for name, typ in zip(signature.arg_names, signature.arg_types)])
+
+
+def get_variable_type(expr: Expression) -> Optional[Type]:
+    """Return the declared or inferred type of a variable reference.
+
+    Return None for other expressions, and for variables with a type that is
+    not known yet. Signature hooks don't get the types of arguments, but this
+    is enough for the common cases like 'User(**record)'.
+    """
+    if isinstance(expr, RefExpr) and isinstance(expr.node, Var):
+        return expr.node.type
+    return None
+
+
 def get_argument_by_name(ctx: FunctionContext, name: str) -> Optional[Expression]:
     """Return the expression for the specific argument.
 
@@ -305,10 +1612,22 @@ def column_hook(ctx: FunctionContext) -> Type:
     """
     assert isinstance(ctx.default_return_type, Instance)  # type: ignore[misc]
 
-    nullable_arg = get_argument_by_name(ctx, 'nullable')
-    primary_arg = get_argument_by_name(ctx, 'primary_key')
-    default_arg = get_argument_by_name(ctx, 'default')
+    nullable = is_nullable_column(get_argument_by_name(ctx, 'nullable'),
+                                  get_argument_by_name(ctx, 'primary_key'),
+                                  get_argument_by_name(ctx, 'default'))
+    if not nullable:
+        return ctx.default_return_type
+    assert len(ctx.default_return_type.args) == 1
+    arg_type = ctx.default_return_type.args[0]
+    return Instance(ctx.default_return_type.type, [UnionType([arg_type, NoneTyp()])],
+                    line=ctx.default_return_type.line,
+                    column=ctx.default_return_type.column)
+
 
+def is_nullable_column(nullable_arg: Optional[Expression],
+                       primary_arg: Optional[Expression],
+                       default_arg: Optional[Expression]) -> bool:
+    """Decide whether a column is nullable using its 'nullable', 'primary_key', and 'default'."""
     if nullable_arg:
         nullable = parse_bool(nullable_arg)
     else:
@@ -317,14 +1636,7 @@ def column_hook(ctx: FunctionContext) -> Type:
         else:
             nullable = default_arg is None
     # TODO: Add support for literal types.
-
-    if not nullable:
-        return ctx.default_return_type
-    assert len(ctx.default_return_type.args) == 1
-    arg_type = ctx.default_return_type.args[0]
-    return Instance(ctx.default_return_type.type, [UnionType([arg_type, NoneTyp()])],
-                    line=ctx.default_return_type.line,
-                    column=ctx.default_return_type.column)
+    return bool(nullable)
 
 
 def grouping_hook(ctx: FunctionContext) -> Type:
@@ -346,7 +1658,25 @@ def grouping_hook(ctx: FunctionContext) -> Type:
     return ctx.default_return_type
 
 
-def relationship_hook(ctx: FunctionContext) -> Type:
+def deferred_hook(ctx: FunctionContext) -> Type:
+    """Give deferred columns the type of the column itself.
+
+    This actually returns a ColumnProperty, but this way deferred columns of models
+    are typed like other columns.
+
+    Examples:
+        deferred(Column(String)) -> Column[Optional[str]]
+        deferred(Column(Integer, nullable=False), group='stats') -> Column[int]
+    """
+    if ctx.arg_types and ctx.arg_types[0]:
+        column_type = get_proper_type(ctx.arg_types[0][0])
+        if isinstance(column_type, Instance) and column_type.type.has_base(COLUMN_NAME):
+            # Unions made by column_hook() are not simplified (mypy does this for inferred types).
+            return column_type.copy_modified(args=[make_simplified_union(column_type.args)])
+    return ctx.default_return_type
+
+
+def relationship_hook(ctx: FunctionContext, registry: ClassRegistry) -> Type:
     """Support basic use cases for relationships.
 
     Examples:
@@ -363,7 +1693,9 @@ def relationship_hook(ctx: FunctionContext) -> Type:
             other = relationship("OtherModel")
 
     This also tries to infer the type argument for 'RelationshipProperty'
-    using the 'uselist' flag.
+    using the 'uselist' flag. Relationships with lazy="dynamic" are queries
+    (like 'AppenderQuery[OtherModel]'), so that collections are never loaded
+    as a whole by accident.
     """
     assert isinstance(ctx.default_return_type, Instance)  # type: ignore[misc]
     original_type_arg = ctx.default_return_type.args[0]
@@ -399,9 +1731,11 @@ def relationship_hook(ctx: FunctionContext) -> Type:
             new_arg = AnyType(TypeOfAny.special_form)
 
     # We figured out, the model type. Now check if we need to wrap it in List
-    if uselist_arg:
+    if is_dynamic_relationship(get_argument_by_name(ctx, 'lazy')):
+        new_arg = registry.appender_query_of(new_arg)
+    elif uselist_arg:
         if parse_bool(uselist_arg):
-            new_arg = ctx.api.named_generic_type('builtins.list', [new_arg])
+            new_arg = registry.list_of(new_arg)
     else:
         if has_annotation:
             # If there is an annotation we use it as a source of truth.
@@ -413,6 +1747,1382 @@ def relationship_hook(ctx: FunctionContext) -> Type:
                     column=ctx.default_return_type.column)
 
 
+def get_entity_type(typ: Type) -> Tuple[Type, bool]:
+    """Return the type of query results for a single entity.
+
+    Also return whether this is a whole entity (i.e. a model, not a column).
+    For example:
+        User -> User, True
+        User.name -> Optional[str], False
+        func.count(User.id).label('total') -> Any, False
+    """
+    typ = get_proper_type(typ)
+    if isinstance(typ, FunctionLike) and typ.is_type_obj():
+        return fill_typevars_with_any(typ.type_object()), True
+    if isinstance(typ, TypeType):
+        return typ.item, True
+    if isinstance(typ, Instance) and typ.type.has_base(COLUMN_ELEMENT_NAME):
+        for base in typ.type.mro:
+            if base.fullname == COLUMN_ELEMENT_NAME:
+                column = map_instance_to_supertype(typ, base)
+                if column.args:
+                    return column.args[0], False
+    return AnyType(TypeOfAny.special_form), False
+
+
+def get_entity_types(ctx: MethodContext) -> Optional[List[Tuple[Type, bool]]]:
+    """Return types of entities given as positional arguments to a query method.
+
+    Return None if the entities are not known, e.g. for '*args'.
+    """
+    if not ctx.arg_types or any(kind != ARG_POS for kind in ctx.arg_kinds[0]):
+        return None
+    return [get_entity_type(typ) for typ in ctx.arg_types[0]]
+
+
+def make_row_type(api: CheckerPluginInterface, entities: List[Tuple[Type, bool]]) -> Type:
+    """Type of query results for given entities.
+
+    This is the model itself if there is a single whole entity, otherwise
+    results are (named) tuples with an item for every entity.
+    """
+    if len(entities) == 1 and entities[0][1]:
+        return entities[0][0]
+    fallback = api.named_generic_type('builtins.tuple', [AnyType(TypeOfAny.special_form)])
+    return TupleType([typ for typ, _ in entities], fallback)
+
+
+def get_row_items(row: Type) -> List[Tuple[Type, bool]]:
+    """Inverse of make_row_type(), for result types of existing queries."""
+    row = get_proper_type(row)
+    if isinstance(row, TupleType):
+        return [(item, False) for item in row.items]
+    return [(row, True)]
+
+
+def session_query_hook(ctx: MethodContext) -> Type:
+    """Infer precise types of queries for multiple entities (or columns).
+
+    For example:
+        session.query(User.id, User.name, Address) -> Query[Tuple[int, Optional[str], Address]]
+
+    Queries for a single model or a single column are handled by the stubs.
+    """
+    query = get_proper_type(ctx.default_return_type)
+    if not isinstance(query, Instance) or not query.args:
+        return ctx.default_return_type
+    if not isinstance(get_proper_type(query.args[0]), AnyType):
+        return ctx.default_return_type
+    entities = get_entity_types(ctx)
+    if not entities:
+        return ctx.default_return_type
+    return query.copy_modified(args=[make_row_type(ctx.api, entities)])
+
+
+def add_entities_hook(ctx: MethodContext) -> Type:
+    """Add entities to the type of query results for 'add_columns()', etc.
+
+    For example:
+        session.query(User).add_columns(Address.email) -> Query[Tuple[User, str]]
+    """
+    query = ctx.type
+    entities = get_entity_types(ctx)
+    if not isinstance(query, Instance) or not query.args or not entities:
+        return ctx.default_return_type
+    row = get_proper_type(query.args[0])
+    if isinstance(row, AnyType):
+        return ctx.default_return_type
+    entities = get_row_items(row) + entities
+    return query.copy_modified(args=[make_row_type(ctx.api, entities)] + list(query.args[1:]))
+
+
+def with_entities_hook(ctx: MethodContext) -> Type:
+    """Replace the type of query results for 'with_entities()'.
+
+    For example:
+        session.query(User).with_entities(User.id) -> Query[Tuple[int]]
+    """
+    query = ctx.type
+    entities = get_entity_types(ctx)
+    if not isinstance(query, Instance) or not query.args or not entities:
+        return ctx.default_return_type
+    return query.copy_modified(args=[make_row_type(ctx.api, entities)] + list(query.args[1:]))
+
+
+def query_values_hook(ctx: MethodContext) -> Type:
+    """Infer type of rows returned by 'values()'.
+
+    For example:
+        session.query(User).values(User.id, User.name) -> Iterator[Tuple[int, Optional[str]]]
+    """
+    entities = get_entity_types(ctx)
+    if not entities:
+        return ctx.default_return_type
+    fallback = ctx.api.named_generic_type('builtins.tuple', [AnyType(TypeOfAny.special_form)])
+    row = TupleType([typ for typ, _ in entities], fallback)
+    return ctx.api.named_generic_type('typing.Iterator', [row])
+
+
+QUERY_ENTITY_HOOKS = {
+    'add_entity': add_entities_hook,
+    'add_column': add_entities_hook,
+    'add_columns': add_entities_hook,
+    'with_entities': with_entities_hook,
+    'values': query_values_hook,
+}  # type: Final
+
+
+def get_expression_type(api: CheckerPluginInterface, expr: Expression) -> Type:
+    """Infer the type of a literal, or of a reference to a variable or an attribute.
+
+    Hooks only get types of whole arguments, so this is used for details that are
+    lost in these, like items of list displays. Types are taken from variables and
+    class attributes, for example for 'users.c.id', 'User.name', or 'record'.
+    Return Any for other expressions.
+    """
+    any_type = AnyType(TypeOfAny.special_form)
+    if isinstance(expr, IntExpr):
+        return api.named_generic_type('builtins.int', [])
+    if isinstance(expr, StrExpr):
+        return api.named_generic_type('builtins.str', [])
+    if isinstance(expr, FloatExpr):
+        return api.named_generic_type('builtins.float', [])
+    if isinstance(expr, NameExpr) and expr.fullname == 'builtins.None':
+        return NoneTyp()
+    if isinstance(expr, NameExpr) and expr.fullname in ('builtins.True', 'builtins.False'):
+        return api.named_generic_type('builtins.bool', [])
+    if isinstance(expr, RefExpr) and isinstance(expr.node, Var):
+        return expr.node.type or any_type
+    if isinstance(expr, MemberExpr):
+        if isinstance(expr.expr, RefExpr) and isinstance(expr.expr.node, TypeInfo):
+            # A class attribute, like a model column.
+            return get_attribute_type(fill_typevars_with_any(expr.expr.node), expr.name)
+        return get_attribute_type(get_expression_type(api, expr.expr), expr.name)
+    if isinstance(expr, IndexExpr) and isinstance(expr.index, StrExpr):
+        # Like 'users.c['name']'.
+        columns = get_column_dict(get_expression_type(api, expr.base))
+        if columns is not None and expr.index.value in columns.items:
+            return columns.items[expr.index.value]
+    return any_type
+
+
+def get_attribute_type(typ: Type, name: str) -> Type:
+    """Return the type of a variable attribute of an instance type (or Any)."""
+    typ = get_proper_type(typ)
+    if not isinstance(typ, Instance):
+        return AnyType(TypeOfAny.special_form)
+    columns = get_column_dict(typ)
+    if columns is not None and name in columns.items:
+        # Columns of typed tables, like 'users.c.name'.
+        return columns.items[name]
+    sym = typ.type.get(name)
+    if sym is None or not isinstance(sym.node, Var) or sym.node.type is None:
+        return AnyType(TypeOfAny.special_form)
+    assert sym.node.info is not None
+    owner = map_instance_to_supertype(typ, sym.node.info)
+    return expand_type_by_instance(sym.node.type, owner)
+
+
+def make_column_dict(api: CheckerPluginInterface,
+                     columns: List[Tuple[str, Type]]) -> Optional[TypedDictType]:
+    """Return a TypedDict type of columns by name, or None if names are not unique."""
+    items = OrderedDict()  # type: OrderedDict[str, Type]
+    for name, typ in columns:
+        if name in items:
+            return None
+        items[name] = typ
+    fallback = api.named_generic_type('typing._TypedDict', [])
+    return TypedDictType(items, set(items), fallback)
+
+
+def get_column_dict(typ: Type) -> Optional[TypedDictType]:
+    """Return the TypedDict of columns recorded in a '_Typed...' stub class."""
+    typ = get_proper_type(typ)
+    if not isinstance(typ, Instance) or not typ.type.fullname.startswith('sqlalchemy.'):
+        return None
+    if not typ.type.fullname.rpartition('.')[2].startswith('_Typed') or not typ.args:
+        return None
+    columns = get_proper_type(typ.args[0])
+    if not isinstance(columns, TypedDictType):
+        return None
+    return columns
+
+
+def is_column_expression(typ: Type) -> bool:
+    typ = get_proper_type(typ)
+    return isinstance(typ, Instance) and typ.type.has_base(COLUMN_ELEMENT_NAME)
+
+
+def get_column_name(expr: Expression) -> Optional[str]:
+    """Return the name of a column given in a select() from an expression.
+
+    For example:
+        users.c.name -> name
+        users.c['name'] -> name
+        User.name -> name
+        func.count(users.c.id).label('total') -> total
+    """
+    if isinstance(expr, MemberExpr):
+        return expr.name
+    if isinstance(expr, IndexExpr) and isinstance(expr.index, StrExpr):
+        return expr.index.value
+    if isinstance(expr, CallExpr) and isinstance(expr.callee, MemberExpr):
+        if expr.callee.name == 'label' and expr.args and isinstance(expr.args[0], StrExpr):
+            return expr.args[0].value
+    return None
+
+
+def table_hook(ctx: FunctionContext, registry: ClassRegistry) -> Type:
+    """Record types of columns in a Table(...) definition.
+
+    For example:
+        users = Table('users', metadata,
+                      Column('id', Integer, primary_key=True),
+                      Column('name', String))
+
+    gives '_TypedTable[TypedDict({'id': Column[int], 'name': Column[Optional[str]]})]'.
+    This is a subclass of 'Table' that doesn't exist at runtime, columns are then
+    available as 'users.c.id', etc. The type stays 'Table' if the columns are not
+    known, e.g. for reflected tables.
+    """
+    columns = []  # type: List[Tuple[str, Type]]
+    for args, kinds, types in zip(ctx.args[2:], ctx.arg_kinds[2:], ctx.arg_types[2:]):
+        for arg, kind, typ in zip(args, kinds, types):
+            if kind != ARG_POS:
+                return ctx.default_return_type
+            proper = get_proper_type(typ)
+            if not isinstance(proper, Instance) or not proper.type.has_base(COLUMN_NAME):
+                # Constraints, indexes, etc.
+                continue
+            if not isinstance(arg, CallExpr):
+                return ctx.default_return_type
+            key = get_call_argument(arg, 'key')
+            positional = get_positional_arguments(arg)
+            if isinstance(key, StrExpr):
+                columns.append((key.value, typ))
+            elif positional and isinstance(positional[0], StrExpr):
+                columns.append((positional[0].value, typ))
+            else:
+                return ctx.default_return_type
+    info = registry.lookup_class(TYPED_TABLE_NAME)
+    column_dict = make_column_dict(ctx.api, columns)
+    if not columns or column_dict is None or info is None:
+        return ctx.default_return_type
+    return Instance(info, [column_dict])
+
+
+def select_hook(ctx: FunctionContext, registry: ClassRegistry) -> Type:
+    """Record types of result columns of a select() from table columns.
+
+    For example:
+        select([users.c.id, users.c.name]) -> _TypedSelect[TypedDict({'id': ..., 'name': ...})]
+
+    Columns of typed tables can be given as well, like 'select([users])'.
+    Executing such a select gives a '_TypedResultProxy' with rows where both
+    'row.name' and 'row['name']' have type 'Optional[str]'. If some column
+    is not a simple named column expression, the type stays 'Select'.
+    """
+    if not ctx.args or len(ctx.args[0]) != 1:
+        return ctx.default_return_type
+    items = ctx.args[0][0]
+    if not isinstance(items, (ListExpr, TupleExpr)):
+        return ctx.default_return_type
+    columns = []  # type: List[Tuple[str, Type]]
+    for item in items.items:
+        typ = get_expression_type(ctx.api, item)
+        table_columns = get_column_dict(typ)
+        if table_columns is not None:
+            columns.extend(table_columns.items.items())
+            continue
+        name = get_column_name(item)
+        if name is None:
+            return ctx.default_return_type
+        if isinstance(get_proper_type(typ), AnyType):
+            # Like 'func.count(...).label(...)'. A "real" Any here would make
+            # overloads of 'execute()' ambiguous for this select.
+            typ = AnyType(TypeOfAny.special_form)
+        elif not is_column_expression(typ):
+            return ctx.default_return_type
+        columns.append((name, typ))
+    info = registry.lookup_class(TYPED_SELECT_NAME)
+    column_dict = make_column_dict(ctx.api, columns)
+    if not columns or column_dict is None or info is None:
+        return ctx.default_return_type
+    return Instance(info, [column_dict])
+
+
+def get_column_by_key(ctx: MethodContext, columns: TypedDictType) -> Optional[Type]:
+    """Find a column given as the index in 'x[...]', report an error if there is no such column.
+
+    Return None if the column can't be determined statically.
+    """
+    if not ctx.args or not ctx.args[0]:
+        return None
+    index = ctx.args[0][0]
+    if isinstance(index, StrExpr):
+        return get_column_by_name(ctx.api, columns, index.value, ctx.context)
+    if isinstance(index, UnaryExpr) and index.op == '-' and isinstance(index.expr, IntExpr):
+        position = -index.expr.value  # type: Optional[int]
+    else:
+        position = index.value if isinstance(index, IntExpr) else None
+    if position is not None:
+        values = list(columns.items.values())
+        if -len(values) <= position < len(values):
+            return values[position]
+        ctx.api.fail('Row has {} columns, column index {} is out of range'
+                     .format(len(values), position), ctx.context)
+        return AnyType(TypeOfAny.from_error)
+    return None
+
+
+def get_column_by_name(api: CheckerPluginInterface, columns: TypedDictType, name: str,
+                       context: Context) -> Type:
+    if name in columns.items:
+        return columns.items[name]
+    api.fail('No column "{}" (available columns are: {})'
+             .format(name, ', '.join('"{}"'.format(key) for key in columns.items)), context)
+    return AnyType(TypeOfAny.from_error)
+
+
+def table_column_attr_hook(ctx: AttributeContext) -> Type:
+    """Infer the type of 'users.c.name' for typed tables (see table_hook())."""
+    columns = get_column_dict(ctx.type)
+    if columns is None or not isinstance(ctx.context, MemberExpr):
+        return ctx.default_attr_type
+    return get_column_by_name(ctx.api, columns, ctx.context.name, ctx.context)
+
+
+def table_column_item_hook(ctx: MethodContext) -> Type:
+    """Infer the type of 'users.c['name']' for typed tables (see table_hook())."""
+    columns = get_column_dict(ctx.type)
+    if columns is None:
+        return ctx.default_return_type
+    return get_column_by_key(ctx, columns) or ctx.default_return_type
+
+
+def row_attr_hook(ctx: AttributeContext) -> Type:
+    """Infer the type of 'row.name' for rows of typed selects (see select_hook())."""
+    columns = get_column_dict(ctx.type)
+    if columns is None or not isinstance(ctx.context, MemberExpr):
+        return ctx.default_attr_type
+    column = get_column_by_name(ctx.api, columns, ctx.context.name, ctx.context)
+    return get_entity_type(column)[0]
+
+
+def row_item_hook(ctx: MethodContext) -> Type:
+    """Infer the type of 'row['name']' (or 'row[0]', or 'row[users.c.name]') for typed rows."""
+    columns = get_column_dict(ctx.type)
+    if columns is None:
+        return ctx.default_return_type
+    if ctx.arg_types and ctx.arg_types[0] and is_column_expression(ctx.arg_types[0][0]):
+        return get_entity_type(ctx.arg_types[0][0])[0]
+    column = get_column_by_key(ctx, columns)
+    if column is None:
+        return ctx.default_return_type
+    return get_entity_type(column)[0]
+
+
+def result_scalar_hook(ctx: MethodContext) -> Type:
+    """Infer the type of 'scalar()' (the first column of the first row) for typed results."""
+    columns = get_column_dict(ctx.type)
+    if columns is None:
+        return ctx.default_return_type
+    first = get_entity_type(next(iter(columns.items.values())))[0]
+    scalar = UnionType.make_union([first, NoneTyp()])
+    ret_type = get_proper_type(ctx.default_return_type)
+    if isinstance(ret_type, Instance) and fullname(ret_type.type) == 'typing.Coroutine':
+        # This is 'scalar()' of an 'AsyncResult'.
+        return ret_type.copy_modified(args=[*ret_type.args[:2], scalar])
+    return scalar
+
+
+def streaming_fetchall_hook(ctx: MethodContext, is_checked: Callable[[str], bool]) -> Type:
+    """Report 'fetchall()' on results executed with 'stream_results=True'.
+
+    For example:
+        conn = engine.connect().execution_options(stream_results=True)
+        conn.execute(big_query).fetchall()  # Error: loads all rows into memory
+
+    Streaming is only used to avoid loading all rows at once, so this is
+    almost certainly a mistake. This is only reported in modules where the
+    check is enabled.
+    """
+    if not is_checked(ctx.api.path):
+        return ctx.default_return_type
+    ctx.api.fail('"fetchall()" loads all rows of a result with "stream_results=True" into'
+                 ' memory, iterate over the result or use "fetchmany()" instead',
+                 ctx.context, code=FETCHALL_STREAMING)
+    return ctx.default_return_type
+
+
+def create_engine_signature_hook(ctx: FunctionSigContext) -> FunctionLike:
+    """Allow any keyword arguments in 'create_engine()' calls that may need them.
+
+    Only keyword arguments of built-in dialects are known, so other arguments are
+    allowed unless the URL is a literal with a built-in dialect. Engine plugins
+    (given as 'plugins=[...]' or as 'plugin' query parameters of the URL) may take
+    their own keyword arguments as well.
+    """
+    signature = ctx.default_signature
+    call = ctx.context
+    if not isinstance(call, CallExpr):
+        return signature
+    url = call.args[0] if call.args and call.arg_kinds[0] == ARG_POS else None
+    dialect = parse_dialect_name(url) if url is not None else None
+    if dialect is not None and dialect[0] in DEFAULT_DRIVERS and 'plugins' not in call.arg_names:
+        assert isinstance(url, StrExpr)
+        if 'plugin=' not in url.value:
+            return signature
+    return signature.copy_modified(
+        arg_types=[*signature.arg_types, AnyType(TypeOfAny.special_form)],
+        arg_kinds=[*signature.arg_kinds, ARG_STAR2],
+        arg_names=[*signature.arg_names, 'kwargs'])
+
+
+def create_engine_hook(ctx: FunctionContext, registry: ClassRegistry) -> Type:
+    """Check pool and dialect arguments of 'create_engine()'.
+
+    For example:
+        create_engine(url, poolclass=NullPool, pool_size=10)  # Error: not supported by NullPool
+        create_engine('sqlite:///app.db', executemany_mode='values')  # Error: psycopg2 only
+
+    Such arguments raise an error when the engine is created (or are ignored by
+    some versions). Pool arguments are checked against the 'poolclass' argument,
+    or the default pool class of the dialect (SQLite uses 'NullPool' for files and
+    'SingletonThreadPool' for memory databases), and can't be used together with
+    a 'pool' instance. Dialect arguments are checked if the URL is a literal.
+    """
+    args = OrderedDict()  # type: OrderedDict[str, Tuple[Expression, Type]]
+    for name, exprs, kinds, types in zip(ctx.callee_arg_names, ctx.args, ctx.arg_kinds,
+                                         ctx.arg_types):
+        # Skip '**kwargs' actuals, that are mapped to every keyword argument.
+        if name is not None and kinds in ([ARG_POS], [ARG_NAMED]):
+            args[name] = (exprs[0], types[0])
+    url = args.get('name_or_url')
+    dialect = parse_dialect_name(url[0]) if url is not None else None
+
+    if 'pool' in args:
+        for name, (expr, _) in args.items():
+            if name in POOL_ARGUMENTS:
+                ctx.api.fail('Argument "{}" is not used with a "pool" instance, configure'
+                             ' the pool instead'.format(name), expr, code=ENGINE_ARGUMENT)
+    else:
+        pool_class = None  # type: Optional[TypeInfo]
+        if 'poolclass' in args:
+            pool_class = get_type_object(args['poolclass'][1])
+        elif url is not None and dialect == ('sqlite', 'pysqlite'):
+            assert isinstance(url[0], StrExpr)
+            database = url[0].value.partition('://')[2].lstrip('/').partition('?')[0]
+            memory = database in ('', ':memory:')
+            pool_class = registry.lookup_class(SINGLETON_POOL_NAME if memory else NULL_POOL_NAME)
+        if pool_class is not None:
+            for name, (expr, _) in args.items():
+                supported = POOL_CLASS_ARGUMENTS.get(name, None)
+                if supported and not any(pool_class.has_base(base) for base in supported):
+                    ctx.api.fail('Argument "{}" is not supported by pool class "{}"'
+                                 .format(name, shortname(pool_class)), expr, code=ENGINE_ARGUMENT)
+
+    if dialect is not None and dialect[0] in DEFAULT_DRIVERS:
+        name_and_driver = '+'.join(dialect)
+        for name, (expr, _) in args.items():
+            dialects = DIALECT_ARGUMENTS.get(name, None)
+            if dialects and dialect[0] not in dialects and name_and_driver not in dialects:
+                ctx.api.fail('Argument "{}" is not supported by dialect "{}"'
+                             .format(name, name_and_driver), expr, code=ENGINE_ARGUMENT)
+    return ctx.default_return_type
+
+
+def parse_dialect_name(expr: Expression) -> Optional[Tuple[str, str]]:
+    """Return the dialect and driver names of a literal database URL, like 'sqlite:///app.db'.
+
+    If the driver is not given, the default driver of a built-in dialect is returned.
+    """
+    if not isinstance(expr, StrExpr) or '://' not in expr.value:
+        return None
+    name, _, driver = expr.value.partition('://')[0].partition('+')
+    if name == 'postgres':
+        name = 'postgresql'
+    return name, driver or DEFAULT_DRIVERS.get(name, '')
+
+
+def get_type_object(typ: Type) -> Optional[TypeInfo]:
+    """Return the class of a type object like 'NullPool'.
+
+    Note that for types like 'Type[Pool]' the actual class is not known.
+    """
+    typ = get_proper_type(typ)
+    if isinstance(typ, CallableType) and typ.is_type_obj():
+        return typ.type_object()
+    return None
+
+
+def make_model_mappings_type(api: CheckerPluginInterface, model: TypeInfo,
+                             require_primary_key: bool) -> TypedDictType:
+    """Return a TypedDict type for mappings of column values of a model.
+
+    All keys are optional, except primary key columns if 'require_primary_key'
+    is true (these are needed to find rows to update).
+    """
+    items = OrderedDict(get_model_plain_columns(model))  # type: OrderedDict[str, Type]
+    required = set()  # type: Set[str]
+    if require_primary_key:
+        required = set(get_primary_key(model)) & set(items)
+    fallback = api.named_generic_type('typing._TypedDict', [])
+    return TypedDictType(items, required, fallback)
+
+
+def get_model_plain_columns(model: TypeInfo) -> List[Tuple[str, Type]]:
+    """Return names and value types of columns of a model (without relationships)."""
+    columns = []  # type: List[Tuple[str, Type]]
+    for name, typ in get_model_columns(model).items():
+        sym = model.get(name)
+        if sym is None or not isinstance(sym.node, Var):
+            # Overridden by a property (or a method) in a subclass.
+            continue
+        column = get_proper_type(sym.node.type)
+        if isinstance(column, Instance) and fullname(column.type) == COLUMN_NAME:
+            columns.append((name, typ))
+    return columns
+
+
+def make_table_mappings_type(columns: TypedDictType) -> TypedDictType:
+    """Return a TypedDict type for mappings of column values of a typed table."""
+    items = OrderedDict()  # type: OrderedDict[str, Type]
+    for name, column in columns.items.items():
+        items[name] = get_entity_type(column)[0]
+    return TypedDictType(items, set(), columns.fallback)
+
+
+def check_mappings(api: CheckerPluginInterface, exprs: List[Expression],
+                   expected: TypedDictType) -> None:
+    """Check mappings of column values against a TypedDict of expected value types.
+
+    Mappings can be given as dict displays or 'dict(...)' calls, either directly
+    or in list displays and comprehensions. Other mappings are only checked if
+    they have TypedDict types.
+    """
+    items = []  # type: List[Tuple[str, Type, Context]]
+    for expr in exprs:
+        if isinstance(expr, (ListExpr, TupleExpr)):
+            check_mappings(api, expr.items, expected)
+        elif isinstance(expr, ListComprehension):
+            check_mappings(api, [expr.generator.left_expr], expected)
+        elif isinstance(expr, GeneratorExpr):
+            check_mappings(api, [expr.left_expr], expected)
+        elif isinstance(expr, DictExpr):
+            items = [(key.value, get_expression_type(api, value), key)
+                     for key, value in expr.items if isinstance(key, StrExpr)]
+            # Keys may be also given using '**other'.
+            check_mapping_items(api, items, expected, expr,
+                                complete=len(items) == len(expr.items))
+        elif is_dict_call(expr):
+            assert isinstance(expr, CallExpr)
+            items = [(name, get_expression_type(api, arg), arg)
+                     for name, arg in zip(expr.arg_names, expr.args) if name is not None]
+            check_mapping_items(api, items, expected, expr,
+                                complete=len(items) == len(expr.args))
+        else:
+            typ = get_proper_type(get_expression_type(api, expr))
+            if isinstance(typ, Instance) and len(typ.args) == 1:
+                # A list (or another collection) of mappings.
+                typ = get_proper_type(typ.args[0])
+            if isinstance(typ, TypedDictType):
+                items = [(name, item, expr) for name, item in typ.items.items()]
+                check_mapping_items(api, items, expected, expr, complete=True)
+
+
+def is_dict_call(expr: Expression) -> bool:
+    if not isinstance(expr, CallExpr) or not isinstance(expr.callee, RefExpr):
+        return False
+    return expr.callee.fullname == 'builtins.dict'
+
+
+def check_mapping_items(api: CheckerPluginInterface, items: List[Tuple[str, Type, Context]],
+                        expected: TypedDictType, context: Context, complete: bool) -> None:
+    """Check keys and value types of a single mapping of column values.
+
+    Missing required keys are only reported if all keys of the mapping are known.
+    """
+    for name, typ, item_context in items:
+        if name not in expected.items:
+            get_column_by_name(api, expected, name, item_context)
+            continue
+        # Using private API to simplify life.
+        api.check_subtype(typ, expected.items[name], item_context,  # type: ignore
+                          'Incompatible type for column "{}"'.format(name),
+                          'got', 'expected')
+    if not complete:
+        return
+    names = {name for name, _, _ in items}
+    for name in expected.items:
+        if name in expected.required_keys and name not in names:
+            api.fail('Missing primary key column "{}", it is needed to find rows to update'
+                     .format(name), context)
+
+
+def bulk_mappings_hook(ctx: MethodContext, require_primary_key: bool) -> Type:
+    """Check mappings given to 'Session.bulk_insert_mappings()' and 'bulk_update_mappings()'.
+
+    For example:
+        session.bulk_insert_mappings(User, [{'id': 1, 'nmae': 'x'}])  # Error: No column "nmae"
+        session.bulk_update_mappings(User, [{'name': 'x'}])  # Error: Missing primary key
+    """
+    if len(ctx.arg_types) < 2 or len(ctx.arg_types[0]) != 1:
+        return ctx.default_return_type
+    model, whole = get_entity_type(ctx.arg_types[0][0])
+    model = get_proper_type(model)
+    if whole and isinstance(model, Instance) and is_declarative(model.type):
+        expected = make_model_mappings_type(ctx.api, model.type, require_primary_key)
+        check_mappings(ctx.api, ctx.args[1], expected)
+    return ctx.default_return_type
+
+
+BULK_MAPPINGS_HOOKS = {
+    'bulk_insert_mappings': partial(bulk_mappings_hook, require_primary_key=False),
+    'bulk_update_mappings': partial(bulk_mappings_hook, require_primary_key=True),
+}  # type: Final
+
+# All method names get_method_hook() may return a hook for, to quickly skip other methods.
+HOOKED_METHODS = {
+    'query', '__getitem__', 'scalar', 'fetchall', 'execute', 'yield_per', 'options', '__iter__',
+}.union(QUERY_ENTITY_HOOKS, BULK_MAPPINGS_HOOKS, INDEX_CHECKED_METHODS, SINGLE_RESULT_METHODS,
+        ASYNC_LOADING_METHODS)  # type: Final
+
+
+def insert_execute_hook(ctx: MethodContext) -> Type:
+    """Check values given to 'execute()' for inserts into typed tables (see table_hook()).
+
+    For example:
+        conn.execute(users.insert(), [{'id': 1, 'name': 'x'}, {'id': 2, 'nmae': 'y'}])  # Error
+        conn.execute(users.insert(), id=1, name=2)  # Error
+    """
+    columns = get_insert_columns(ctx)
+    if columns is None or len(ctx.arg_types) < 3:
+        return ctx.default_return_type
+    expected = make_table_mappings_type(columns)
+    check_mappings(ctx.api, ctx.args[1], expected)
+    items = [(name, typ, ctx.context)
+             for name, typ in zip(ctx.arg_names[2], ctx.arg_types[2]) if name is not None]
+    check_mapping_items(ctx.api, items, expected, ctx.context, complete=False)
+    return ctx.default_return_type
+
+
+def async_insert_execute_hook(ctx: MethodContext) -> Type:
+    """Check values given to 'AsyncConnection.execute()' for inserts into typed tables.
+
+    Unlike for 'Connection.execute()', values are given only as the second argument,
+    a mapping or a list of mappings.
+    """
+    columns = get_insert_columns(ctx)
+    if columns is not None:
+        check_mappings(ctx.api, ctx.args[1], make_table_mappings_type(columns))
+    return ctx.default_return_type
+
+
+def get_insert_columns(ctx: MethodContext) -> Optional[TypedDictType]:
+    """Return columns of a typed table, if 'execute()' is called for an insert into it."""
+    if len(ctx.arg_types) < 2 or len(ctx.arg_types[0]) != 1:
+        return None
+    insert = get_proper_type(ctx.arg_types[0][0])
+    if not isinstance(insert, Instance) or fullname(insert.type) != TYPED_INSERT_NAME:
+        return None
+    return get_column_dict(insert)
+
+
+def missing_index_hook(ctx: MethodContext, is_checked: Callable[[str], bool]) -> Type:
+    """Report query conditions on columns without a supporting index.
+
+    For example:
+        session.query(User).filter(User.email == email)  # Error: no index on 'email'
+        session.query(User).filter_by(email=email)  # Same
+
+    This is used for 'filter()', 'filter_by()', 'join()' and 'outerjoin()' in modules
+    where the check is enabled. Conditions on several columns of a model are only
+    reported if none of them is a leading column of an index, since a query can
+    use an index on any of them.
+    """
+    if not is_checked(ctx.api.path):
+        return ctx.default_return_type
+    assert isinstance(ctx.context, CallExpr)
+    assert isinstance(ctx.context.callee, MemberExpr)
+    method = ctx.context.callee.name
+    columns = []  # type: List[Tuple[TypeInfo, str, Context]]
+    if method == 'filter_by':
+        query = ctx.type
+        type_args = query.args if isinstance(query, Instance) else ()
+        model = get_proper_type(type_args[0] if type_args else None)
+        if isinstance(model, Instance) and is_declarative(model.type):
+            plain = {name for name, _ in get_model_plain_columns(model.type)}
+            for name in ctx.arg_names[0] if ctx.arg_names else []:
+                if name in plain:
+                    columns.append((model.type, name, ctx.context))
+    else:
+        for args in ctx.args:
+            for arg in args:
+                find_condition_columns(arg, columns)
+    by_model = OrderedDict()  # type: OrderedDict[TypeInfo, List[Tuple[str, Context]]]
+    for model_info, name, context in columns:
+        by_model.setdefault(model_info, []).append((name, context))
+    for model_info, used in by_model.items():
+        indexed = get_indexed_columns(model_info)
+        if any(name in indexed for name, _ in used):
+            continue
+        for name, context in used:
+            ctx.api.fail('Column "{}" of "{}" used in "{}()" has no index, use "index=True"'
+                         ' or add an "Index()" to "__table_args__"'
+                         .format(name, shortname(model_info), method),
+                         context, code=MISSING_INDEX)
+    return ctx.default_return_type
+
+
+def find_condition_columns(expr: Expression,
+                           columns: List[Tuple[TypeInfo, str, Context]]) -> None:
+    """Find model columns compared in a condition, like 'User.name == name'.
+
+    Conditions can be combined using 'and_()', 'or_()', etc. or '&' and '|', and
+    column methods like 'User.name.in_(names)' are also recognized.
+    """
+    if isinstance(expr, ComparisonExpr):
+        for operand in expr.operands:
+            find_condition_columns(operand, columns)
+    elif isinstance(expr, OpExpr) and expr.op in ('&', '|'):
+        find_condition_columns(expr.left, columns)
+        find_condition_columns(expr.right, columns)
+    elif isinstance(expr, UnaryExpr) and expr.op == '~':
+        find_condition_columns(expr.expr, columns)
+    elif isinstance(expr, CallExpr):
+        callee = expr.callee
+        if isinstance(callee, (NameExpr, MemberExpr)) and callee.name in CONJUNCTIONS:
+            for arg in expr.args:
+                find_condition_columns(arg, columns)
+        elif isinstance(callee, MemberExpr):
+            # A column method, like 'User.name.like(pattern)'.
+            find_condition_columns(callee.expr, columns)
+    elif isinstance(expr, MemberExpr) and isinstance(expr.expr, RefExpr):
+        info = expr.expr.node
+        if isinstance(info, TypeInfo) and is_declarative(info):
+            if any(name == expr.name for name, _ in get_model_plain_columns(info)):
+                columns.append((info, expr.name, expr))
+
+
+class QueryLoading:
+    """Relationship paths eagerly loaded by a query, and paths that raise on access.
+
+    Paths are dot separated relationship names, like 'children' or 'children.toys',
+    and may end with '*', as in 'raiseload("*")'. If the model of query results is
+    known, also record its columns that are not loaded by the query (these are
+    loaded by a separate query on first access).
+    """
+    def __init__(self, loaded: List[str], raised: List[str], deferred: List[str],
+                 model: Optional[TypeInfo] = None) -> None:
+        self.loaded = set(loaded)
+        self.raised = set(raised)
+        self.deferred = set(deferred)
+        self.model = model
+
+    def apply(self, loader: str, path: str) -> None:
+        self.loaded.discard(path)
+        self.raised.discard(path)
+        if loader in EAGER_LOADERS:
+            self.loaded.add(path)
+        elif loader == 'raiseload':
+            self.raised.add(path)
+
+    def is_loaded(self, name: str) -> bool:
+        """Is relationship of a query result loaded without a query on access?"""
+        return name in self.loaded or '*' in self.loaded and name not in self.raised
+
+    def raises(self, name: str) -> bool:
+        """Does relationship of a query result raise on access?"""
+        return name in self.raised or '*' in self.raised and name not in self.loaded
+
+    def apply_columns(self, loader: str, keys: List[str]) -> None:
+        """Apply a column loader option, like 'load_only()', to columns of query results."""
+        if self.model is None:
+            return
+        columns = {name for name, _ in get_model_plain_columns(self.model)}
+        columns |= set(get_deferred_columns(self.model))
+        if '*' in keys:
+            keys = list(columns - set(get_primary_key(self.model)))
+        if loader == 'defer':
+            self.deferred |= columns & set(keys)
+        elif loader == 'undefer':
+            self.deferred -= set(keys)
+        elif loader == 'undefer_group':
+            groups = get_deferred_columns(self.model)
+            self.deferred = {name for name in self.deferred if groups.get(name) not in keys}
+        elif loader == 'load_only':
+            self.deferred = columns - set(keys) - set(get_primary_key(self.model))
+
+
+def get_default_loading(item: Type) -> QueryLoading:
+    """Return loading for a query without options, with results of given type."""
+    item = get_proper_type(item)
+    if isinstance(item, Instance) and is_declarative(item.type):
+        return QueryLoading([], [], list(get_deferred_columns(item.type)), item.type)
+    return QueryLoading([], [], [])
+
+
+def get_query_loading(typ: Type) -> Optional[QueryLoading]:
+    """Return relationship loading recorded in a query type by query_options_hook()."""
+    typ = get_proper_type(typ)
+    if not isinstance(typ, Instance) or fullname(typ.type) != LOADED_QUERY_NAME:
+        return None
+    if len(typ.args) != 4:
+        return None
+    paths = []  # type: List[List[str]]
+    for arg in typ.args[1:]:
+        arg = get_proper_type(arg)
+        items = arg.items if isinstance(arg, UnionType) else [arg]
+        values = []  # type: List[str]
+        for item in items:
+            item = get_proper_type(item)
+            if isinstance(item, UninhabitedType):
+                continue
+            if not isinstance(item, LiteralType) or not isinstance(item.value, str):
+                return None
+            values.append(item.value)
+        paths.append(values)
+    loading = get_default_loading(typ.args[0])
+    return QueryLoading(paths[0], paths[1], paths[2], loading.model)
+
+
+def apply_loader_options(options: List[Expression], loading: QueryLoading) -> bool:
+    """Apply loader options like 'joinedload(User.orders).selectinload(Order.items)'.
+
+    Return False if some options are not understood.
+    """
+    for option in options:
+        calls = get_option_calls(option)
+        if calls is None:
+            return False
+        path = []  # type: List[str]
+        for call in calls:
+            assert isinstance(call.callee, (NameExpr, MemberExpr))
+            loader = call.callee.name
+            if loader == 'Load' and call is calls[0]:
+                # Loader options bound to an entity, like 'Load(User).joinedload(...)'.
+                continue
+            if loader not in EAGER_LOADERS | LAZY_LOADERS | OTHER_LOADERS | {'raiseload'}:
+                return False
+            if loader in COLUMN_LOADERS:
+                if not path:
+                    apply_column_loader(call, loading)
+                # Otherwise these are columns of related models, that are not tracked.
+                continue
+            if loader in OTHER_LOADERS and loader != 'defaultload':
+                continue
+            keys = get_option_keys(call)
+            if keys is None:
+                return False
+            keys = [part for key in keys for part in key.split('.')]
+            for i, key in enumerate(keys):
+                path.append(key)
+                # Only the last attribute in a path gets the loader, unless this is an
+                # '_all' variant. Other attributes keep their default loading.
+                if i == len(keys) - 1 or loader.endswith('_all'):
+                    loading.apply(loader, '.'.join(path))
+    return True
+
+
+def get_option_calls(option: Expression) -> Optional[List[CallExpr]]:
+    """Return calls in a chain of loader options, like 'joinedload(...).selectinload(...)'.
+
+    Return None if this is not such a chain.
+    """
+    # Collect calls in a chain, starting from the last one.
+    calls = []  # type: List[CallExpr]
+    expr = option
+    while isinstance(expr, CallExpr):
+        calls.append(expr)
+        callee = expr.callee
+        if isinstance(callee, MemberExpr) and isinstance(callee.expr, CallExpr):
+            expr = callee.expr
+        elif isinstance(callee, (NameExpr, MemberExpr)):
+            break
+        else:
+            return None
+    else:
+        return None
+    return list(reversed(calls))
+
+
+def get_option_keys(call: CallExpr) -> Optional[List[str]]:
+    """Return attribute names (or paths) given to a loader option, or None if not known."""
+    keys = []  # type: List[str]
+    for arg, kind in zip(call.args, call.arg_kinds):
+        if kind != ARG_POS:
+            continue
+        if isinstance(arg, StrExpr):
+            keys.append(arg.value)
+        elif isinstance(arg, MemberExpr):
+            keys.append(arg.name)
+        else:
+            return None
+    return keys
+
+
+def apply_column_loader(call: CallExpr, loading: QueryLoading) -> None:
+    """Apply a column loader option, like 'defer(User.bio)', to columns of query results.
+
+    If the columns are not known, stop tracking columns, so that nothing is reported
+    for them. Note that several arguments to 'defer()' or 'undefer()' give a path.
+    """
+    assert isinstance(call.callee, (NameExpr, MemberExpr))
+    loader = call.callee.name
+    keys = get_option_keys(call)
+    if keys is None:
+        loading.model = None
+        loading.deferred = set()
+    elif any('.' in key for key in keys):
+        return
+    elif loader in ('load_only', 'undefer_group') or len(keys) == 1:
+        loading.apply_columns(loader, keys)
+
+
+def query_options_hook(ctx: MethodContext, registry: ClassRegistry,
+                       check_yield_per: Callable[[str], bool]) -> Type:
+    """Record relationships loaded by loader options in the query type.
+
+    For example:
+        session.query(User).options(joinedload(User.orders), raiseload('*'))
+
+    has type '_LoadedQuery[User, Literal['orders'], Literal['*'], <nothing>]' (the
+    last argument are columns not loaded by the query, e.g. because of a 'defer()'
+    or 'load_only()' option, or 'deferred()' in the model). This is a subclass
+    of 'Query[User]' that doesn't exist at runtime, and the recorded paths are
+    preserved by query methods that return the same query type, like 'filter()'
+    or 'order_by()'. If some options are not understood, a plain 'Query[User]'
+    is returned.
+    """
+    yield_per_options_hook(ctx, check_yield_per)
+    query = ctx.type
+    if not isinstance(query, Instance) or not query.args:
+        return ctx.default_return_type
+    loading = get_query_loading(query) or get_default_loading(query.args[0])
+    if apply_loader_options(ctx.args[0] if ctx.args else [], loading):
+        info = registry.lookup_class(LOADED_QUERY_NAME)
+        args = [query.args[0],
+                registry.literal_union(sorted(loading.loaded)),
+                registry.literal_union(sorted(loading.raised)),
+                registry.literal_union(sorted(loading.deferred))]  # type: List[Type]
+    else:
+        info = registry.lookup_class(QUERY_NAME)
+        args = [query.args[0]]
+    if info is None:
+        return ctx.default_return_type
+    return Instance(info, args)
+
+
+def lazy_load_hook(ctx: MethodContext, loops: LoopRegistry) -> Type:
+    """Report lazy relationships loaded in loops over query results (N+1 queries).
+
+    For example:
+        for user in session.query(User).filter(User.active):
+            print(user.address.city)  # Error: N+1 queries
+
+    This is used for '__iter__()' of queries and lists, and reports accesses
+    to lazily loaded relationships of the loop variable in the loop body, unless
+    they are loaded together with the query using a 'joinedload()',
+    'selectinload()', etc. query option. Accesses to relationships disabled by
+    'raiseload()', and to columns not loaded by the query (see deferred_load_hook())
+    are reported as well.
+    """
+    loops.collect(ctx.api.path)
+    loop = loops.loops.get(ctx.context)  # type: ignore
+    if loop is None or not isinstance(loop.index, NameExpr):
+        return ctx.default_return_type
+    iterable = ctx.type
+    if not isinstance(iterable, Instance) or not iterable.args:
+        return ctx.default_return_type
+    item = get_proper_type(iterable.args[0])
+    if not isinstance(item, Instance) or not is_declarative(item.type):
+        return ctx.default_return_type
+    relationships = get_relationship_loading(item.type)
+    loading = get_loading(iterable, ctx.context)  # type: ignore
+    if loading is None or not relationships and not loading.deferred:
+        return ctx.default_return_type
+
+    for access in find_member_accesses(loop):
+        name = access.name
+        if name in loading.deferred:
+            report_deferred_load(ctx.api, access, item.type)
+        elif name not in relationships:
+            continue
+        elif loading.raises(name):
+            ctx.api.fail('Relationship "{}" of "{}" raises on access because of a'
+                         ' "raiseload()" option'.format(name, shortname(item.type)),
+                         access, code=RAISE_ON_ACCESS)
+        elif relationships[name] and not loading.is_loaded(name):
+            ctx.api.fail('Relationship "{}" of "{}" is lazily loaded for every query result'
+                         ' (N+1 queries), use a "selectinload()" or "joinedload()" option'
+                         .format(name, shortname(item.type)),
+                         access, code=LAZY_LOAD_IN_LOOP)
+    return ctx.default_return_type
+
+
+def deferred_load_hook(ctx: MethodContext, loops: LoopRegistry) -> Type:
+    """Report accesses to columns of a single query result that are not loaded by the query.
+
+    For example:
+        user = session.query(User).options(load_only(User.id)).first()
+        print(user.name)  # Error: loaded by a separate query
+
+    This is used for 'first()', 'one()', etc. and reports accesses to the variable
+    the result is assigned to, in the statements after the assignment (in the same
+    block). Columns are not loaded if they are deferred in the model (and not
+    undeferred by a query option), or because of 'defer()' or 'load_only()' options.
+    """
+    loops.collect(ctx.api.path)
+    result = loops.results.get(ctx.context)  # type: ignore
+    if result is None or not isinstance(result.index, NameExpr):
+        return ctx.default_return_type
+    query = ctx.type
+    if not isinstance(query, Instance) or not query.args:
+        return ctx.default_return_type
+    item = get_proper_type(query.args[0])
+    if not isinstance(item, Instance) or not is_declarative(item.type):
+        return ctx.default_return_type
+    loading = get_loading(query, ctx.context)  # type: ignore
+    if loading is None or not loading.deferred:
+        return ctx.default_return_type
+    for access in find_member_accesses(result):
+        if access.name in loading.deferred:
+            report_deferred_load(ctx.api, access, item.type)
+    return ctx.default_return_type
+
+
+def yield_per_hook(ctx: MethodContext, is_checked: Callable[[str], bool]) -> Type:
+    """Report 'yield_per()' for queries with joined or subquery loaded collections.
+
+    For example:
+        session.query(User).options(joinedload(User.orders)).yield_per(1000)  # Error
+
+    Rows of a joined collection may be split between batches of results (so this
+    raises), and a subquery loads the collections for all results at once, so this
+    defeats 'yield_per()'. Options are taken from the query built in place, options
+    given after 'yield_per()' are checked by yield_per_options_hook(). This is only
+    reported in modules where the check is enabled.
+    """
+    call = ctx.context
+    if not isinstance(call, CallExpr) or not isinstance(call.callee, MemberExpr):
+        return ctx.default_return_type
+    if not is_checked(ctx.api.path):
+        return ctx.default_return_type
+    options = [option for method, args in get_query_chain(call.callee.expr)
+               if method == 'options' for option in args]
+    check_yield_per_options(ctx.api, options, get_query_model(ctx.type))
+    return ctx.default_return_type
+
+
+def yield_per_options_hook(ctx: MethodContext, is_checked: Callable[[str], bool]) -> Type:
+    """Report joined or subquery loaded collections in options of a 'yield_per()' query.
+
+    For example:
+        session.query(User).yield_per(1000).options(subqueryload(User.orders))  # Error
+    """
+    call = ctx.context
+    if not isinstance(call, CallExpr) or not isinstance(call.callee, MemberExpr):
+        return ctx.default_return_type
+    if not is_checked(ctx.api.path):
+        return ctx.default_return_type
+    if any(method == 'yield_per' for method, _ in get_query_chain(call.callee.expr)):
+        check_yield_per_options(ctx.api, call.args, get_query_model(ctx.type))
+    return ctx.default_return_type
+
+
+def get_query_chain(expr: Expression) -> List[Tuple[str, List[Expression]]]:
+    """Return methods (and their arguments) called in a chain building a query.
+
+    For example 'query(User).filter(...).options(...)'. Calls are returned starting
+    from the last one, up to the 'query()' call.
+    """
+    calls = []  # type: List[Tuple[str, List[Expression]]]
+    while isinstance(expr, CallExpr) and isinstance(expr.callee, MemberExpr):
+        if expr.callee.name == 'query':
+            break
+        calls.append((expr.callee.name, expr.args))
+        expr = expr.callee.expr
+    return calls
+
+
+def get_query_model(typ: Type) -> Optional[TypeInfo]:
+    """Return the model of results of a query type, like 'User' for 'Query[User]'."""
+    typ = get_proper_type(typ)
+    if not isinstance(typ, Instance) or not typ.args:
+        return None
+    item = get_proper_type(typ.args[0])
+    if isinstance(item, Instance) and is_declarative(item.type):
+        return item.type
+    return None
+
+
+def check_yield_per_options(api: CheckerPluginInterface, options: List[Expression],
+                            model: Optional[TypeInfo]) -> None:
+    """Report loader options that load collections together with query results.
+
+    Relationships are given as class attributes, or as names (of relationships of
+    the model, or of the model of the previous relationship in a chain). Note that
+    collections are only recognized by their types, e.g. 'relationship(Order)'
+    without 'uselist=True' (or an annotation) is not a collection for mypy.
+    """
+    for option in options:
+        calls = get_option_calls(option) or []
+        current = model
+        for call in calls:
+            assert isinstance(call.callee, (NameExpr, MemberExpr))
+            loader = call.callee.name
+            if loader == 'Load' and call is calls[0] and len(call.args) == 1:
+                entity = call.args[0]
+                node = entity.node if isinstance(entity, RefExpr) else None
+                current = node if isinstance(node, TypeInfo) and is_declarative(node) else None
+                continue
+            if loader in COLUMN_LOADERS:
+                continue
+            keys = []  # type: List[Tuple[str, Optional[Type]]]
+            for arg, kind in zip(call.args, call.arg_kinds):
+                if kind != ARG_POS:
+                    continue
+                if isinstance(arg, StrExpr):
+                    keys.extend((key, None) for key in arg.value.split('.'))
+                elif isinstance(arg, MemberExpr):
+                    keys.append((arg.name, get_expression_type(api, arg)))
+            for i, (key, rel_type) in enumerate(keys):
+                if rel_type is None and current is not None:
+                    sym = current.get(key)
+                    if sym is not None and isinstance(sym.node, Var):
+                        rel_type = sym.node.type
+                target, collection = get_relationship_target(rel_type)
+                last = i == len(keys) - 1 or loader.endswith('_all')
+                if loader in ROW_EAGER_LOADERS and last and collection:
+                    api.fail('"{}()" of collection "{}" is not compatible with "yield_per()",'
+                             ' use "selectinload()" instead'.format(loader, key),
+                             call, code=YIELD_PER_EAGER_LOAD)
+                current = target
+
+
+def get_relationship_target(typ: Optional[Type]) -> Tuple[Optional[TypeInfo], bool]:
+    """Return the target model of a relationship type, and whether it is a collection.
+
+    The model is None if it is not known, e.g. if this is not a relationship type.
+    """
+    typ = get_proper_type(typ)
+    if not isinstance(typ, Instance) or fullname(typ.type) != RELATIONSHIP_NAME or not typ.args:
+        return None, False
+    target = get_proper_type(typ.args[0])
+    collection = False
+    if isinstance(target, Instance) and target.type.has_base('typing.Collection'):
+        collection = True
+        if target.args:
+            target = get_proper_type(target.args[-1])
+    if isinstance(target, Instance) and is_declarative(target.type):
+        return target.type, collection
+    return None, collection
+
+
+def async_lazy_load_hook(ctx: MethodContext, loops: LoopRegistry) -> Type:
+    """Report lazy relationships of models loaded by an 'AsyncSession'.
+
+    For example:
+        user = await session.get(User, user_id)
+        print(user.orders)  # Error: raises an error on access
+
+    Lazy loading emits a query on attribute access that can't be awaited, so with
+    asyncio this raises an error instead. This is used for 'get()', with loader
+    options given as 'options=[...]', and for 'run_sync()' with a lambda that returns
+    query results, like 'lambda s: s.query(User).options(...).all()'. Accesses are
+    found like for single query results (see deferred_load_hook()), or in loops
+    over the awaited call. Relationships given to 'refresh()' of the variable,
+    like 'await session.refresh(user, ['orders'])', are loaded by it.
+    """
+    call = ctx.context
+    assert isinstance(call, CallExpr)
+    loops.collect(ctx.api.path)
+    loop = loops.results.get(call) or loops.loops.get(call)
+    if loop is None or not isinstance(loop.index, NameExpr):
+        return ctx.default_return_type
+    item = get_awaited_model(ctx.default_return_type, iterated=call in loops.loops)
+    if item is None:
+        return ctx.default_return_type
+    relationships = get_relationship_loading(item.type)
+    loading = get_async_loading(call, item)
+    if loading is None or not relationships:
+        return ctx.default_return_type
+
+    finder = MemberAccessFinder(loop.index.node)
+    for node in loop.body:
+        node.accept(finder)
+    for access in finder.accesses:
+        name = access.name
+        if name not in relationships or name in finder.refreshed:
+            continue
+        if loading.raises(name):
+            ctx.api.fail('Relationship "{}" of "{}" raises on access because of a'
+                         ' "raiseload()" option'.format(name, shortname(item.type)),
+                         access, code=RAISE_ON_ACCESS)
+        elif relationships[name] and not loading.is_loaded(name):
+            ctx.api.fail('Relationship "{}" of "{}" is lazily loaded, this raises an error'
+                         ' with asyncio, use a "selectinload()" or "joinedload()" option'
+                         .format(name, shortname(item.type)),
+                         access, code=ASYNC_LAZY_LOAD)
+    return ctx.default_return_type
+
+
+def get_awaited_model(typ: Type, iterated: bool) -> Optional[Instance]:
+    """Return the model type of the result of a coroutine, or of items of the result."""
+    typ = get_proper_type(typ)
+    if not isinstance(typ, Instance) or len(typ.args) != 3:
+        return None
+    result = get_proper_type(typ.args[2])
+    if iterated:
+        if not isinstance(result, Instance) or not result.args:
+            return None
+        result = get_proper_type(result.args[0])
+    if isinstance(result, UnionType):
+        items = [item for item in map(get_proper_type, result.items)
+                 if not isinstance(item, NoneTyp)]
+        if len(items) != 1:
+            return None
+        result = items[0]
+    if not isinstance(result, Instance) or not is_declarative(result.type):
+        return None
+    return result
+
+
+def get_async_loading(call: CallExpr, item: Instance) -> Optional[QueryLoading]:
+    """Return loading for models loaded by 'AsyncSession.get()' or 'run_sync()'.
+
+    Return None if loader options are not known, e.g. if 'run_sync()' is called
+    for a function, and not for a lambda that builds a query.
+    """
+    assert isinstance(call.callee, MemberExpr)
+    loading = get_default_loading(item)
+    if call.callee.name == 'get':
+        options = [arg for arg, name in zip(call.args, call.arg_names) if name == 'options']
+        if not options:
+            return loading
+        if not isinstance(options[0], (ListExpr, TupleExpr)):
+            return None
+        exprs = options[0].items
+    else:
+        if not call.args or not isinstance(call.args[0], LambdaExpr):
+            return None
+        query = get_query_options(call.args[0].expr())
+        if query is None:
+            return None
+        exprs = query
+    if not apply_loader_options(exprs, loading):
+        return None
+    return loading
+
+
+def run_sync_signature_hook(ctx: MethodSigContext, registry: ClassRegistry) -> FunctionLike:
+    """Give the function passed to 'run_sync()' of async sessions a precise type.
+
+    For example:
+        await session.run_sync(lambda s: s.query(User.id).all())  # 'List[Tuple[int]]'
+
+    The function is called with a 'Session' (or a 'Connection' for 'AsyncConnection'),
+    and any other arguments given to 'run_sync()'. This can't be expressed in stubs
+    for lambdas, so if there are no other arguments, the function is expected to take
+    a single argument of the synchronous type.
+    """
+    signature = ctx.default_signature
+    if len(ctx.args) != 3 or len(ctx.args[0]) != 1 or ctx.args[1] or ctx.args[2]:
+        return signature
+    fn_type = get_proper_type(signature.arg_types[0])
+    if not isinstance(fn_type, CallableType) or not isinstance(ctx.type, Instance):
+        return signature
+    if ctx.type.type.has_base(ASYNC_SESSION_NAME):
+        sync_type = registry.instance(SESSION_NAME)
+    else:
+        sync_type = registry.instance(CONNECTION_NAME)
+    fn_type = fn_type.copy_modified(arg_types=[sync_type], arg_kinds=[ARG_POS], arg_names=[None],
+                                    is_ellipsis_args=False)
+    return signature.copy_modified(arg_types=[fn_type], arg_kinds=[ARG_POS],
+                                   arg_names=signature.arg_names[:1])
+
+
+def get_loading(query: Instance, expr: Expression) -> Optional[QueryLoading]:
+    """Return loading for results of a query (or a list of query results).
+
+    Loader options are taken from the query type (see query_options_hook()), or
+    for lists and queries without options, from the query built in place, since
+    otherwise the options are not known.
+    """
+    loading = get_query_loading(query)
+    if loading is None:
+        options = get_query_options(expr)
+        loading = get_default_loading(query.args[0])
+        if options is None or not apply_loader_options(options, loading):
+            return None
+    return loading
+
+
+def report_deferred_load(api: CheckerPluginInterface, access: MemberExpr,
+                         model: TypeInfo) -> None:
+    api.fail('Column "{}" of "{}" is not loaded by the query, and is loaded by a separate'
+             ' query on access, use an "undefer()" option or add it to "load_only()"'
+             .format(access.name, shortname(model)), access, code=DEFERRED_LOAD)
+
+
+def find_member_accesses(loop: Loop) -> List[MemberExpr]:
+    """Find attribute accesses on the loop variable in the loop body."""
+    assert isinstance(loop.index, NameExpr)
+    finder = MemberAccessFinder(loop.index.node)
+    for node in loop.body:
+        node.accept(finder)
+    return finder.accesses
+
+
+def get_query_options(expr: Expression) -> Optional[List[Expression]]:
+    """Return options given to a query built by a chain of method calls.
+
+    Return None if the expression is not such a query, e.g. a variable.
+    """
+    options = []  # type: List[Expression]
+    while True:
+        if isinstance(expr, CallExpr) and isinstance(expr.callee, MemberExpr):
+            if expr.callee.name == 'query':
+                return options
+            if expr.callee.name == 'options':
+                options.extend(expr.args)
+            expr = expr.callee.expr
+        elif isinstance(expr, MemberExpr):
+            expr = expr.expr
+        else:
+            return None
+
+
+class MemberAccessFinder(TraverserVisitor):
+    """Find all attribute accesses on a given variable.
+
+    Also record attributes of the variable given to 'refresh()' calls, like
+    'session.refresh(user, ['orders'])', that load these attributes.
+    """
+    def __init__(self, var: Optional[SymbolNode]) -> None:
+        super().__init__()
+        self.var = var
+        self.accesses = []  # type: List[MemberExpr]
+        self.refreshed = set()  # type: Set[str]
+
+    def is_var(self, expr: Expression) -> bool:
+        return isinstance(expr, NameExpr) and expr.node is self.var and self.var is not None
+
+    def visit_member_expr(self, o: MemberExpr) -> None:
+        if self.is_var(o.expr):
+            self.accesses.append(o)
+        super().visit_member_expr(o)
+
+    def visit_call_expr(self, o: CallExpr) -> None:
+        if isinstance(o.callee, MemberExpr) and o.callee.name == 'refresh' and len(o.args) > 1:
+            names = o.args[1]
+            if self.is_var(o.args[0]) and isinstance(names, (ListExpr, TupleExpr)):
+                self.refreshed.update(item.value for item in names.items
+                                      if isinstance(item, StrExpr))
+        super().visit_call_expr(o)
+
+
 # We really need to add this to TypeChecker API
 def parse_bool(expr: Expression) -> Optional[bool]:
     if isinstance(expr, NameExpr):
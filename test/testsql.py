@@ -4,14 +4,31 @@ import os
 import os.path
 import sys
 import re
+import shutil
+import tempfile
+from typing import Any, Dict, List, Optional
 
 import pytest  # type: ignore  # no pytest in typeshed
 
 from mypy.test.config import test_temp_dir
 from mypy.test.data import DataDrivenTestCase, DataSuite
 from mypy.test.helpers import assert_string_arrays_equal
-from mypy.util import try_find_python2_interpreter
+from mypy.config_parser import parse_config_file
+from mypy.dmypy_server import Server
+from mypy.find_sources import create_source_list
+from mypy.options import Options
 from mypy import api
+from mypy.version import __version__
+
+try:
+    from mypy.util import try_find_python2_interpreter
+except ImportError:
+    # Python 2 support was removed in mypy 0.980.
+    def try_find_python2_interpreter() -> Optional[str]:
+        return None
+
+# Major and minor version of mypy, needed for changes in internal APIs.
+mypy_version = tuple(int(part) for part in re.findall(r'\d+', __version__)[:2])
 
 this_file_dir = os.path.dirname(os.path.realpath(__file__))
 prefix = os.path.dirname(this_file_dir)
@@ -20,6 +37,56 @@ inipath = os.path.abspath(os.path.join(prefix, 'test'))
 # Locations of test data files such as test case descriptions (.test).
 test_data_prefix = os.path.join(prefix, 'test', 'test-data')
 
+# Environment variable with the location of a mypy cache of all stub modules
+# shared by test cases (see warm_cache()).
+SHARED_CACHE_ENV = 'SQLMYPY_TEST_CACHE'
+
+
+def base_cmdline(py2: bool = False) -> List[str]:
+    """Return mypy options common to all test cases."""
+    mypy_cmdline = [
+        '--show-traceback',
+        '--no-silence-site-packages',
+        '--no-error-summary',
+        '--config-file={}/sqlalchemy.ini'.format(inipath),
+    ]
+    if py2:
+        mypy_cmdline.append('--py2')
+    else:
+        if sys.version_info[:2] == (3, 5):
+            version = (3, 6)  # Always accept variable annotations.
+        else:
+            version = sys.version_info[:2]
+        mypy_cmdline.append('--python-version={}'.format('.'.join(map(str, version))))
+    return mypy_cmdline
+
+
+def warm_cache(cache_dir: str) -> bool:
+    """Type check all stub modules once, writing the results to a mypy cache.
+
+    Test cases start from a copy of this cache, so that the stubs are not analyzed
+    again for every case, and the cache itself is never modified (and can be used
+    by several worker processes at once). Return False if there are errors in the
+    stubs, these are then reported by the test cases themselves.
+    """
+    stubs = os.path.join(prefix, 'sqlalchemy-stubs')
+    modules = []
+    for root, _, files in os.walk(stubs):
+        for name in files:
+            if name.endswith('.pyi'):
+                path = os.path.relpath(os.path.join(root, name[:-len('.pyi')]), stubs)
+                parts = ['sqlalchemy'] + path.split(os.sep)
+                if parts[-1] == '__init__':
+                    parts.pop()
+                modules.append('.'.join(parts))
+    with tempfile.TemporaryDirectory() as tmp:
+        program_path = os.path.join(tmp, 'warm_cache.py')
+        with open(program_path, 'w') as file:
+            for module in sorted(modules):
+                file.write('import {}\n'.format(module))
+        _, _, returncode = api.run(base_cmdline() + ['--cache-dir', cache_dir, program_path])
+    return returncode == 0
+
 
 class SQLDataSuite(DataSuite):
     if sys.version_info[:2] == (3, 5):
@@ -31,30 +98,27 @@ class SQLDataSuite(DataSuite):
                  'sqlalchemy-sql-sqltypes.test',
                  'sqlalchemy-sql-selectable.test',
                  'sqlalchemy-sql-schema.test',
-                 'sqlalchemy-plugin-features.test']
+                 'sqlalchemy-plugin-features.test',
+                 'sqlalchemy-plugin-checks.test']
     data_prefix = test_data_prefix
 
     def run_case(self, testcase: DataDrivenTestCase) -> None:
 
         assert testcase.old_cwd is not None, "test was not properly set up"
-        mypy_cmdline = [
-            '--show-traceback',
-            '--no-silence-site-packages',
-            '--no-error-summary',
-            '--config-file={}/sqlalchemy.ini'.format(inipath),
-        ]
+        # Every case runs in its own temporary directory (the current one).
         py2 = testcase.name.lower().endswith('python2')
+        # Mypy shows overloaded __init__() methods of classes loaded from cache as
+        # 'def ClassName(...)' instead of 'def __init__(...)', so cases listing
+        # overload variants are marked to start without the shared cache.
+        cold_cache = testcase.name.endswith('ColdCache')
+        mypy_cmdline = base_cmdline(py2)
         if py2:
             if try_find_python2_interpreter() is None:
                 pytest.skip()
                 return
-            mypy_cmdline.append('--py2')
-        else:
-            if sys.version_info[:2] == (3, 5):
-                version = (3, 6)  # Always accept variable annotations.
-            else:
-                version = sys.version_info[:2]
-            mypy_cmdline.append('--python-version={}'.format('.'.join(map(str, version))))
+        elif os.environ.get(SHARED_CACHE_ENV) and not cold_cache:
+            # Copy the cache, preserving modification times that mypy checks.
+            shutil.copytree(os.environ[SHARED_CACHE_ENV], '.mypy_cache')
 
         program_text = '\n'.join(testcase.input)
         flags = re.search('# flags: (.*)$', program_text, flags=re.MULTILINE)
@@ -68,18 +132,85 @@ class SQLDataSuite(DataSuite):
         with open(program_path, 'w') as file:
             for s in testcase.input:
                 file.write('{}\n'.format(s))
-        output = []
         # Type check the program.
         out, err, returncode = api.run(mypy_cmdline)
-        # split lines, remove newlines, and remove directory of test case
-        for line in (out + err).splitlines():
-            if line.startswith(test_temp_dir + os.sep):
-                output.append(line[len(test_temp_dir + os.sep):].rstrip("\r\n").replace('.py',
-                                                                                        ''))
-            else:
-                output.append(line.rstrip("\r\n"))
+        output = normalize_output(out + err)
         # Remove temp file.
         os.remove(program_path)
         assert_string_arrays_equal(testcase.output, output,
                                    'Invalid output ({}, line {})'.format(
                                    testcase.file, testcase.line))
+
+
+def normalize_output(text: str) -> List[str]:
+    """Split lines, remove newlines, and remove directory of test case."""
+    output = []
+    for line in text.splitlines():
+        if line.startswith(test_temp_dir + os.sep):
+            output.append(line[len(test_temp_dir + os.sep):].rstrip("\r\n").replace('.py',
+                                                                                    ''))
+        else:
+            output.append(line.rstrip("\r\n"))
+    return output
+
+
+class SQLDaemonSuite(DataSuite):
+    """Test cases for updates of models in daemon (fine-grained incremental) mode.
+
+    Every test case is checked once, and then again after every group of file
+    updates ('[file a.py.2]', etc.). Output of each step is separated by '=='.
+    Targets reprocessed in a step (in any order) can be given as '[targets2 a, main.f]', etc.
+    A test case can use its own config file given as '[file mypy.ini]'.
+    """
+    if sys.version_info[:2] == (3, 5):
+        files = []  # type: List[str]
+    else:
+        files = ['sqlalchemy-daemon.test']
+    data_prefix = test_data_prefix
+
+    def run_case(self, testcase: DataDrivenTestCase) -> None:
+        # These helpers are not available in older mypy versions.
+        from mypy.test.helpers import assert_target_equivalence, perform_file_operations
+
+        options = Options()
+        config_file = os.path.join(test_temp_dir, 'mypy.ini')
+        if not os.path.exists(config_file):
+            config_file = os.path.join(inipath, 'sqlalchemy.ini')
+        parse_config_file(options, lambda: None, config_file)
+        options.incremental = True
+        options.fine_grained_incremental = True
+        # These are required by the daemon.
+        options.local_partial_types = True
+        options.follow_imports = 'error'
+        options.show_traceback = True
+        options.no_silence_site_packages = True
+        options.error_summary = False
+        options.python_version = sys.version_info[:2]
+        server = Server(options, os.path.join(test_temp_dir, '.dmypy.json'))
+
+        with open(os.path.join(test_temp_dir, 'main.py'), 'w') as file:
+            for s in testcase.input:
+                file.write('{}\n'.format(s))
+        output = self.check(server, options)
+        for step, operations in enumerate(testcase.find_steps(), start=2):
+            perform_file_operations(operations)
+            output.append('==')
+            output.extend(self.check(server, options))
+            expected = testcase.expected_fine_grained_targets.get(step)
+            if expected is not None:
+                # Some targets are processed several times, ignore the order.
+                assert server.fine_grained_manager is not None
+                actual = server.fine_grained_manager.processed_targets
+                assert_target_equivalence('targets{}'.format(step), sorted(expected),
+                                          sorted(set(actual)))
+        assert_string_arrays_equal(testcase.output, output,
+                                   'Invalid output ({}, line {})'.format(
+                                   testcase.file, testcase.line))
+
+    def check(self, server: Server, options: Options) -> List[str]:
+        sources = create_source_list([test_temp_dir], options)
+        kwargs = {'is_tty': False, 'terminal_width': -1}  # type: Dict[str, Any]
+        if mypy_version >= (0, 980):
+            kwargs['export_types'] = False
+        response = server.check(sources, **kwargs)
+        return normalize_output(response['out'] + response['err'])